@@ -5,9 +5,12 @@ FastAPI 서버
 - /timeline: 엔티티 타임라인
 - /trend: 트렌드 분석
 - /finder: 동적 OG 태그가 포함된 인덱스 페이지
+- /admin/reload: 새 인덱스 세대로 즉시 교체 (평소에는 current 링크 감시로 자동 교체)
 """
 import os
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from contextlib import asynccontextmanager
 
@@ -24,7 +27,13 @@ sys.path.insert(0, str(PROJECT_ROOT))
 from config import *
 from indexing.entity_db import EntityDB
 from indexing.bm25_index import KiwiBM25
-from indexing.embedder import SlowLetterEmbedder, VectorStore
+from indexing.cache import EmbeddingCache, LRUCache, TokenCache
+from indexing.doc_store import DocStore
+from indexing.embedder import SlowLetterEmbedder
+from indexing.local_vectors import open_vector_store
+from indexing.generations import (
+    DOC_STORE_NAME, current_generation, generation_name, resolve_index_paths,
+)
 from search.hybrid_search import HybridSearchEngine
 from agent.tools import ToolExecutor
 from agent.agent import SlowLetterAgent
@@ -34,53 +43,146 @@ from agent.agent import SlowLetterAgent
 agent: Optional[SlowLetterAgent] = None
 entity_db: Optional[EntityDB] = None
 hybrid_search: Optional[HybridSearchEngine] = None
+generation: str = ""  # 현재 서빙 중인 인덱스 세대 이름
+
+# 세대와 무관하게 공유하는 리소스 (Qdrant 클라이언트, 임베더, 검색 결과 캐시)
+_shared: dict = {
+    "result_cache": LRUCache(SEARCH_RESULT_CACHE_SIZE),
+    # 세대마다 엔진을 새로 만들어도 워커 스레드는 늘지 않게 풀 하나를 공유한다
+    "search_executor": ThreadPoolExecutor(max_workers=8, thread_name_prefix="hybrid-search"),
+}
+_reload_lock = threading.Lock()
+_stop_watch = threading.Event()
+
+
+def _load_generation():
+    """current 세대의 인덱스를 로드해 (세대 이름, EntityDB, 검색 엔진, 에이전트)를 반환합니다."""
+    gen_dir, db_path, bm25_path = resolve_index_paths(PROCESSED_DIR, SQLITE_DB, BM25_INDEX)
+    # 세대 도입 전이고 컬럼형 인덱스도 없으면 구버전 pickle로 폴백한다.
+    if gen_dir is None and not bm25_path.exists():
+        bm25_path = BM25_LEGACY_PICKLE
+
+    # 1. 문서 저장소 (세대 도입 전이거나 저장소 없이 빌드된 세대면 None)
+    doc_store = None
+    if gen_dir is not None and (gen_dir / DOC_STORE_NAME / "meta.json").exists():
+        doc_store = DocStore(str(gen_dir / DOC_STORE_NAME))
+        print(f"  DocStore loaded: {doc_store.n_docs} docs")
+
+    # 2. Entity DB (본문은 위 문서 저장소에서 읽는다. 스키마 버전이 다른 DB는 EntityDB가 ValueError로
+    #    거부한다. 세대 도입 전 SQLITE_DB에는 entity/doc_entity/db_meta가 없어 → 시작 시 실패,
+    #    감시 스레드는 기존 세대 유지)
+    new_db = EntityDB(
+        str(db_path), mmap_mb=ENTITY_DB_MMAP_MB, cache_mb=ENTITY_DB_CACHE_MB, doc_store=doc_store
+    )
+    print(f"  EntityDB loaded: {db_path}")
+
+    # 3. BM25 (문서 저장소를 참조하는 인덱스면 위에서 연 저장소를 공유)
+    bm25 = KiwiBM25(token_cache=TokenCache(lru_size=QUERY_TOKEN_CACHE_SIZE))
+    bm25.load(str(bm25_path), doc_store=doc_store)
+    print(f"  BM25 loaded: {bm25_path}")
+
+    # 4. Hybrid Search (결과 캐시 키에 세대 이름이 들어가 세대 교체 시 자동 무효화)
+    name = generation_name(gen_dir)
+    # 벡터 결과(doc_id/필터 키만 있는 slim payload)는 같은 세대의 문서 저장소에서 본문을 채운다.
+    engine = HybridSearchEngine(
+        bm25, _shared["vector_store"], _shared["embedder"],
+        result_cache=_shared["result_cache"], generation=name,
+        doc_lookup=(doc_store if doc_store is not None else new_db).get_documents,
+        executor=_shared["search_executor"],
+    )
 
+    # 5. Agent
+    tool_executor = ToolExecutor(engine, new_db)
+    new_agent = SlowLetterAgent(
+        anthropic_api_key=ANTHROPIC_API_KEY,
+        tool_executor=tool_executor,
+        model=AGENT_MODEL,
+        max_tokens=AGENT_MAX_TOKENS,
+    )
+    return name, new_db, engine, new_agent
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    """앱 시작/종료 시 리소스 관리"""
-    global agent, entity_db, hybrid_search
 
-    print("Loading indexes...")
+def reload_indexes(force: bool = False) -> bool:
+    """current 세대가 바뀌었으면 새 인덱스를 백그라운드에서 로드한 뒤 교체합니다.
+
+    로드가 끝날 때까지 기존 세대로 계속 응답하고, 교체는 전역 참조 재할당뿐이라
+    처리 중인 요청은 자신이 잡은 객체로 끝까지 실행된다. 이전 세대는 명시적으로 닫지 않는다:
+    마지막 요청이 참조를 놓는 순간 GC가 SQLite 연결/mmap을 정리한다 (고정 시간 뒤에 닫으면
+    오래 도는 에이전트 루프가 닫힌 DB를 만난다).
+    """
+    global agent, entity_db, hybrid_search, generation
+
+    with _reload_lock:
+        name = generation_name(current_generation(PROCESSED_DIR))
+        if not force and name == generation:
+            return False
 
-    # 1. Entity DB
-    entity_db = EntityDB(str(SQLITE_DB))
-    print(f"  EntityDB loaded: {SQLITE_DB}")
+        print(f"Loading indexes (generation: {name})...")
+        name, new_db, engine, new_agent = _load_generation()
+
+        hybrid_search = engine
+        entity_db = new_db
+        agent = new_agent
+        generation = name
+        # 이전 세대 키는 더 이상 적중하지 않으므로 메모리만 비운다.
+        _shared["result_cache"].clear()
+        print(f"Serving generation: {name}")
+    return True
+
+
+def _watch_generations():
+    """current 링크를 주기적으로 확인해 바뀌면 교체합니다."""
+    while not _stop_watch.wait(GENERATION_POLL_SEC):
+        try:
+            reload_indexes()
+        except Exception as e:
+            print(f"[reload] 새 세대 로드 실패, 기존 세대 유지: {e}")
 
-    # 2. BM25
-    bm25 = KiwiBM25()
-    bm25.load(str(BM25_INDEX))
-    print(f"  BM25 loaded: {BM25_INDEX}")
 
-    # 3. Vector Store / Embedder
-    vector_store = VectorStore(QDRANT_URL)
-    print(f"  VectorStore loaded: {QDRANT_URL}")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """앱 시작/종료 시 리소스 관리"""
+    # 1. Vector Store / Embedder (세대 간 공유)
+    _shared["vector_store"] = open_vector_store(
+        VECTOR_BACKEND, QDRANT_URL, str(LOCAL_VECTOR_DIR), quantization=QDRANT_QUANTIZATION,
+        slim_payload=True, nprobe=LOCAL_VECTOR_NPROBE, rescore_k=LOCAL_VECTOR_RESCORE_K,
+    )
+    print(f"  VectorStore loaded: {VECTOR_BACKEND}")
 
-    embedder = None
+    _shared["embedder"] = None
     try:
-        embedder = SlowLetterEmbedder(OPENAI_API_KEY)
+        query_cache = EmbeddingCache(
+            EMBEDDING_CACHE_DB,
+            lru_size=EMBEDDING_CACHE_SIZE,
+            ttl_sec=EMBEDDING_CACHE_TTL_SEC,
+            max_entries=EMBEDDING_CACHE_MAX_ENTRIES,
+        )
+        _shared["embedder"] = SlowLetterEmbedder(
+            OPENAI_API_KEY, model=EMBEDDING_MODEL, dim=EMBEDDING_DIM, query_cache=query_cache
+        )
     except Exception as e:
         # OPENAI_API_KEY 미설정/placeholder/오류인 경우에도 서버는 뜨게 하고
         # BM25-only 검색으로 폴백한다.
         print(f"  Embedder disabled: {e}")
 
-    # 4. Hybrid Search
-    hybrid_search = HybridSearchEngine(bm25, vector_store, embedder)
+    # 2. 현재 세대 로드
+    reload_indexes(force=True)
 
-    # 5. Agent
-    tool_executor = ToolExecutor(hybrid_search, entity_db)
-    agent = SlowLetterAgent(
-        anthropic_api_key=ANTHROPIC_API_KEY,
-        tool_executor=tool_executor,
-        model=AGENT_MODEL,
-        max_tokens=AGENT_MAX_TOKENS,
-    )
+    watcher = None
+    if GENERATION_POLL_SEC > 0:
+        watcher = threading.Thread(target=_watch_generations, name="generation-watcher", daemon=True)
+        watcher.start()
 
     print("All indexes loaded. Server ready.")
     yield
 
     # Cleanup
-    entity_db.close()
+    _stop_watch.set()
+    if entity_db is not None:
+        entity_db.close()
+    _shared["search_executor"].shutdown(wait=False)
+    if _shared.get("embedder") is not None and _shared["embedder"].query_cache is not None:
+        _shared["embedder"].query_cache.close()
     print("Server shutdown.")
 
 
@@ -206,18 +308,20 @@ def query_endpoint(req: QueryRequest):
 
 
 @app.post("/search")
-def search_endpoint(req: SearchRequest):
-    """직접 하이브리드 검색"""
-    if not hybrid_search:
+async def search_endpoint(req: SearchRequest):
+    """직접 하이브리드 검색 (BM25와 벡터 검색을 동시에 실행)"""
+    engine = hybrid_search
+    if not engine:
         raise HTTPException(status_code=503, detail="Search engine not initialized")
 
-    results = hybrid_search.search(
+    results, timings = await engine.asearch_with_timings(
         query=req.query,
         top_k=req.top_k,
         date_start=req.date_start,
         date_end=req.date_end,
     )
-    return {"results": results, "count": len(results)}
+    timings = {k: round(v, 1) if isinstance(v, float) else v for k, v in timings.items()}
+    return {"results": results, "count": len(results), "timings": timings}
 
 
 @app.post("/timeline")
@@ -257,25 +361,17 @@ def doc_endpoint(doc_id: str):
         raise HTTPException(status_code=503, detail="Entity DB not initialized")
 
     try:
-        # EntityDB는 entity 중심 API라서, 여기서는 SQLite를 직접 조회한다.
-        import sqlite3
-        conn = sqlite3.connect(str(SQLITE_DB))
-        row = conn.execute(
-            "SELECT doc_id, date, title, content, persons, organizations, concepts "
-            "FROM documents WHERE doc_id = ?",
-            (doc_id,),
-        ).fetchone()
-        conn.close()
-        if not row:
+        doc = entity_db.get_document(doc_id)
+        if not doc:
             raise HTTPException(status_code=404, detail="Document not found")
         return DocResponse(
-            doc_id=row[0],
-            date=row[1],
-            title=row[2],
-            content=row[3],
-            persons=row[4] or "",
-            organizations=row[5] or "",
-            concepts=row[6] or "",
+            doc_id=doc["doc_id"],
+            date=doc["date"],
+            title=doc["title"],
+            content=doc["content"],
+            persons=doc["persons"] or "",
+            organizations=doc["organizations"] or "",
+            concepts=doc["concepts"] or "",
         )
     except HTTPException:
         raise
@@ -290,9 +386,32 @@ def health():
         "agent": agent is not None,
         "entity_db": entity_db is not None,
         "hybrid_search": hybrid_search is not None,
+        "generation": generation,
+        "result_cache": _shared["result_cache"].stats(),
+        "embedding_cache": _embedding_cache_stats(),
     }
 
 
+def _embedding_cache_stats() -> Optional[dict]:
+    embedder = _shared.get("embedder")
+    if embedder is None or embedder.query_cache is None:
+        return None
+    return embedder.query_cache.stats()
+
+
+@app.post("/admin/reload")
+def admin_reload(request: Request):
+    """current 세대를 즉시 확인해 바뀌었으면 교체합니다 (빌드 스크립트에서 호출)."""
+    if ADMIN_TOKEN and request.headers.get("X-Admin-Token") != ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Forbidden")
+
+    try:
+        reloaded = reload_indexes()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Reload failed: {e}")
+    return {"reloaded": reloaded, "generation": generation}
+
+
 # ===== 동적 OG 태그 인덱스 페이지 =====
 
 _index_html_cache: Optional[str] = None
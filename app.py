@@ -13,7 +13,6 @@ os.chdir(ROOT)
 
 import streamlit as st
 import requests
-import sqlite3
 from urllib.parse import quote
 
 API_URL = "http://localhost:8000"
@@ -112,14 +111,21 @@ def check_api():
 from typing import Optional
 
 
+@st.cache_resource
+def _archive_db_pool(db_path: str):
+    """세대 DB별 읽기 전용 연결 풀 (streamlit 재실행마다 새로 열지 않는다)."""
+    from indexing.sqlite_pool import ReadOnlyPool
+    return ReadOnlyPool(db_path, mmap_mb=0, cache_mb=8)
+
+
 def get_archive_count() -> Optional[int]:
     """로컬 SQLite 기준 문서 수를 반환합니다(가능하면 자동 표시)."""
     try:
-        conn = sqlite3.connect("data/processed/entities.db")
-        cur = conn.execute("SELECT COUNT(*) FROM documents")
-        n = int(cur.fetchone()[0])
-        conn.close()
-        return n
+        from config import PROCESSED_DIR, SQLITE_DB, BM25_INDEX
+        from indexing.generations import resolve_index_paths
+        _, db_path, _ = resolve_index_paths(PROCESSED_DIR, SQLITE_DB, BM25_INDEX)
+        cur = _archive_db_pool(str(db_path)).connection().execute("SELECT COUNT(*) FROM documents")
+        return int(cur.fetchone()[0])
     except Exception:
         return None
 
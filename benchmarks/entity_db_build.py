@@ -0,0 +1,167 @@
+"""
+EntityDB 전체 구축 벤치마크
+- bulk: indexing.entity_db.create_db (CSV 한 번 읽기, executemany, 로드 후 인덱스, 로드용 PRAGMA, ANALYZE)
+- row-by-row: 이전 방식 재현 (기본 PRAGMA, 인덱스 먼저, 문서/링크마다 execute, 요약용 CSV 재순회)
+
+사용법:
+  python -m benchmarks.entity_db_build --csv data/raw/slowletter_solar_entities.csv
+  python -m benchmarks.entity_db_build --synthetic 100000
+"""
+from __future__ import annotations
+import argparse
+import csv
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from config import ENTITY_RULES_JSON
+from indexing.entity_db import (
+    DOC_COLUMNS, ENTITY_COLUMNS, _EntityDictionary, _INDEXES, _SCHEMA,
+    _create_fts, _fts_row, _insert_fts, _split_names, _write_meta, create_db, load_entity_rules,
+)
+from indexing.dates import date_ordinal
+
+CSV_FIELDS = [
+    "ID", "date", "title", "cleaned_content_for_api", "cleaned_content_for_service",
+    "solar_persons", "solar_organizations", "solar_concepts", "solar_events", "solar_locations",
+    "total_entities",
+]
+
+
+def write_synthetic_csv(path: str, n: int, seed: int = 0):
+    """본문 길이/엔티티 수가 실제 아카이브와 비슷한 합성 CSV를 만듭니다."""
+    rng = random.Random(seed)
+    words = [f"단어{i}" for i in range(5000)]
+    pools = {
+        "solar_persons": [f"인물{i}" for i in range(3000)],
+        "solar_organizations": [f"기관{i}" for i in range(1500)],
+        "solar_concepts": [f"개념{i}" for i in range(2000)],
+        "solar_events": [f"사건{i}" for i in range(800)],
+        "solar_locations": [f"지역{i}" for i in range(400)],
+    }
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        w = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+        w.writeheader()
+        for i in range(n):
+            content = " ".join(rng.choices(words, k=rng.randint(80, 250)))
+            row = {
+                "ID": f"doc{i}",
+                "date": f"{2015 + i * 10 // n}-{1 + i % 12:02d}-{1 + i % 28:02d} 08:00",
+                "title": " ".join(rng.choices(words, k=6)),
+                "cleaned_content_for_api": content,
+                "cleaned_content_for_service": content,
+            }
+            total = 0
+            for col, pool in pools.items():
+                names = rng.sample(pool, rng.randint(0, 4))
+                row[col] = "; ".join(names)
+                total += len(names)
+            row["total_entities"] = total
+            w.writerow(row)
+
+
+def row_by_row_load(csv_path: str, db_path: str, rules_path: str | None = None) -> float:
+    """이전 create_db 방식: 인덱스가 있는 테이블에 행마다 execute, CSV를 두 번 순회.
+
+    FTS 구축 시간(두 방식 공통)을 초 단위로 반환합니다.
+    """
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.executescript(_SCHEMA + _INDEXES)
+
+    with open(csv_path, encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+
+    rules = load_entity_rules(rules_path)
+    dictionary = _EntityDictionary(rules)
+    cols = ", ".join(DOC_COLUMNS)
+    placeholders = ", ".join("?" * len(DOC_COLUMNS))
+    fts_rows = []
+    for row in rows:
+        if not row.get("ID") or not row.get("cleaned_content_for_api"):
+            continue
+        values = (
+            row["ID"], row.get("date", "")[:10], row.get("title", ""),
+            row.get("solar_persons", ""), row.get("solar_organizations", ""),
+            row.get("solar_concepts", ""), row.get("solar_events", ""),
+            row.get("solar_locations", ""), int(row.get("total_entities", 0) or 0),
+        )
+        cursor.execute(f"INSERT OR REPLACE INTO documents ({cols}) VALUES ({placeholders})", values)
+        doc_num = cursor.lastrowid
+        fts_rows.append(_fts_row(doc_num, values, row["cleaned_content_for_api"]))
+        for column, etype in ENTITY_COLUMNS.items():
+            for name in _split_names(values[DOC_COLUMNS.index(column)]):
+                cursor.execute(
+                    "INSERT OR IGNORE INTO doc_entity (entity_id, date_ord, doc_num) VALUES (?, ?, ?)",
+                    (dictionary.resolve(name, etype), date_ordinal(values[1]), doc_num),
+                )
+    for row in dictionary.rows():
+        cursor.execute("INSERT INTO entity (id, name, type, aliases) VALUES (?, ?, ?, ?)", row)
+
+    daily = defaultdict(lambda: {"titles": [], "persons": set(), "orgs": set(), "concepts": set()})
+    for row in rows:
+        d = row.get("date", "")[:10]
+        if not d or not row.get("cleaned_content_for_api"):
+            continue
+        daily[d]["titles"].append(row.get("title", ""))
+        daily[d]["persons"].update(_split_names(row.get("solar_persons", "")))
+        daily[d]["orgs"].update(_split_names(row.get("solar_organizations", "")))
+        daily[d]["concepts"].update(_split_names(row.get("solar_concepts", "")))
+    for d, info in daily.items():
+        cursor.execute(
+            "INSERT OR REPLACE INTO daily_summaries VALUES (?, ?, ?, ?, ?, ?)",
+            (d, len(info["titles"]), " | ".join(info["titles"]), "; ".join(info["persons"]),
+             "; ".join(info["orgs"]), "; ".join(info["concepts"])),
+        )
+    _write_meta(cursor, rules)
+    conn.commit()
+    t = time.perf_counter()
+    if _create_fts(cursor):
+        _insert_fts(cursor, fts_rows)
+    conn.commit()
+    fts_sec = time.perf_counter() - t
+    conn.close()
+    return fts_sec
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EntityDB 전체 구축 벤치마크")
+    parser.add_argument("--csv", help="엔티티 CSV")
+    parser.add_argument("--synthetic", type=int, default=0, help="합성 데이터 문서 수")
+    parser.add_argument("--rules", default=str(ENTITY_RULES_JSON))
+    args = parser.parse_args()
+
+    tmp_root = Path(tempfile.mkdtemp(prefix="entity_db_build_"))
+    csv_path = args.csv
+    if not csv_path:
+        if not args.synthetic:
+            parser.error("--csv 또는 --synthetic 중 하나가 필요합니다.")
+        csv_path = str(tmp_root / "synthetic.csv")
+        write_synthetic_csv(csv_path, args.synthetic)
+
+    results = []
+    fts_sec = 0.0
+    for name, fn in [("row-by-row", row_by_row_load), ("bulk", create_db)]:
+        db_path = tmp_root / f"{name}.db"
+        t = time.perf_counter()
+        out = fn(csv_path, str(db_path), args.rules)
+        results.append((name, time.perf_counter() - t, os.path.getsize(db_path) / 2**20))
+        fts_sec = out or fts_sec
+
+    # FTS(trigram) 구축은 두 방식이 같으므로 나머지(로드) 시간도 따로 보여준다
+    print(f"\n{'path':<14}{'total s':>10}{'load s':>10}{'DB MB':>10}")
+    for name, total, mb in results:
+        print(f"{name:<14}{total:>10.2f}{total - fts_sec:>10.2f}{mb:>10.1f}")
+    print(f"(FTS trigram 구축 {fts_sec:.2f}s 포함)")
+
+    for p in tmp_root.iterdir():
+        p.unlink()
+    tmp_root.rmdir()
+
+
+if __name__ == "__main__":
+    main()
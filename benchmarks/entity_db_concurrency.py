@@ -0,0 +1,132 @@
+"""
+EntityDB 동시 요청 벤치마크 (p50/p99)
+- shared: 이전 방식 — 연결 하나(check_same_thread=False)를 모든 스레드가 공유, /doc은 요청마다 connect/close
+- pool: 스레드별 읽기 전용 연결 (ReadOnlyPool, mode=ro, query_only, mmap, 큰 페이지 캐시)
+
+요청은 /doc 단건 조회, 엔티티 타임라인, 엔티티 검색, 키워드 트렌드를 섞어 보낸다
+(트렌드 결과 캐시는 끄고 잰다).
+
+사용법:
+  python -m benchmarks.entity_db_concurrency --db data/processed/current/entities.db
+  python -m benchmarks.entity_db_concurrency --synthetic 20000 --threads 1,4,8,16
+"""
+from __future__ import annotations
+import argparse
+import random
+import sqlite3
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from indexing.entity_db import EntityDB, create_db
+from benchmarks.entity_db_build import write_synthetic_csv
+
+
+class _SharedConnectionDB(EntityDB):
+    """이전 EntityDB: 연결 하나를 스레드풀 전체가 공유"""
+
+    def __init__(self, db_path: str):
+        self._shared = sqlite3.connect(db_path, check_same_thread=False)
+        self._shared.row_factory = sqlite3.Row
+        super().__init__(db_path, trend_cache_size=0)
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        return self._shared
+
+    def get_document(self, doc_id: str):
+        # 이전 /doc 엔드포인트: 요청마다 새 연결
+        conn = sqlite3.connect(self.db_path)
+        row = conn.execute(
+            "SELECT doc_id, date, title, persons, organizations, concepts "
+            "FROM documents WHERE doc_id = ?",
+            (doc_id,),
+        ).fetchone()
+        conn.close()
+        return row
+
+    def close(self):
+        self._shared.close()
+        super().close()
+
+
+def make_requests(db_path: str, n: int, seed: int = 0) -> list[tuple[str, str]]:
+    """(종류, 인자) 요청 목록: /doc 50%, 타임라인 20%, 엔티티 검색 20%, 트렌드 10%."""
+    conn = sqlite3.connect(db_path)
+    doc_ids = [r[0] for r in conn.execute("SELECT doc_id FROM documents")]
+    entities = [r[0] for r in conn.execute("""
+        SELECT e.name FROM entity e JOIN doc_entity de ON de.entity_id = e.id
+        GROUP BY e.id ORDER BY COUNT(*) DESC LIMIT 200
+    """)]
+    conn.close()
+    rng = random.Random(seed)
+    kinds = ["doc"] * 5 + ["timeline"] * 2 + ["entity"] * 2 + ["trend"]
+    requests = []
+    for _ in range(n):
+        kind = rng.choice(kinds)
+        requests.append((kind, rng.choice(doc_ids) if kind == "doc" else rng.choice(entities)))
+    return requests
+
+
+def run_request(db: EntityDB, kind: str, arg: str):
+    if kind == "doc":
+        return db.get_document(arg)
+    if kind == "timeline":
+        return db.get_entity_timeline(arg, granularity="month")
+    if kind == "entity":
+        return db.search_by_entity(arg, limit=20)
+    return db.get_trend_data(arg)
+
+
+def measure(db: EntityDB, requests: list[tuple[str, str]], threads: int) -> tuple[float, float, float]:
+    """요청들을 threads개 스레드로 보내 (p50 ms, p99 ms, 초당 요청 수)를 반환합니다."""
+    def timed(req):
+        t = time.perf_counter()
+        run_request(db, *req)
+        return (time.perf_counter() - t) * 1000
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as ex:
+        latencies = np.asarray(list(ex.map(timed, requests)))
+    elapsed = time.perf_counter() - start
+    return float(np.percentile(latencies, 50)), float(np.percentile(latencies, 99)), len(requests) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EntityDB 동시 요청 벤치마크")
+    parser.add_argument("--db", help="기존 엔티티 DB")
+    parser.add_argument("--synthetic", type=int, default=0, help="합성 데이터 문서 수")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--threads", default="1,4,8,16")
+    args = parser.parse_args()
+
+    tmp_dir = None
+    db_path = args.db
+    if not db_path:
+        if not args.synthetic:
+            parser.error("--db 또는 --synthetic 중 하나가 필요합니다.")
+        tmp_dir = tempfile.TemporaryDirectory(prefix="entity_db_concurrency_")
+        csv_path = str(Path(tmp_dir.name) / "synthetic.csv")
+        write_synthetic_csv(csv_path, args.synthetic)
+        db_path = str(Path(tmp_dir.name) / "entities.db")
+        create_db(csv_path, db_path)
+
+    requests = make_requests(db_path, args.requests)
+    print(f"\n{'mode':<8}{'threads':>8}{'p50 ms':>10}{'p99 ms':>10}{'req/s':>10}")
+    for threads in [int(t) for t in args.threads.split(",") if t]:
+        for name, db in [("shared", _SharedConnectionDB(db_path)),
+                         ("pool", EntityDB(db_path, trend_cache_size=0))]:
+            run_request(db, *requests[0])  # 워밍업
+            p50, p99, rps = measure(db, requests, threads)
+            print(f"{name:<8}{threads:>8}{p50:>10.2f}{p99:>10.2f}{rps:>10.0f}")
+            db.close()
+
+    if tmp_dir is not None:
+        tmp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+벡터 2단계 검색 recall@k 벤치마크
+- 기준: 전체 차원 float32 정확 검색
+- 비교: LocalVectorStore의 prefix(tier_dim) 1차 검색 + 전체 차원 재채점 (rescore_k별)
+
+사용법:
+  python -m benchmarks.vector_recall --store data/processed/vectors
+  python -m benchmarks.vector_recall --synthetic 50000 --dim 3072
+  옵션: --queries 200 --k 10 --tier-dims 128,256,512 --rescore-k 100,300,1000 --dtype int8
+"""
+from __future__ import annotations
+import argparse
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from indexing.local_vectors import LocalVectorStore, _normalize_rows
+
+
+def load_store_vectors(path: str) -> tuple[np.ndarray, list[str], list[dict]]:
+    """기존 로컬 저장소의 벡터(float32 복원)와 doc_id, payload를 읽습니다."""
+    s = LocalVectorStore(path)._maybe_reload()
+    if s is None or s.n_docs == 0:
+        raise SystemExit(f"빈 저장소: {path}")
+    X, doc_ids, payloads = [], [], []
+    for k, seg in enumerate(s.segments):
+        rows = s.live_rows(k)
+        X.append(seg.rows_float32(rows))
+        doc_ids += [seg.doc_ids[i] for i in rows]
+        payloads += [seg.payload(int(i)) for i in rows]
+    return np.concatenate(X), doc_ids, payloads
+
+
+def synthetic_vectors(n: int, dim: int, seed: int = 0) -> tuple[np.ndarray, list[str], list[dict]]:
+    """앞쪽 차원일수록 분산이 큰 (Matryoshka 임베딩과 비슷한) 군집 데이터를 만듭니다."""
+    rng = np.random.default_rng(seed)
+    scale = 1.0 / np.sqrt(1.0 + np.arange(dim) / 32.0)
+    centers = rng.standard_normal((max(8, n // 200), dim)) * scale
+    X = centers[rng.integers(0, len(centers), n)] + 0.6 * rng.standard_normal((n, dim)) * scale
+    doc_ids = [f"syn{i}" for i in range(n)]
+    payloads = [{"date": f"20{10 + i % 15}-{1 + i % 12:02d}-{1 + i % 28:02d}"} for i in range(n)]
+    return X.astype(np.float32), doc_ids, payloads
+
+
+def main():
+    parser = argparse.ArgumentParser(description="벡터 2단계 검색 recall@k 벤치마크")
+    parser.add_argument("--store", help="기존 로컬 벡터 저장소 디렉토리")
+    parser.add_argument("--synthetic", type=int, default=0, help="합성 데이터 문서 수")
+    parser.add_argument("--dim", type=int, default=3072)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--tier-dims", default="128,256,512")
+    parser.add_argument("--rescore-k", default="100,300,1000")
+    parser.add_argument("--dtype", default="float16", choices=["float16", "int8"])
+    args = parser.parse_args()
+
+    if args.store:
+        X, doc_ids, payloads = load_store_vectors(args.store)
+    elif args.synthetic:
+        X, doc_ids, payloads = synthetic_vectors(args.synthetic, args.dim)
+    else:
+        parser.error("--store 또는 --synthetic 중 하나가 필요합니다.")
+    n, dim = X.shape
+    print(f"문서 {n}개, {dim}차원, 쿼리 {args.queries}개, k={args.k}")
+
+    # 쿼리: 문서 벡터에 잡음을 섞어 만든다 (실제 쿼리처럼 문서와 완전히 같지 않게)
+    rng = np.random.default_rng(1)
+    Xn = _normalize_rows(X)
+    qi = rng.choice(n, size=min(args.queries, n), replace=False)
+    Q = _normalize_rows(Xn[qi] + 0.5 * rng.standard_normal((len(qi), dim)).astype(np.float32) / np.sqrt(dim))
+
+    # 기준: float32 전체 차원 정확 검색
+    t = time.perf_counter()
+    truth = []
+    for q in Q:
+        scores = Xn @ q
+        truth.append(set(np.argpartition(-scores, args.k - 1)[:args.k].tolist()))
+    base_ms = (time.perf_counter() - t) * 1000 / len(Q)
+    print(f"\n{'config':<28}{'recall@k':>10}{'ms/query':>10}{'1차 행렬 MB':>14}")
+    print(f"{'exact float32 (in RAM)':<28}{1.0:>10.3f}{base_ms:>10.2f}{n * dim * 4 / 2**20:>14.1f}")
+
+    id_to_row = {did: i for i, did in enumerate(doc_ids)}
+    tmp_root = Path(tempfile.mkdtemp(prefix="vector_recall_"))
+    try:
+        for tier_dim in [0] + [int(d) for d in args.tier_dims.split(",") if d]:
+            store = LocalVectorStore(str(tmp_root / f"tier{tier_dim}"), dtype=args.dtype, tier_dim=tier_dim)
+            store.create_collection(dim=dim, recreate=True)
+            store.upsert_documents(doc_ids, X, payloads)
+            rescore_ks = [0] if tier_dim == 0 else [int(r) for r in args.rescore_k.split(",") if r]
+            for rescore_k in rescore_ks:
+                store.rescore_k = rescore_k
+                hits = 0
+                t = time.perf_counter()
+                for q, gold in zip(Q, truth):
+                    found = store.search(q, top_k=args.k)
+                    hits += len({id_to_row[r["doc_id"]] for r in found} & gold)
+                ms = (time.perf_counter() - t) * 1000 / len(Q)
+                if tier_dim:
+                    name = f"{args.dtype} {tier_dim}d→{dim}d r={rescore_k}"
+                    mb = n * tier_dim * 4 / 2**20
+                else:
+                    name = f"{args.dtype} exact (memmap)"
+                    mb = n * dim * (2 if args.dtype == "float16" else 1) / 2**20
+                print(f"{name:<28}{hits / (len(Q) * args.k):>10.3f}{ms:>10.2f}{mb:>14.1f}")
+    finally:
+        shutil.rmtree(tmp_root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
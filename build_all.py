@@ -2,9 +2,13 @@
 전체 인덱스 빌드 스크립트
 사용법: python build_all.py <solar_csv_path> [openai_api_key] [--refresh-days N]
 
-1. SQLite 엔티티 DB 구축
+1. SQLite 엔티티 DB 구축 (타임라인 롤업, 월별 엔티티 공출현 인덱스 포함) + 문서 저장소
 2. BM25 인덱스 구축
 3. (OpenAI 키 제공시) 벡터 인덱스 구축
+4. 새 세대 공개 (current 링크 교체 → 실행 중인 API가 재시작 없이 교체)
+
+SQLite DB와 BM25 인덱스는 매번 data/processed/generations/<이름>/ 에 새로 쓰고,
+모든 단계가 성공했을 때만 current 링크를 바꾼다. 벡터 저장소는 세대와 무관하게 공유한다.
 """
 import argparse
 import os
@@ -17,7 +21,17 @@ ROOT = Path(__file__).resolve().parent
 sys.path.insert(0, str(ROOT))
 os.chdir(ROOT)  # 작업 디렉토리도 프로젝트 루트로 고정
 
-from config import PROCESSED_DIR, SQLITE_DB, BM25_INDEX, VECTOR_INDEX_DIR, QDRANT_URL
+from config import (
+    PROCESSED_DIR, SQLITE_DB, BM25_INDEX, BM25_NUM_WORKERS, TOKEN_CACHE_DB,
+    QDRANT_URL, KEEP_GENERATIONS,
+    VECTOR_BACKEND, LOCAL_VECTOR_DIR, LOCAL_VECTOR_DTYPE, LOCAL_VECTOR_IVF_MIN_DOCS,
+    LOCAL_VECTOR_TIER_DIM, QDRANT_QUANTIZATION, EMBED_CHECKPOINT_DB, EMBEDDING_MAX_CONCURRENCY,
+    VECTOR_MANIFEST_DB, ENTITY_RULES_JSON,
+)
+from indexing.generations import (
+    BM25_DIR_NAME, DOC_STORE_NAME, ENTITY_DB_NAME,
+    new_generation, publish_generation, prune_generations, resolve_index_paths,
+)
 
 
 def main():
@@ -36,14 +50,30 @@ def main():
     # 디렉토리 생성
     PROCESSED_DIR.mkdir(parents=True, exist_ok=True)
 
+    # 새 세대 디렉토리 (이전 세대는 증분 갱신의 기준)
+    prev_gen, prev_db, prev_bm25 = resolve_index_paths(PROCESSED_DIR, SQLITE_DB, BM25_INDEX)
+    gen_dir = new_generation(PROCESSED_DIR)
+    sqlite_db = gen_dir / ENTITY_DB_NAME
+    bm25_index = gen_dir / BM25_DIR_NAME
+    doc_store = gen_dir / DOC_STORE_NAME
+    print(f"새 세대: {gen_dir.name} (이전: {prev_gen.name if prev_gen else '없음'})")
+
     # ===== Step 1: SQLite Entity DB =====
     print("\n" + "=" * 60)
-    print("Step 1: SQLite Entity DB 구축")
+    print("Step 1: SQLite Entity DB + 문서 저장소 구축")
     print("=" * 60)
     start = time.time()
 
-    from indexing.entity_db import create_db
-    create_db(csv_path, str(SQLITE_DB))
+    from indexing.entity_db import create_db, sync_db
+    # 기본은 이전 세대 DB를 복사해 바뀐 문서만 반영. 전체 재구축은 FULL_REBUILD_DB=1.
+    if os.getenv("FULL_REBUILD_DB", "0") == "1":
+        create_db(csv_path, str(sqlite_db), rules_path=str(ENTITY_RULES_JSON))
+    else:
+        sync_db(csv_path, str(sqlite_db), rules_path=str(ENTITY_RULES_JSON), base_path=str(prev_db))
+
+    # 본문은 문서 저장소 한 벌만 두고 BM25/검색 결과는 doc_id로 참조한다
+    from indexing.doc_store import build_doc_store
+    build_doc_store(csv_path, str(doc_store))
 
     print(f"완료: {time.time() - start:.1f}초")
 
@@ -53,8 +83,15 @@ def main():
     print("=" * 60)
     start = time.time()
 
-    from indexing.bm25_index import build_bm25_index
-    build_bm25_index(csv_path, str(BM25_INDEX))
+    from indexing.bm25_index import build_bm25_index, update_bm25_index
+    # 기본은 증분 갱신. 전체 재빌드가 필요하면 FULL_REBUILD_BM25=1로 실행.
+    if os.getenv("FULL_REBUILD_BM25", "0") == "1":
+        build_bm25_index(csv_path, str(bm25_index), num_workers=BM25_NUM_WORKERS,
+                         token_cache_path=str(TOKEN_CACHE_DB), doc_store_path=str(doc_store))
+    else:
+        update_bm25_index(csv_path, str(bm25_index), num_workers=BM25_NUM_WORKERS,
+                          token_cache_path=str(TOKEN_CACHE_DB), base_path=str(prev_bm25),
+                          doc_store_path=str(doc_store))
 
     print(f"완료: {time.time() - start:.1f}초")
 
@@ -66,25 +103,48 @@ def main():
         start = time.time()
 
         from indexing.embedder import build_index
+        from indexing.local_vectors import open_vector_store
+        # 본문은 Step 1의 문서 저장소에 있으므로 벡터 payload에는 doc_id/필터 키만 둔다
+        store = open_vector_store(
+            VECTOR_BACKEND, QDRANT_URL, str(LOCAL_VECTOR_DIR), quantization=QDRANT_QUANTIZATION,
+            manifest_path=str(VECTOR_MANIFEST_DB), slim_payload=True,
+            dtype=LOCAL_VECTOR_DTYPE, ivf_min_docs=LOCAL_VECTOR_IVF_MIN_DOCS,
+            tier_dim=LOCAL_VECTOR_TIER_DIM,
+        )
         # 기본은 증분 임베딩. 전체 재빌드가 필요하면 FULL_REBUILD_VECTOR=1로 실행.
         recreate = os.getenv("FULL_REBUILD_VECTOR", "0") == "1"
-        build_index(csv_path, QDRANT_URL, openai_key, incremental=True, recreate=recreate, refresh_days=args.refresh_days)
+        build_index(csv_path, QDRANT_URL, openai_key, incremental=True, recreate=recreate,
+                    refresh_days=args.refresh_days, store=store,
+                    checkpoint_path=str(EMBED_CHECKPOINT_DB), max_concurrency=EMBEDDING_MAX_CONCURRENCY,
+                    slim_payload=True)
 
         print(f"완료: {time.time() - start:.1f}초")
     else:
         print("\n[Skip] 벡터 인덱스: OpenAI API 키가 없어서 건너뜁니다.")
         print("  벡터 인덱스 구축: python indexing/embedder.py <csv> <output_dir> <api_key>")
 
+    # ===== Step 4: 세대 공개 =====
+    print("\n" + "=" * 60)
+    print("Step 4: 새 세대 공개")
+    print("=" * 60)
+    publish_generation(PROCESSED_DIR, gen_dir)
+    removed = prune_generations(PROCESSED_DIR, keep=KEEP_GENERATIONS)
+    if removed:
+        print(f"  오래된 세대 삭제: {', '.join(removed)}")
+
     # ===== 완료 =====
     print("\n" + "=" * 60)
     print("빌드 완료!")
     print("=" * 60)
-    print(f"  SQLite DB: {SQLITE_DB}")
-    print(f"  BM25 Index: {BM25_INDEX}")
+    print(f"  Generation: {gen_dir}")
+    print(f"  SQLite DB: {sqlite_db}")
+    print(f"  BM25 Index: {bm25_index}")
+    print(f"  Doc Store: {doc_store}")
     if openai_key:
-        print(f"  Vector Index: {VECTOR_INDEX_DIR}")
+        print(f"  Vector Index: {LOCAL_VECTOR_DIR if VECTOR_BACKEND == 'local' else QDRANT_URL}")
 
-    print(f"\n서버 실행: python api/main.py")
+    print(f"\n실행 중인 API는 current 링크 변경을 감지해 새 세대로 교체합니다.")
+    print(f"서버 실행: python api/main.py")
     print(f"  OPENAI_API_KEY=... ANTHROPIC_API_KEY=... python api/main.py")
 
 
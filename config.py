@@ -20,17 +20,52 @@ PROCESSED_DIR = DATA_DIR / "processed"
 # 원본 데이터 파일
 SOLAR_ENTITIES_CSV = RAW_DATA_DIR / "slowletter_solar_entities.csv"
 ARCHIVES_CSV = RAW_DATA_DIR / "slowletter_data_archives.csv"
+ENTITY_RULES_JSON = BASE_DIR / "entity_rules.json"  # 엔티티 별칭 → 대표 이름
 
 # 인덱스 파일
+# build_all.py는 PROCESSED_DIR/generations/<이름>/ 에 entities.db, bm25/ 를 쓰고
+# PROCESSED_DIR/current 링크로 공개한다. 아래 경로는 세대 도입 전(legacy) 위치.
 SQLITE_DB = PROCESSED_DIR / "entities.db"
-BM25_INDEX = PROCESSED_DIR / "bm25_index.pkl"
+BM25_INDEX = PROCESSED_DIR / "bm25"                # 컬럼형 BM25 인덱스 디렉토리
+BM25_LEGACY_PICKLE = PROCESSED_DIR / "bm25_index.pkl"  # 구버전 pickle (변환용)
 VECTOR_INDEX_DIR = PROCESSED_DIR / "qdrant"
 
+# EntityDB 읽기 연결 (API 스레드마다 read-only 연결 하나씩, 연결마다 적용)
+ENTITY_DB_MMAP_MB = int(os.getenv("ENTITY_DB_MMAP_MB", "1024"))  # mmap 크기 (0이면 사용 안 함)
+ENTITY_DB_CACHE_MB = int(os.getenv("ENTITY_DB_CACHE_MB", "64"))   # 페이지 캐시
+
+# BM25 빌드 시 Kiwi 병렬 토큰화 스레드 수 (0 = 전체 코어)
+BM25_NUM_WORKERS = int(os.getenv("BM25_NUM_WORKERS", "0"))
+
+# 토큰화 캐시 (빌드: SQLite 영속 캐시, API: 쿼리 문자열 LRU)
+TOKEN_CACHE_DB = PROCESSED_DIR / "token_cache.db"
+QUERY_TOKEN_CACHE_SIZE = 4096
+
+# 인덱스 세대 관리
+KEEP_GENERATIONS = 3           # 보관할 세대 수
+GENERATION_POLL_SEC = 30       # API가 current 링크를 확인하는 주기 (0이면 감시 안 함)
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")  # /admin/reload 보호용 (비어 있으면 인증 없음)
+
 # Qdrant 설정
 # - 환경변수 QDRANT_URL이 있으면 서버 모드 (예: localhost:6333)
 # - 없으면 path 모드 (VECTOR_INDEX_DIR)
 QDRANT_URL = os.getenv("QDRANT_URL", str(VECTOR_INDEX_DIR))
 
+# 벡터 백엔드: "qdrant" (기본) | "local" (memmap 행렬, 여러 프로세스가 동시에 읽기 가능)
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "qdrant")
+LOCAL_VECTOR_DIR = PROCESSED_DIR / "vectors"
+LOCAL_VECTOR_DTYPE = os.getenv("LOCAL_VECTOR_DTYPE", "float16")  # "float16" | "int8"
+LOCAL_VECTOR_IVF_MIN_DOCS = 100000   # 문서 수가 이 이상이면 IVF 근사 검색 (0이면 항상 정확 검색)
+LOCAL_VECTOR_NPROBE = 16             # IVF 검색 시 살펴볼 목록 수
+LOCAL_VECTOR_TIER_DIM = 256          # 2단계 검색 1차 prefix 차원 (0이면 전체 차원만)
+LOCAL_VECTOR_RESCORE_K = 300         # 2단계 검색에서 전체 차원으로 재채점할 후보 수
+
+# Qdrant 양자화: "" (없음) | "scalar" (int8) | "binary". 원본 벡터는 디스크, 재채점에 사용
+QDRANT_QUANTIZATION = os.getenv("QDRANT_QUANTIZATION", "")
+
+# Qdrant 동기화 매니페스트 (doc_id → point_id/content_hash/date_ord, 증분 빌드 변경 감지용)
+VECTOR_MANIFEST_DB = PROCESSED_DIR / "vector_manifest.db"
+
 # API 키
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
 ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY", "")
@@ -39,12 +74,21 @@ ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY", "")
 EMBEDDING_MODEL = "text-embedding-3-large"
 EMBEDDING_DIM = 3072
 EMBEDDING_BATCH_SIZE = 100
+EMBEDDING_MAX_CONCURRENCY = int(os.getenv("EMBEDDING_MAX_CONCURRENCY", "4"))  # 동시 요청 수
+EMBED_CHECKPOINT_DB = PROCESSED_DIR / "embed_checkpoint.db"  # 대량 임베딩 재개용
+
+# 쿼리 임베딩 캐시 (LRU + SQLite, 3072차원 float32 ≈ 12KB/항목)
+EMBEDDING_CACHE_DB = PROCESSED_DIR / "embedding_cache.db"
+EMBEDDING_CACHE_SIZE = 1024                      # in-process LRU 항목 수
+EMBEDDING_CACHE_TTL_SEC = 30 * 24 * 3600         # 30일 (0이면 만료 없음)
+EMBEDDING_CACHE_MAX_ENTRIES = 20000              # SQLite 항목 상한 (0이면 무제한)
 
 # 검색 설정
 HYBRID_SEARCH_TOP_K = 30       # 초기 검색 결과 수
 RERANK_TOP_K = 10              # 리랭킹 후 최종 결과 수
 BM25_WEIGHT = 0.3              # 하이브리드 검색에서 BM25 비중
 VECTOR_WEIGHT = 0.7            # 하이브리드 검색에서 벡터 비중
+SEARCH_RESULT_CACHE_SIZE = 2048  # 하이브리드 검색 결과 캐시 항목 수 (0이면 사용 안 함)
 
 # 에이전트 설정
 AGENT_MODEL = "claude-sonnet-4-5-20250929"
@@ -3,10 +3,11 @@
 #
 # 순서:
 # 0) venv/.env 로드
-# 1) FastAPI/Streamlit 종료(로컬 Qdrant(path) 동시 접근 방지)
+# 1) (Qdrant path 모드일 때만) FastAPI/Streamlit 종료(로컬 Qdrant 동시 접근 방지)
+#    VECTOR_BACKEND=local 이면 여러 프로세스가 동시에 읽을 수 있으므로 종료하지 않는다.
 # 2) daily_update.sh 실행(크롤링/엔티티/웹CSV + (옵션) git push)
-# 3) build_all.py로 인덱스 재빌드(SQLite/BM25/Qdrant)
-# 4) FastAPI/Streamlit 재기동
+# 3) build_all.py로 새 인덱스 세대 빌드(SQLite/BM25/Qdrant)
+# 4) 종료했으면 재기동, 아니면 API가 새 세대로 무중단 교체
 
 set -euo pipefail
 
@@ -42,10 +43,17 @@ if [[ -f "$SCRIPT_DIR/.env" ]]; then
 fi
 
 # --- stop services (avoid qdrant path concurrency) ---
-echo "[0/4] stop services"
-pkill -f "uvicorn api\.main:app" 2>/dev/null || true
-pkill -f "streamlit run app.py" 2>/dev/null || true
-sleep 1
+# Qdrant 서버 모드(QDRANT_URL=host:port)면 API를 띄운 채로 빌드한다.
+STOPPED=0
+if [[ "${VECTOR_BACKEND:-qdrant}" != "local" && "${QDRANT_URL:-}" != *:* ]]; then
+  echo "[0/4] stop services (qdrant path mode)"
+  pkill -f "uvicorn api\.main:app" 2>/dev/null || true
+  pkill -f "streamlit run app.py" 2>/dev/null || true
+  STOPPED=1
+  sleep 1
+else
+  echo "[0/4] keep services running (qdrant server mode / local vectors)"
+fi
 
 # --- daily update ---
 echo "[1/4] daily_update.sh"
@@ -55,10 +63,16 @@ bash "$SCRIPT_DIR/daily_update.sh"
 echo "[2/4] build_all.py (rebuild rag indexes)"
 python -u "$SCRIPT_DIR/build_all.py" "$SCRIPT_DIR/data/raw/slowletter_solar_entities.csv"
 
-# --- restart services ---
-echo "[3/4] restart services"
-nohup uvicorn api.main:app --host 0.0.0.0 --port 8000 > "$SCRIPT_DIR/server.log" 2>&1 &
-nohup streamlit run app.py --server.port 8510 --server.headless true --server.address 127.0.0.1 > "$SCRIPT_DIR/streamlit.log" 2>&1 &
+# --- restart services / swap generation ---
+if [[ "$STOPPED" == "1" ]]; then
+  echo "[3/4] restart services"
+  nohup uvicorn api.main:app --host 0.0.0.0 --port 8000 > "$SCRIPT_DIR/server.log" 2>&1 &
+  nohup streamlit run app.py --server.port 8510 --server.headless true --server.address 127.0.0.1 > "$SCRIPT_DIR/streamlit.log" 2>&1 &
+else
+  echo "[3/4] swap index generation (/admin/reload)"
+  curl -s -X POST --max-time 120 -H "X-Admin-Token: ${ADMIN_TOKEN:-}" \
+    http://127.0.0.1:8000/admin/reload || true
+fi
 
 sleep 3
 
@@ -1,6 +1,6 @@
 #!/usr/bin/env bash
 # ec2_daily_update.sh — EC2 통합 파이프라인
-# 크롤링 + 엔티티 추출 + CSV 생성 + 인덱스 빌드 + nginx 갱신 + 서비스 재시작
+# 크롤링 + 엔티티 추출 + CSV 생성 + 인덱스 빌드 + nginx 갱신 + 서비스 재시작/인덱스 교체
 #
 # 듀얼 크론 스케줄:
 #   crontab:
@@ -42,6 +42,7 @@ fi
 
 # --- 코드 업데이트 (코드 변경사항만) ---
 echo "[1/8] git pull (코드 업데이트)"
+OLD_HEAD="$(git rev-parse HEAD)"
 git pull origin main || echo "[warn] git pull 실패, 기존 코드로 계속 진행"
 
 # --- 크롤링 + 엔티티 추출 ---
@@ -70,8 +71,8 @@ if ! python build_all.py data/raw/slowletter_solar_entities.csv --refresh-days "
   echo "[ERROR] 인덱스 빌드 실패, 기존 인덱스로 계속 진행"
 fi
 
-# --- nginx 정적 파일 갱신 + 서비스 재시작 ---
-echo "[8/8] nginx 갱신 + 서비스 재시작"
+# --- nginx 정적 파일 갱신 + 서비스 재시작/인덱스 교체 ---
+echo "[8/8] nginx 갱신 + 서비스 재시작/인덱스 교체"
 sudo cp index.html /var/www/slownews/index.html
 sudo cp data/raw/slowletter_web.csv /var/www/slownews/data/context/slowletter_web.csv 2>/dev/null || true
 sudo cp data/context/recent.json /var/www/slownews/data/context/recent.json 2>/dev/null || true
@@ -80,7 +81,15 @@ sudo cp data/context/recent.json /var/www/slownews/data/context/recent.json 2>/d
 CACHE_TS=$(date +%s)
 sudo sed -i "s|slowletter_web\.csv[^'\"]*|slowletter_web.csv?v=${CACHE_TS}|g" /var/www/slownews/index.html
 
-sudo systemctl restart slownews-api slownews-app
+# 코드가 바뀐 경우에만 재시작. 인덱스만 바뀌었으면 API가 새 세대로 무중단 교체한다.
+if [[ "$(git rev-parse HEAD)" != "$OLD_HEAD" ]]; then
+  echo "[deploy] 코드 변경 → 서비스 재시작"
+  sudo systemctl restart slownews-api slownews-app
+else
+  echo "[deploy] 코드 변경 없음 → 인덱스 세대 교체 (/admin/reload)"
+  curl -s -X POST --max-time 120 -H "X-Admin-Token: ${ADMIN_TOKEN:-}" \
+    http://127.0.0.1:8000/admin/reload || echo "[warn] reload 호출 실패 (감시 스레드가 교체)"
+fi
 
 sleep 3
 
@@ -2,16 +2,31 @@
 Kiwi 형태소 분석 기반 BM25 인덱스
 - 한국어 교착어 특성을 고려한 형태소 분석
 - 명사/동사/형용사 위주 토큰화
+- 컬럼형 디스크 포맷 (np.memmap으로 로드, 여러 워커가 OS 페이지 캐시 공유)
 """
 from __future__ import annotations
 import csv
+import hashlib
+import json
+import mmap
+import os
 import pickle
 import math
-from collections import Counter, defaultdict
+import shutil
+import time
+from collections import Counter
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Iterator, Optional
+
+import numpy as np
+
+from indexing.cache import TokenCache
+from indexing.dates import date_ordinal, range_ordinals
+from indexing.doc_store import DocStore
+from indexing.generations import swap_link
 
 try:
+    import kiwipiepy
     from kiwipiepy import Kiwi
     HAS_KIWI = True
 except ImportError:
@@ -20,6 +35,335 @@ except ImportError:
     print("Install: pip install kiwipiepy")
 
 
+# 디스크 포맷
+#   <path>/
+#     current -> versions/00000003   (save()마다 새 버전을 쓰고 링크를 원자적으로 교체)
+#     versions/00000003/
+#       meta.json          : 살아있는 문서 수, 평균 문서 길이, 세그먼트 목록, doc_store
+#       base/              : 기본 세그먼트 (이전 버전과 하드링크로 공유)
+#       base.deleted.npy   : bool[N], 삭제 표시 (삭제/교체가 없으면 없음)
+#       delta/             : 마지막 compact 이후 추가된 문서 (선택)
+#       delta.deleted.npy
+#
+# 세그먼트 (디렉토리 하나, v4까지는 <path> 또는 버전 디렉토리 자체가 세그먼트 하나였다)
+# - meta.json          : 문서 수, 평균 문서 길이 등
+# - vocab.json         : 토큰 목록 (term id = 리스트 인덱스)
+# - offsets.npy        : int64[V+1], term id별 포스팅 구간
+# - postings_doc.npy   : int32[P], 문서 번호
+# - postings_tf.npy    : int32[P], 문서 내 빈도
+# - doc_lengths.npy    : int32[N]
+# - doc_dates.npy      : int32[N], 날짜 ordinal (문서 번호는 날짜순 → 포스팅도 날짜순)
+# - doc_ids.json       : 문서 번호 → doc_id
+# - doc_hashes.json    : 문서 번호 → content_hash (증분 갱신 시 변경 감지)
+# - docs.jsonl         : 결과 표시용 메타데이터 (인덱스와 분리, 상위 K건만 읽음)
+# - docs_offsets.npy   : int64[N+1], docs.jsonl 바이트 오프셋
+#   (v4: meta.json의 doc_store가 공유 문서 저장소를 가리키면 docs.jsonl 없이 doc_id로 참조)
+INDEX_FORMAT = "slowletter-bm25"
+INDEX_VERSION = 5
+
+CURRENT_LINK_NAME = "current"
+VERSIONS_DIRNAME = "versions"
+KEEP_VERSIONS = 3  # current 포함, 이전 버전을 연 채로 있는 프로세스를 위해 조금 남긴다
+_INDEX_FILES = {
+    "meta.json", "vocab.json", "offsets.npy", "postings_doc.npy", "postings_tf.npy",
+    "doc_lengths.npy", "doc_dates.npy", "doc_ids.json", "doc_hashes.json", "docs.jsonl",
+    "docs_offsets.npy",
+}
+
+
+def _load_array(path: Path, use_mmap: bool = True) -> np.ndarray:
+    """.npy 배열을 읽기 전용 memmap으로 엽니다."""
+    return np.load(path, mmap_mode="r" if use_mmap else None)
+
+
+def _index_dir(path: Path) -> Path:
+    """current 링크가 가리키는 버전 디렉토리 (링크가 없으면 버전 도입 전 포맷인 path 자체)."""
+    try:
+        return path / os.readlink(path / CURRENT_LINK_NAME)
+    except OSError:
+        return path
+
+
+def _new_version(path: Path) -> Path:
+    """다음 번호의 (아직 공개되지 않은) 버전 디렉토리를 만듭니다."""
+    root = path / VERSIONS_DIRNAME
+    root.mkdir(parents=True, exist_ok=True)
+    numbers = [int(p.name) for p in root.iterdir() if p.name.isdigit()]
+    version = root / f"{max(numbers, default=0) + 1:08d}"
+    version.mkdir()
+    return version
+
+
+def _publish(path: Path, version: Path):
+    """current 링크를 version으로 교체하고 오래된 버전을 정리합니다.
+
+    읽는 프로세스는 이미 연 버전의 파일(memmap)을 계속 사용한다.
+    """
+    swap_link(path / CURRENT_LINK_NAME, version)
+    # 버전 도입 전 단일 디렉토리 파일은 이제 쓰지 않는다
+    for name in _INDEX_FILES:
+        (path / name).unlink(missing_ok=True)
+    versions = sorted(p for p in (path / VERSIONS_DIRNAME).iterdir() if p.name.isdigit())
+    for old in versions[:-KEEP_VERSIONS]:
+        if old != version:
+            shutil.rmtree(old, ignore_errors=True)
+
+
+def _link_segment(src: Path, dst: Path):
+    """세그먼트 파일들을 하드링크로 새 버전에 가져옵니다 (안 되면 복사)."""
+    dst.mkdir(parents=True)
+    for f in src.iterdir():
+        if f.name not in _INDEX_FILES or not f.is_file() or f.is_symlink():
+            continue
+        try:
+            os.link(f, dst / f.name)
+        except OSError:
+            shutil.copy2(f, dst / f.name)
+
+
+def _concat(parts: list[np.ndarray]) -> np.ndarray:
+    return np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+
+
+class _Segment:
+    """포스팅 세그먼트 하나 (기본 또는 델타).
+
+    문서 번호는 세그먼트 안에서 날짜순이다. 세그먼트의 배열은 만든 뒤 바뀌지 않고,
+    삭제는 deleted 표시(tombstone)로만 한다.
+    """
+
+    def __init__(self):
+        self.path: Optional[Path] = None  # 디스크 위치 (메모리에서 새로 만들었으면 None)
+        self.has_docs = False             # path에 docs.jsonl이 있는지
+        self.vocab: dict[str, int] = {}
+        self.offsets: np.ndarray = np.zeros(1, dtype=np.int64)
+        self.postings_doc: np.ndarray = np.zeros(0, dtype=np.int32)
+        self.postings_tf: np.ndarray = np.zeros(0, dtype=np.int32)
+        self.doc_lengths: np.ndarray = np.zeros(0, dtype=np.int32)
+        self.doc_dates: np.ndarray = np.zeros(0, dtype=np.int32)
+        self.doc_ids: list[str] = []
+        self.doc_hashes: list[str] = []
+        self.deleted: np.ndarray = np.zeros(0, dtype=bool)
+        self.n_deleted = 0
+        self._dead_df: dict[int, int] = {}  # term id → 삭제 표시된 포스팅 수 (조회한 term만)
+        self._norm: tuple = (None, None)    # (avgdl, length_norm)
+
+        # 결과 표시용 메타데이터: 메모리 목록, docs.jsonl, 공유 문서 저장소 중 하나
+        self._metadata: Optional[list[dict]] = None
+        self._docs_mm: Optional[mmap.mmap] = None
+        self._docs_offsets: Optional[np.ndarray] = None
+        self.doc_store: Optional[DocStore] = None
+        self._store_idx: Optional[np.ndarray] = None  # 문서 번호 → 문서 저장소 번호
+
+    @property
+    def n_docs(self) -> int:
+        return len(self.doc_ids)
+
+    def terms(self) -> list[str]:
+        terms = [""] * len(self.vocab)
+        for token, t in self.vocab.items():
+            terms[t] = token
+        return terms
+
+    def live_rows(self) -> np.ndarray:
+        return np.flatnonzero(~self.deleted)
+
+    def set_deleted(self, deleted: np.ndarray):
+        self.deleted = np.array(deleted, dtype=bool)
+        self.n_deleted = int(self.deleted.sum())
+        self._dead_df = {}
+
+    def mark_deleted(self, rows: np.ndarray):
+        rows = rows[~self.deleted[rows]]
+        self.deleted[rows] = True
+        self.n_deleted += len(rows)
+        self._dead_df = {}
+
+    def df(self, token: str) -> int:
+        """살아있는 문서 중 token을 가진 문서 수."""
+        t = self.vocab.get(token)
+        if t is None:
+            return 0
+        s, e = int(self.offsets[t]), int(self.offsets[t + 1])
+        if not self.n_deleted:
+            return e - s
+        dead = self._dead_df.get(t)
+        if dead is None:
+            dead = self._dead_df[t] = int(self.deleted[self.postings_doc[s:e]].sum())
+        return e - s - dead
+
+    def length_norm(self, k1: float, b: float, avg: float) -> np.ndarray:
+        """문서 길이 정규화 항 k1 * (1 - b + b * len(d) / avgdl) (avgdl이 바뀔 때만 다시 계산)."""
+        if self._norm[0] != avg:
+            self._norm = (avg, k1 * (1 - b + b * np.asarray(self.doc_lengths, dtype=np.float64) / avg))
+        return self._norm[1]
+
+    def date_range(self, date_start: Optional[str], date_end: Optional[str]) -> tuple[int, int]:
+        """날짜 범위에 해당하는 문서 번호 구간 [lo, hi)를 반환합니다."""
+        if not (date_start or date_end):
+            return 0, self.n_docs
+        lo_ord, hi_ord = range_ordinals(date_start, date_end)
+        lo = int(np.searchsorted(self.doc_dates, lo_ord, side="left"))
+        hi = int(np.searchsorted(self.doc_dates, hi_ord, side="right"))
+        return lo, max(lo, hi)
+
+    def entries(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """살아있는 문서의 포스팅을 (문서, term, tf) 항목 배열로 펼칩니다."""
+        term_of = np.repeat(np.arange(len(self.offsets) - 1), np.diff(self.offsets))
+        doc = np.asarray(self.postings_doc, dtype=np.int64)
+        tf = np.asarray(self.postings_tf, dtype=np.int64)
+        if self.n_deleted:
+            keep = ~self.deleted[doc]
+            return doc[keep], term_of[keep], tf[keep]
+        return doc, term_of, tf
+
+    def get_metadata(self, doc_idx: int) -> dict:
+        """문서 번호의 메타데이터(date/title/content/...)를 반환합니다."""
+        if self._metadata is not None:
+            return self._metadata[doc_idx]
+        if self._store_idx is not None:
+            j = int(self._store_idx[doc_idx])
+            return self.doc_store.get(j) if j >= 0 else {}
+        if self._docs_mm is None or self._docs_offsets is None:
+            return {}
+        s = int(self._docs_offsets[doc_idx])
+        e = int(self._docs_offsets[doc_idx + 1])
+        return json.loads(self._docs_mm[s:e].decode("utf-8"))
+
+    def attach_store(self, doc_store: DocStore):
+        """메타데이터를 공유 문서 저장소에서 읽게 합니다 (doc_id로 참조, 저장소 번호 순서와 무관)."""
+        self.doc_store = doc_store
+        self._store_idx = doc_store.indices(self.doc_ids)
+
+    @classmethod
+    def build(
+        cls,
+        terms: list[str],
+        entry_doc: np.ndarray,
+        entry_term: np.ndarray,
+        entry_tf: np.ndarray,
+        old_idx: np.ndarray,
+        doc_ids: list[str],
+        hashes: list[str],
+        metadata: list[dict],
+    ) -> "_Segment":
+        """(문서, term, tf) 항목 배열로부터 컬럼형 세그먼트를 만듭니다.
+
+        - 문서 번호는 날짜순으로 다시 매긴다 (포스팅이 날짜순이 되도록)
+        - 어떤 문서에도 남지 않은 term은 vocab에서 뺀다
+        old_idx[k]는 k번째 문서(doc_ids[k])가 entry_doc에서 쓰던 번호다.
+        """
+        n = len(doc_ids)
+        doc_dates = np.asarray([date_ordinal(m.get("date", "")) for m in metadata], dtype=np.int32)
+        order = np.argsort(doc_dates, kind="stable")
+
+        # 옛 문서 번호 → 새(날짜순) 번호
+        remap = np.full(int(old_idx.max()) + 1 if n else 0, -1, dtype=np.int64)
+        new_pos = np.empty(n, dtype=np.int64)
+        new_pos[order] = np.arange(n)
+        remap[old_idx] = new_pos
+        new_doc = remap[entry_doc]
+
+        # 살아있는 term만 사전순으로 다시 번호 매김
+        used = np.zeros(len(terms), dtype=bool)
+        used[entry_term] = True
+        live_terms = sorted(terms[t] for t in np.flatnonzero(used))
+        term_remap = np.full(len(terms), -1, dtype=np.int64)
+        vocab = {t: i for i, t in enumerate(live_terms)}
+        for t in np.flatnonzero(used):
+            term_remap[t] = vocab[terms[t]]
+        new_term = term_remap[entry_term]
+
+        perm = np.lexsort((new_doc, new_term))
+        counts = np.bincount(new_term, minlength=len(live_terms))
+        offsets = np.zeros(len(live_terms) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+
+        seg = cls()
+        seg.vocab = vocab
+        seg.offsets = offsets
+        seg.postings_doc = new_doc[perm].astype(np.int32)
+        seg.postings_tf = entry_tf[perm].astype(np.int32)
+        seg.doc_lengths = np.bincount(new_doc, weights=entry_tf, minlength=n).astype(np.int32)
+        seg.doc_dates = doc_dates[order]
+        seg.doc_ids = [doc_ids[i] for i in order]
+        seg.doc_hashes = [hashes[i] for i in order]
+        seg._metadata = [metadata[i] for i in order]
+        seg.deleted = np.zeros(n, dtype=bool)
+        return seg
+
+    def write(self, out_dir: Path, with_docs: bool):
+        """세그먼트 파일을 씁니다 (삭제 표시는 버전 디렉토리에 따로 둔다).
+
+        with_docs=False면 docs.jsonl을 쓰지 않는다 (공유 문서 저장소를 doc_id로 참조).
+        """
+        out_dir.mkdir(parents=True)
+        terms = self.terms()
+        np.save(out_dir / "offsets.npy", np.asarray(self.offsets, dtype=np.int64))
+        np.save(out_dir / "postings_doc.npy", np.asarray(self.postings_doc, dtype=np.int32))
+        np.save(out_dir / "postings_tf.npy", np.asarray(self.postings_tf, dtype=np.int32))
+        np.save(out_dir / "doc_lengths.npy", np.asarray(self.doc_lengths, dtype=np.int32))
+        np.save(out_dir / "doc_dates.npy", np.asarray(self.doc_dates, dtype=np.int32))
+        with open(out_dir / "vocab.json", "w", encoding="utf-8") as f:
+            json.dump(terms, f, ensure_ascii=False)
+        with open(out_dir / "doc_ids.json", "w", encoding="utf-8") as f:
+            json.dump(self.doc_ids, f, ensure_ascii=False)
+        with open(out_dir / "doc_hashes.json", "w", encoding="utf-8") as f:
+            json.dump(self.doc_hashes, f)
+
+        # 메타데이터는 별도 JSONL + 바이트 오프셋 (검색 시 상위 K건만 읽는다)
+        if with_docs:
+            docs_offsets = np.zeros(self.n_docs + 1, dtype=np.int64)
+            with open(out_dir / "docs.jsonl", "wb") as f:
+                for i in range(self.n_docs):
+                    line = (json.dumps(self.get_metadata(i), ensure_ascii=False) + "\n").encode("utf-8")
+                    f.write(line)
+                    docs_offsets[i + 1] = docs_offsets[i] + len(line)
+            np.save(out_dir / "docs_offsets.npy", docs_offsets)
+
+        # 세그먼트 디렉토리 하나만으로도 (삭제 표시 없는) 버전 도입 전 인덱스로 읽힌다
+        meta = {
+            "format": INDEX_FORMAT,
+            "version": INDEX_VERSION,
+            "n_docs": self.n_docs,
+            "n_terms": len(terms),
+            "n_postings": int(self.offsets[-1]),
+            "avg_doc_length": float(np.mean(self.doc_lengths)) if self.n_docs else 1.0,
+        }
+        with open(out_dir / "meta.json", "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+        self.path = out_dir
+        self.has_docs = with_docs
+
+    @classmethod
+    def load(cls, path: Path, use_mmap: bool = True) -> "_Segment":
+        """세그먼트 디렉토리를 엽니다 (배열은 memmap)."""
+        seg = cls()
+        seg.path = path
+        with open(path / "vocab.json", encoding="utf-8") as f:
+            seg.vocab = {t: i for i, t in enumerate(json.load(f))}
+        with open(path / "doc_ids.json", encoding="utf-8") as f:
+            seg.doc_ids = json.load(f)
+        if (path / "doc_hashes.json").exists():
+            with open(path / "doc_hashes.json", encoding="utf-8") as f:
+                seg.doc_hashes = json.load(f)
+        seg.offsets = _load_array(path / "offsets.npy", use_mmap)
+        seg.postings_doc = _load_array(path / "postings_doc.npy", use_mmap)
+        seg.postings_tf = _load_array(path / "postings_tf.npy", use_mmap)
+        seg.doc_lengths = _load_array(path / "doc_lengths.npy", use_mmap)
+        if (path / "doc_dates.npy").exists():
+            seg.doc_dates = _load_array(path / "doc_dates.npy", use_mmap)
+        seg.deleted = np.zeros(seg.n_docs, dtype=bool)
+
+        seg.has_docs = (path / "docs_offsets.npy").exists()
+        if seg.has_docs:
+            seg._docs_offsets = _load_array(path / "docs_offsets.npy", use_mmap)
+            if seg.n_docs > 0:
+                with open(path / "docs.jsonl", "rb") as f:
+                    seg._docs_mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return seg
+
+
 class KiwiBM25:
     """Kiwi 형태소 분석 기반 BM25 검색 엔진"""
 
@@ -27,100 +371,394 @@ class KiwiBM25:
     K1 = 1.5
     B = 0.75
 
-    def __init__(self):
+    # 토큰 선택 규칙(_select_tokens)이 바뀌면 올린다 (토큰 캐시 무효화)
+    TOKEN_RULES_VERSION = 1
+
+    def __init__(
+        self,
+        num_workers: Optional[int] = None,
+        token_cache: Optional[TokenCache] = None,
+        delta_ratio: float = 0.1,
+        max_dead_ratio: float = 0.2,
+    ):
+        """
+        num_workers: 인덱스 빌드용 Kiwi 분석 스레드 수 (0이면 전체 코어, None/1이면 단일 스레드)
+        token_cache: 토큰화 결과 캐시 (version이 비어 있으면 tokenizer_version으로 채운다)
+        delta_ratio, max_dead_ratio: compact 기준 (증분 갱신 참고)
+        """
+        if num_workers == 0:
+            num_workers = os.cpu_count() or 1
+        self._parallel = bool(num_workers and num_workers > 1)
+
         if HAS_KIWI:
-            self.kiwi = Kiwi()
+            self.kiwi = Kiwi(num_workers=num_workers) if self._parallel else Kiwi()
         else:
             self.kiwi = None
 
-        self.doc_ids: list[str] = []
-        self.doc_metadata: list[dict] = []
-        self.doc_tokens: list[list[str]] = []
-        self.df: Counter = Counter()  # Document frequency
-        self.doc_lengths: list[int] = []
-        self.avg_doc_length: float = 0.0
-        self.n_docs: int = 0
+        self.token_cache = token_cache
+        if token_cache is not None and not token_cache.version:
+            token_cache.version = self.tokenizer_version
+
+        # 증분 갱신: 델타가 기본 세그먼트의 delta_ratio배, 삭제 표시가 전체의 max_dead_ratio를 넘으면 합친다
+        self.delta_ratio = delta_ratio
+        self.max_dead_ratio = max_dead_ratio
 
-        # 역인덱스
-        self.inverted_index: dict[str, list[tuple[int, int]]] = defaultdict(list)
+        self.doc_store: Optional[DocStore] = None
+        self.segments: list[_Segment] = []  # [기본] 또는 [기본, 델타]
+        self._set_segments([_Segment()])
+
+    @property
+    def tokenizer_version(self) -> str:
+        """토큰 캐시 키에 들어가는 토크나이저 식별자."""
+        engine = f"kiwi-{kiwipiepy.__version__}" if self.kiwi else "whitespace"
+        return f"{engine}/rules-{self.TOKEN_RULES_VERSION}"
 
     def tokenize(self, text: str) -> list[str]:
-        """텍스트를 형태소 분석하여 토큰 리스트를 반환합니다.
+        """텍스트를 형태소 분석하여 토큰 리스트를 반환합니다 (캐시 우선)."""
+        if self.token_cache is None:
+            return self._tokenize(text)
+        tokens = self.token_cache.get(text)
+        if tokens is None:
+            tokens = self._tokenize(text)
+            self.token_cache.put_many([text], [tokens])
+        return tokens
+
+    def tokenize_many(self, texts: Iterable[str]) -> Iterator[list[str]]:
+        """여러 텍스트를 순서대로 토큰화합니다 (tokenize와 같은 결과, 캐시 우선)."""
+        if self.token_cache is None:
+            return self._tokenize_many(texts)
+        return iter(self.token_cache.tokenize_many(texts, self._tokenize_many))
+
+    def _tokenize(self, text: str) -> list[str]:
+        if self.kiwi:
+            return self._select_tokens(self.kiwi.tokenize(text))
+
+        # Fallback: 간단한 공백 분리
+        return [w.lower() for w in text.split() if len(w) >= 2]
+
+    def _tokenize_many(self, texts: Iterable[str]) -> Iterator[list[str]]:
+        """여러 텍스트를 순서대로 토큰화합니다.
+
+        멀티스레드 Kiwi(num_workers > 1)에 Iterable을 넘기면 내부 워커 스레드로 병렬
+        분석하고 입력 순서대로 결과를 돌려준다. 인덱스 빌드에서 사용한다.
+        """
+        if self.kiwi and self._parallel:
+            for result in self.kiwi.tokenize(iter(texts)):
+                yield self._select_tokens(result)
+            return
+
+        for text in texts:
+            yield self._tokenize(text)
+
+    @staticmethod
+    def _select_tokens(result) -> list[str]:
+        """Kiwi 분석 결과에서 색인할 토큰을 고릅니다.
 
         주의:
         - Kiwi는 한국인 인명(예: "김/낙/호")을 1글자 단위로 쪼개는 경우가 있어,
           기존 규칙(1글자 한국어 제외)을 그대로 적용하면 인명 검색이 거의 불가능해집니다.
         - 그래서 "연속된 1글자 명사(NN*)"는 합쳐서(예: 김+낙+호 → 김낙호) 토큰으로 추가합니다.
         """
-        if self.kiwi:
-            result = self.kiwi.tokenize(text)
-
-            tokens: list[str] = []
-            hangul_nn_1char_buf: list[str] = []
-
-            def flush_buf():
-                nonlocal hangul_nn_1char_buf, tokens
-                if len(hangul_nn_1char_buf) >= 2:
-                    tokens.append("".join(hangul_nn_1char_buf))
-                hangul_nn_1char_buf = []
+        tokens: list[str] = []
+        hangul_nn_1char_buf: list[str] = []
 
-            for token in result:
-                tag = token.tag
-                form = token.form.lower()
+        def flush_buf():
+            nonlocal hangul_nn_1char_buf, tokens
+            if len(hangul_nn_1char_buf) >= 2:
+                tokens.append("".join(hangul_nn_1char_buf))
+            hangul_nn_1char_buf = []
 
-                is_hangul_1char_nn = (
-                    tag.startswith("NN")
-                    and len(form) == 1
-                    and ('가' <= form <= '힣')
-                )
-
-                if is_hangul_1char_nn:
-                    hangul_nn_1char_buf.append(form)
-                    continue
+        for token in result:
+            tag = token.tag
+            form = token.form.lower()
 
-                # 버퍼를 끊는 지점
-                flush_buf()
+            is_hangul_1char_nn = (
+                tag.startswith("NN")
+                and len(form) == 1
+                and ('가' <= form <= '힣')
+            )
 
-                # 명사(NNG, NNP), 동사(VV), 형용사(VA), 외래어(SL/SH) 등
-                if tag.startswith(("NN", "VV", "VA", "SL", "SH")):
-                    # 1글자 한국어는 노이즈가 많아 기본적으로 제외하되,
-                    # 외래어(SL)는 1글자여도 남긴다.
-                    if len(form) >= 2 or tag.startswith(("SL", "SH")):
-                        tokens.append(form)
+            if is_hangul_1char_nn:
+                hangul_nn_1char_buf.append(form)
+                continue
 
+            # 버퍼를 끊는 지점
             flush_buf()
-            return tokens
 
-        # Fallback: 간단한 공백 분리
-        return [w.lower() for w in text.split() if len(w) >= 2]
+            # 명사(NNG, NNP), 동사(VV), 형용사(VA), 외래어(SL/SH) 등
+            if tag.startswith(("NN", "VV", "VA", "SL", "SH")):
+                # 1글자 한국어는 노이즈가 많아 기본적으로 제외하되,
+                # 외래어(SL)는 1글자여도 남긴다.
+                if len(form) >= 2 or tag.startswith(("SL", "SH")):
+                    tokens.append(form)
 
-    def build_index(self, doc_ids: list[str], texts: list[str], metadata: list[dict]):
-        """BM25 인덱스를 구축합니다."""
-        self.doc_ids = doc_ids
-        self.doc_metadata = metadata
-        self.n_docs = len(doc_ids)
+        flush_buf()
+        return tokens
 
-        print(f"Tokenizing {self.n_docs} documents...")
-        for i, text in enumerate(texts):
-            tokens = self.tokenize(text)
-            self.doc_tokens.append(tokens)
-            self.doc_lengths.append(len(tokens))
+    @staticmethod
+    def content_hash(text: str, metadata: Optional[dict] = None) -> str:
+        """문서 변경 감지용 해시 (색인 텍스트 + 메타데이터)."""
+        payload = json.dumps([text, metadata or {}], ensure_ascii=False, sort_keys=True)
+        return hashlib.sha1(payload.encode("utf-8", errors="ignore")).hexdigest()
+
+    def build_index(
+        self,
+        doc_ids: list[str],
+        texts: list[str],
+        metadata: list[dict],
+        hashes: Optional[list[str]] = None,
+    ):
+        """BM25 인덱스를 구축합니다 (기본 세그먼트 하나)."""
+        if hashes is None:
+            hashes = [self.content_hash(t, m) for t, m in zip(texts, metadata)]
+        terms: list[str] = []
+        entry_doc, entry_term, entry_tf = self._collect(texts, terms, {}, 0)
+        self._set_segments([_Segment.build(
+            terms, _concat(entry_doc), _concat(entry_term), _concat(entry_tf),
+            np.arange(len(doc_ids)), list(doc_ids), list(hashes), list(metadata),
+        )])
+        print(f"Index built: {len(self.segments[0].vocab)} unique tokens, avg doc length: {self.avg_doc_length:.1f}")
 
-            # DF 계산 (문서당 한 번만)
-            unique_tokens = set(tokens)
-            for token in unique_tokens:
-                self.df[token] += 1
+    def _collect(
+        self, texts: list[str], terms: list[str], vocab: dict[str, int], first_doc: int,
+    ) -> tuple[list[np.ndarray], list[np.ndarray], list[np.ndarray]]:
+        """문서를 토큰화해 (문서, term, tf) 항목을 만듭니다.
 
-            # 역인덱스 구축
+        i번째 문서의 번호는 first_doc + i. 처음 보는 토큰은 terms/vocab에 붙인다.
+        """
+        entry_doc, entry_term, entry_tf = [], [], []
+        n = len(texts)
+        print(f"Tokenizing {n} documents...")
+        start = time.time()
+        for i, tokens in enumerate(self.tokenize_many(texts)):
             tf = Counter(tokens)
-            for token, count in tf.items():
-                self.inverted_index[token].append((i, count))
+            term_ids = np.empty(len(tf), dtype=np.int64)
+            counts = np.empty(len(tf), dtype=np.int64)
+            for j, (token, count) in enumerate(tf.items()):
+                t = vocab.get(token)
+                if t is None:
+                    t = vocab[token] = len(terms)
+                    terms.append(token)
+                term_ids[j] = t
+                counts[j] = count
+            entry_doc.append(np.full(len(tf), first_doc + i, dtype=np.int64))
+            entry_term.append(term_ids)
+            entry_tf.append(counts)
 
             if (i + 1) % 5000 == 0:
-                print(f"  Processed {i + 1}/{self.n_docs}")
+                rate = (i + 1) / max(time.time() - start, 1e-9)
+                print(f"  Processed {i + 1}/{n} ({rate:.0f} docs/sec)")
+
+        elapsed = time.time() - start
+        print(f"Tokenized {n} documents in {elapsed:.1f}s ({n / max(elapsed, 1e-9):.0f} docs/sec)")
+        return entry_doc, entry_term, entry_tf
+
+    # ===== 증분 갱신 =====
+    #
+    # 인덱스는 기본 세그먼트 + (선택) 델타 세그먼트. 세그먼트 배열은 바뀌지 않는다.
+    # - 삭제: 세그먼트의 deleted 표시(tombstone)만 켠다. DF는 검색 시 조회한 term에 한해
+    #   삭제 표시를 빼고 센다 (포스팅 전체를 훑지 않는다).
+    # - 추가: 델타의 살아있는 문서 + 새 문서로 델타만 다시 만든다.
+    # - 델타가 기본의 delta_ratio를 넘거나 삭제 표시가 max_dead_ratio를 넘으면
+    #   compact()가 하나의 기본 세그먼트로 합친다 (포스팅 전체 재정렬은 이때만).
+    # n_docs, avg_doc_length는 변경마다 바로 맞춘다.
+
+    def _set_segments(self, segments: list[_Segment]):
+        self.segments = segments
+        self._doc_index = None
+        self.n_docs = sum(seg.n_docs - seg.n_deleted for seg in segments)
+        self._total_length = sum(
+            int(np.asarray(seg.doc_lengths, dtype=np.int64)[~seg.deleted].sum()) for seg in segments
+        )
+        self._update_avg()
+
+    def _update_avg(self):
+        self.avg_doc_length = self._total_length / self.n_docs if self.n_docs > 0 else 1.0
+
+    @property
+    def dirty(self) -> bool:
+        """델타 세그먼트나 삭제 표시가 있는지 (compact하면 기본 세그먼트 하나만 남는다)."""
+        return len(self.segments) > 1 or self.segments[0].n_deleted > 0
+
+    def _needs_compact(self) -> bool:
+        base = self.segments[0]
+        n_delta = sum(seg.n_docs for seg in self.segments[1:])
+        n_dead = sum(seg.n_deleted for seg in self.segments)
+        return (n_delta > self.delta_ratio * max(base.n_docs, 1)
+                or n_dead > self.max_dead_ratio * max(base.n_docs + n_delta, 1))
+
+    def _locations(self) -> dict[str, tuple[int, int]]:
+        """살아있는 문서의 doc_id → (세그먼트, 문서 번호)."""
+        if self._doc_index is None:
+            self._doc_index = {}
+            for k, seg in enumerate(self.segments):
+                for i, (doc_id, dead) in enumerate(zip(seg.doc_ids, seg.deleted)):
+                    if not dead:
+                        self._doc_index[doc_id] = (k, i)
+        return self._doc_index
+
+    def hashes(self) -> dict[str, str]:
+        """살아있는 문서의 doc_id → content_hash (해시가 없는 구버전 인덱스면 빈 문자열)."""
+        out = {}
+        for seg in self.segments:
+            hashes = seg.doc_hashes or [""] * seg.n_docs
+            for doc_id, h, dead in zip(seg.doc_ids, hashes, seg.deleted):
+                if not dead:
+                    out[doc_id] = h
+        return out
+
+    def add_documents(
+        self,
+        doc_ids: list[str],
+        texts: list[str],
+        metadata: list[dict],
+        hashes: Optional[list[str]] = None,
+    ):
+        """문서를 추가합니다. 이미 있는 doc_id면 교체합니다.
+
+        기본 세그먼트는 건드리지 않고, 델타의 살아있는 문서 + 새 문서로 델타를 다시 만든다.
+        """
+        if not doc_ids:
+            return
+        if hashes is None:
+            hashes = [self.content_hash(t, m) for t, m in zip(texts, metadata)]
+
+        # 교체 대상은 먼저 삭제
+        index = self._locations()
+        self.delete_documents([d for d in doc_ids if d in index])
+
+        old = self.segments[1] if len(self.segments) > 1 else _Segment()
+        live = old.live_rows()
+        terms = old.terms()
+        old_doc, old_term, old_tf = old.entries()
+        entry_doc, entry_term, entry_tf = self._collect(texts, terms, dict(old.vocab), old.n_docs)
+        delta = _Segment.build(
+            terms,
+            _concat([old_doc] + entry_doc),
+            _concat([old_term] + entry_term),
+            _concat([old_tf] + entry_tf),
+            np.concatenate([live, old.n_docs + np.arange(len(doc_ids))]),
+            [old.doc_ids[i] for i in live] + list(doc_ids),
+            [old.doc_hashes[i] for i in live] + list(hashes),
+            [old.get_metadata(i) for i in live] + list(metadata),
+        )
+
+        old_length = int(np.asarray(old.doc_lengths, dtype=np.int64)[live].sum())
+        self._total_length += int(np.asarray(delta.doc_lengths, dtype=np.int64).sum()) - old_length
+        self.n_docs += len(doc_ids)
+        self._update_avg()
+        self.segments = [self.segments[0], delta]
+        for i, doc_id in enumerate(delta.doc_ids):
+            index[doc_id] = (1, i)
+
+        if self._needs_compact():
+            self.compact()
+
+    def delete_documents(self, doc_ids: list[str]) -> int:
+        """doc_id 목록에 삭제 표시를 합니다. 삭제된 문서 수를 반환합니다."""
+        index = self._locations()
+        rows: list[list[int]] = [[] for _ in self.segments]
+        for doc_id in doc_ids:
+            loc = index.pop(doc_id, None)
+            if loc is not None:
+                rows[loc[0]].append(loc[1])
+
+        deleted = 0
+        for seg, seg_rows in zip(self.segments, rows):
+            if not seg_rows:
+                continue
+            seg_rows = np.asarray(seg_rows, dtype=np.int64)
+            seg.mark_deleted(seg_rows)
+            self._total_length -= int(np.asarray(seg.doc_lengths, dtype=np.int64)[seg_rows].sum())
+            deleted += len(seg_rows)
+
+        self.n_docs -= deleted
+        self._update_avg()
+        return deleted
 
-        self.avg_doc_length = sum(self.doc_lengths) / self.n_docs if self.n_docs > 0 else 1.0
-        print(f"Index built: {len(self.df)} unique tokens, avg doc length: {self.avg_doc_length:.1f}")
+    def compact(self):
+        """모든 세그먼트의 살아있는 문서를 기본 세그먼트 하나로 합칩니다."""
+        terms: list[str] = []
+        vocab: dict[str, int] = {}
+        entry_doc, entry_term, entry_tf, old_idx = [], [], [], []
+        doc_ids, hashes, metadata = [], [], []
+        first = 0
+        for seg in self.segments:
+            # 세그먼트 term id → 합친 vocab의 term id
+            term_map = np.empty(len(seg.vocab), dtype=np.int64)
+            for t, token in enumerate(seg.terms()):
+                j = vocab.get(token)
+                if j is None:
+                    j = vocab[token] = len(terms)
+                    terms.append(token)
+                term_map[t] = j
+            doc, term, tf = seg.entries()
+            live = seg.live_rows()
+            entry_doc.append(doc + first)
+            entry_term.append(term_map[term])
+            entry_tf.append(tf)
+            old_idx.append(live + first)
+            doc_ids += [seg.doc_ids[i] for i in live]
+            hashes += [seg.doc_hashes[i] if i < len(seg.doc_hashes) else "" for i in live]
+            metadata += [seg.get_metadata(i) for i in live]
+            first += seg.n_docs
+
+        self._set_segments([_Segment.build(
+            terms, _concat(entry_doc), _concat(entry_term), _concat(entry_tf),
+            _concat(old_idx), doc_ids, hashes, metadata,
+        )])
+
+    def df(self, token: str) -> int:
+        """토큰의 문서 빈도(DF)를 반환합니다 (모든 세그먼트, 삭제 표시 제외)."""
+        return sum(seg.df(token) for seg in self.segments)
+
+    def score_tokens(
+        self, seg: _Segment, weights: list[tuple[str, float]], lo: int = 0, hi: Optional[int] = None,
+    ) -> np.ndarray:
+        """세그먼트 하나에서 쿼리 토큰별 포스팅을 배열 연산으로 점수화해 dense 점수 버퍼를 반환합니다.
+
+        weights는 (토큰, IDF) 목록 (IDF는 모든 세그먼트 기준이라 호출하는 쪽에서 계산한다).
+        lo/hi가 주어지면 문서 번호 [lo, hi) 구간만 점수화하고, 버퍼의 i번째 값은
+        문서 lo + i의 점수입니다. 포스팅이 날짜순이므로 구간은 이진 탐색으로 자릅니다.
+        삭제 표시된 문서의 점수는 0입니다.
+        """
+        if hi is None:
+            hi = seg.n_docs
+        restricted = lo > 0 or hi < seg.n_docs
+        length_norm = seg.length_norm(self.K1, self.B, self.avg_doc_length or 1.0)
+
+        scores = np.zeros(hi - lo, dtype=np.float64)
+        for token, idf in weights:
+            t = seg.vocab.get(token)
+            if t is None:
+                continue
+
+            s, e = int(seg.offsets[t]), int(seg.offsets[t + 1])
+            docs = seg.postings_doc[s:e]
+            if restricted:
+                a = int(np.searchsorted(docs, lo, side="left"))
+                b = int(np.searchsorted(docs, hi, side="left"))
+                if a >= b:
+                    continue
+                docs = docs[a:b]
+                s, e = s + a, s + b
+
+            # term 하나의 포스팅에는 같은 문서가 한 번만 나오므로 fancy-index 누적이 안전하다.
+            tf = seg.postings_tf[s:e].astype(np.float64)
+            scores[docs - lo] += idf * (tf * (self.K1 + 1)) / (tf + length_norm[docs])
+        if seg.n_deleted:
+            scores[seg.deleted[lo:hi]] = 0.0
+        return scores
+
+    @staticmethod
+    def _top_k(scores: np.ndarray, candidates: np.ndarray, k: int) -> np.ndarray:
+        """후보 문서 중 점수 상위 k개를 argpartition으로 골라 내림차순으로 반환합니다."""
+        if k <= 0 or len(candidates) == 0:
+            return candidates[:0]
+        if len(candidates) > k:
+            part = np.argpartition(-scores[candidates], k - 1)[:k]
+            candidates = candidates[part]
+        return candidates[np.argsort(-scores[candidates], kind="stable")]
 
     def search(
         self,
@@ -129,45 +767,35 @@ class KiwiBM25:
         date_start: Optional[str] = None,
         date_end: Optional[str] = None,
     ) -> list[dict]:
-        """BM25 검색을 수행합니다."""
+        """BM25 검색을 수행합니다 (세그먼트별 상위 top_k를 점수순으로 합친다)."""
         query_tokens = self.tokenize(query)
-        if not query_tokens:
+        if not query_tokens or self.n_docs == 0:
             return []
 
-        scores = defaultdict(float)
-
+        # IDF는 기간과 무관하게 전체 코퍼스 기준
+        weights = []
         for token in query_tokens:
-            if token not in self.inverted_index:
-                continue
+            df = self.df(token)
+            if df > 0:
+                weights.append((token, math.log((self.n_docs - df + 0.5) / (df + 0.5) + 1.0)))
+        if not weights:
+            return []
 
-            # IDF
-            df = self.df[token]
-            idf = math.log((self.n_docs - df + 0.5) / (df + 0.5) + 1.0)
-
-            for doc_idx, tf in self.inverted_index[token]:
-                # 날짜 필터
-                if date_start or date_end:
-                    doc_date = self.doc_metadata[doc_idx].get("date", "")
-                    if date_start and doc_date < date_start:
-                        continue
-                    if date_end and doc_date > date_end:
-                        continue
-
-                # BM25 점수
-                doc_len = self.doc_lengths[doc_idx]
-                tf_norm = (tf * (self.K1 + 1)) / (
-                    tf + self.K1 * (1 - self.B + self.B * doc_len / self.avg_doc_length)
-                )
-                scores[doc_idx] += idf * tf_norm
-
-        # 정렬 및 상위 K개 반환
-        ranked = sorted(scores.items(), key=lambda x: x[1], reverse=True)[:top_k]
+        hits = []
+        for seg in self.segments:
+            lo, hi = seg.date_range(date_start, date_end)
+            if lo >= hi:
+                continue
+            scores = self.score_tokens(seg, weights, lo, hi)
+            for i in self._top_k(scores, np.flatnonzero(scores), top_k).tolist():
+                hits.append((float(scores[i]), seg, i + lo))
+        hits.sort(key=lambda h: -h[0])
 
         results = []
-        for doc_idx, score in ranked:
-            meta = self.doc_metadata[doc_idx]
+        for score, seg, doc_idx in hits[:top_k]:
+            meta = seg.get_metadata(doc_idx)
             results.append({
-                "doc_id": self.doc_ids[doc_idx],
+                "doc_id": seg.doc_ids[doc_idx],
                 "score": score,
                 "date": meta.get("date", ""),
                 "title": meta.get("title", ""),
@@ -179,41 +807,133 @@ class KiwiBM25:
 
         return results
 
-    def save(self, path: str):
-        """인덱스를 파일로 저장합니다."""
-        data = {
-            "doc_ids": self.doc_ids,
-            "doc_metadata": self.doc_metadata,
-            "doc_tokens": self.doc_tokens,
-            "df": dict(self.df),
-            "doc_lengths": self.doc_lengths,
-            "avg_doc_length": self.avg_doc_length,
+    def save(self, path: str, doc_store_path: Optional[str] = None):
+        """인덱스를 컬럼형 디렉토리로 저장합니다.
+
+        새 버전 디렉토리(versions/<번호>/)에 모두 쓴 뒤 current 링크를 원자적으로 교체한다
+        (indexing.generations와 같은 방식). load()는 링크를 한 번 읽고 그 버전의 파일만
+        열므로, 저장 중에 여는 프로세스도 이전 또는 새 인덱스 중 하나를 온전히 읽는다.
+        디스크에서 연 세그먼트는 하드링크로 재사용하고 삭제 표시와 새 델타만 쓴다.
+        델타나 삭제 표시가 기준을 넘었으면 먼저 compact()한다.
+
+        doc_store_path: 공유 문서 저장소. 주면 docs.jsonl을 쓰지 않고 상대 경로만 기록한다.
+        """
+        if self._needs_compact():
+            self.compact()
+
+        out_dir = Path(path)
+        version = _new_version(out_dir)
+        with_docs = doc_store_path is None
+
+        segments = []
+        for name, seg in zip(("base", "delta"), self.segments):
+            if name == "delta" and seg.n_docs == seg.n_deleted:
+                continue
+            if seg.path is not None and seg.has_docs == with_docs:
+                _link_segment(seg.path, version / name)
+                seg.path = version / name
+            else:
+                seg.write(version / name, with_docs)
+            deleted = None
+            if seg.n_deleted:
+                deleted = f"{name}.deleted.npy"
+                np.save(version / deleted, seg.deleted)
+            segments.append({"name": name, "deleted": deleted})
+
+        meta = {
+            "format": INDEX_FORMAT,
+            "version": INDEX_VERSION,
             "n_docs": self.n_docs,
-            "inverted_index": dict(self.inverted_index),
+            "avg_doc_length": self.avg_doc_length,
+            "segments": segments,
         }
-        with open(path, "wb") as f:
-            pickle.dump(data, f)
-        print(f"BM25 index saved: {path}")
+        if doc_store_path is not None:
+            meta["doc_store"] = os.path.relpath(Path(doc_store_path).resolve(), version.resolve())
+        with open(version / "meta.json", "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+
+        _publish(out_dir, version)
+        print(f"BM25 index saved: {out_dir} ({', '.join(s['name'] for s in segments)})")
+
+    def load(self, path: str, use_mmap: bool = True, doc_store: Optional[DocStore] = None):
+        """인덱스를 로드합니다.
+
+        - 디렉토리: 컬럼형 포맷 (current 링크가 가리키는 버전, 배열은 memmap으로 열려 거의 복사가 없음)
+        - .pkl 파일: 구버전 pickle (메모리에서 변환, convert_pickle_index 권장)
+
+        doc_store: 이미 연 공유 문서 저장소 (없으면 meta.json의 doc_store 경로를 연다)
+        """
+        p = Path(path)
+        if not p.is_dir():
+            self._load_pickle(p)
+            return
+        p = _index_dir(p)
+
+        with open(p / "meta.json", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("format") != INDEX_FORMAT:
+            raise ValueError(f"Not a BM25 index directory: {p}")
+
+        if "segments" in meta:
+            segments = []
+            for entry in meta["segments"]:
+                seg = _Segment.load(p / entry["name"], use_mmap)
+                if entry.get("deleted"):
+                    seg.set_deleted(np.load(p / entry["deleted"]))
+                segments.append(seg)
+        else:
+            # v4 이전: 디렉토리 자체가 세그먼트 하나
+            segments = [_Segment.load(p, use_mmap)]
 
-    def load(self, path: str):
-        """파일에서 인덱스를 로드합니다."""
+        if meta.get("doc_store"):
+            self.doc_store = doc_store or DocStore(str(p / meta["doc_store"]))
+            for seg in segments:
+                seg.attach_store(self.doc_store)
+
+        if meta.get("version", 1) < 2:
+            # v1: 날짜 배열이 없고 포스팅이 날짜순이 아니므로 메모리에서 재정렬한다.
+            seg = segments[0]
+            segments = [_Segment.build(
+                seg.terms(), *seg.entries(), np.arange(seg.n_docs), seg.doc_ids, [""] * seg.n_docs,
+                [seg.get_metadata(i) for i in range(seg.n_docs)],
+            )]
+            print(f"  (v1 index: re-sorted by date in memory, rebuild to persist)")
+
+        self._set_segments(segments)
+        n_terms = sum(len(seg.vocab) for seg in segments)
+        print(f"BM25 index loaded: {self.n_docs} docs, {n_terms} tokens, {len(segments)} segment(s)")
+
+    def _load_pickle(self, path: Path):
+        """구버전 pickle 인덱스를 읽어 컬럼형 구조로 변환합니다."""
         with open(path, "rb") as f:
             data = pickle.load(f)
-        self.doc_ids = data["doc_ids"]
-        self.doc_metadata = data["doc_metadata"]
-        self.doc_tokens = data["doc_tokens"]
-        self.df = Counter(data["df"])
-        self.doc_lengths = data["doc_lengths"]
-        self.avg_doc_length = data["avg_doc_length"]
-        self.n_docs = data["n_docs"]
-        self.inverted_index = defaultdict(list, data["inverted_index"])
-        print(f"BM25 index loaded: {self.n_docs} docs, {len(self.df)} tokens")
-
-
-def build_bm25_index(csv_path: str, index_path: str):
-    """CSV에서 BM25 인덱스를 구축합니다."""
-    print("=== BM25 Index Build ===")
+        terms = list(data["inverted_index"])
+        entry_doc, entry_term, entry_tf = [], [], []
+        for t, token in enumerate(terms):
+            for doc_idx, tf in data["inverted_index"][token]:
+                entry_doc.append(doc_idx)
+                entry_term.append(t)
+                entry_tf.append(tf)
+        n = data["n_docs"]
+        self._set_segments([_Segment.build(
+            terms,
+            np.asarray(entry_doc, dtype=np.int64),
+            np.asarray(entry_term, dtype=np.int64),
+            np.asarray(entry_tf, dtype=np.int64),
+            np.arange(n), data["doc_ids"], [""] * n, data["doc_metadata"],
+        )])
+        print(f"BM25 index loaded (legacy pickle): {self.n_docs} docs, {len(terms)} tokens")
+
 
+def convert_pickle_index(pkl_path: str, index_path: str):
+    """구버전 bm25_index.pkl을 컬럼형 인덱스 디렉토리로 변환합니다."""
+    bm25 = KiwiBM25()
+    bm25.load(pkl_path)
+    bm25.save(index_path)
+
+
+def _read_csv_docs(csv_path: str) -> tuple[list[str], list[str], list[dict]]:
+    """CSV에서 (doc_ids, 색인 텍스트, 메타데이터)를 읽습니다."""
     with open(csv_path, encoding="utf-8") as f:
         reader = csv.DictReader(f)
         rows = list(reader)
@@ -248,16 +968,120 @@ def build_bm25_index(csv_path: str, index_path: str):
             "concepts": row.get("solar_concepts", ""),
         })
 
-    bm25 = KiwiBM25()
+    return doc_ids, texts, metadata
+
+
+def _open_token_cache(token_cache_path: Optional[str]) -> Optional[TokenCache]:
+    return TokenCache(token_cache_path) if token_cache_path else None
+
+
+def build_bm25_index(
+    csv_path: str,
+    index_path: str,
+    num_workers: Optional[int] = None,
+    token_cache_path: Optional[str] = None,
+    doc_store_path: Optional[str] = None,
+):
+    """CSV에서 BM25 인덱스를 구축합니다.
+
+    num_workers: Kiwi 병렬 토큰화 스레드 수 (0이면 전체 코어, None/1이면 단일 스레드)
+    token_cache_path: 토큰 캐시 SQLite 경로 (지정하면 이전 빌드의 분석 결과를 재사용)
+    doc_store_path: 공유 문서 저장소 (주면 docs.jsonl 대신 참조만 기록)
+    """
+    print("=== BM25 Index Build ===")
+
+    doc_ids, texts, metadata = _read_csv_docs(csv_path)
+
+    bm25 = KiwiBM25(num_workers=num_workers, token_cache=_open_token_cache(token_cache_path))
     bm25.build_index(doc_ids, texts, metadata)
-    bm25.save(index_path)
+    bm25.save(index_path, doc_store_path=doc_store_path)
 
     print("=== Build Complete ===")
 
 
+def update_bm25_index(
+    csv_path: str,
+    index_path: str,
+    num_workers: Optional[int] = None,
+    token_cache_path: Optional[str] = None,
+    base_path: Optional[str] = None,
+    doc_store_path: Optional[str] = None,
+):
+    """기존 인덱스를 CSV와 비교해 바뀐 문서만 갱신합니다.
+
+    doc_id/content_hash가 같은 문서는 저장된 포스팅(토큰화 결과)을 그대로 쓰고,
+    추가·변경된 문서만 토큰화한다. 삭제된 doc_id는 삭제 표시만 한다.
+    기본 세그먼트는 하드링크로 재사용하고 델타와 삭제 표시만 새로 쓰므로, 비용은 (CSV 비교를
+    빼면) 바뀐 문서 수에 비례한다. 기준을 넘으면 save()가 compact한다.
+    인덱스가 없거나 해시가 없는 구버전이면 전체 빌드로 대신한다.
+
+    base_path: 갱신의 기준이 될 기존 인덱스 (없으면 index_path 자신).
+               새 세대 디렉토리에 쓸 때 이전 세대를 기준으로 삼는다.
+    doc_store_path: 공유 문서 저장소 (주면 docs.jsonl 대신 참조만 기록)
+    """
+    base_dir = Path(base_path or index_path)
+    index_dir = _index_dir(base_dir)
+    if not ((index_dir / "doc_hashes.json").exists() or (index_dir / "base" / "doc_hashes.json").exists()):
+        print("No incremental BM25 index found, running full build.")
+        build_bm25_index(csv_path, index_path, num_workers=num_workers,
+                         token_cache_path=token_cache_path, doc_store_path=doc_store_path)
+        return
+
+    print("=== BM25 Index Update ===")
+    bm25 = KiwiBM25(num_workers=num_workers, token_cache=_open_token_cache(token_cache_path))
+    bm25.load(str(base_dir))
+
+    doc_ids, texts, metadata = _read_csv_docs(csv_path)
+    existing = bm25.hashes()
+
+    # doc_id 중복 시 마지막 행 기준
+    latest: dict[str, int] = {}
+    for i, doc_id in enumerate(doc_ids):
+        latest[doc_id] = i
+
+    changed = []
+    hashes = {}
+    for doc_id, i in latest.items():
+        h = bm25.content_hash(texts[i], metadata[i])
+        if existing.get(doc_id) != h:
+            changed.append(i)
+            hashes[i] = h
+    removed = [d for d in existing if d not in latest]
+
+    print(f"Changed/new: {len(changed)}, removed: {len(removed)}, "
+          f"unchanged: {len(latest) - len(changed)}")
+    if not changed and not removed:
+        if base_dir != Path(index_path):
+            # 새 세대 디렉토리에 (새 세대의 문서 저장소를 가리키도록) 다시 쓴다
+            bm25.save(index_path, doc_store_path=doc_store_path)
+        print("No changes. BM25 index is up to date.")
+        print("=== Update Complete ===")
+        return
+
+    bm25.delete_documents(removed)
+    bm25.add_documents(
+        [doc_ids[i] for i in changed],
+        [texts[i] for i in changed],
+        [metadata[i] for i in changed],
+        [hashes[i] for i in changed],
+    )
+    bm25.save(index_path, doc_store_path=doc_store_path)
+
+    print(f"Index updated: {bm25.n_docs} docs, {len(bm25.segments)} segment(s)")
+    print("=== Update Complete ===")
+
+
 if __name__ == "__main__":
     import sys
+    if len(sys.argv) == 4 and sys.argv[1] == "--update":
+        update_bm25_index(sys.argv[2], sys.argv[3])
+        sys.exit(0)
+    if len(sys.argv) == 4 and sys.argv[1] == "--convert":
+        convert_pickle_index(sys.argv[2], sys.argv[3])
+        sys.exit(0)
     if len(sys.argv) < 3:
-        print("Usage: python bm25_index.py <csv_path> <index_path>")
+        print("Usage: python -m indexing.bm25_index <csv_path> <index_dir>")
+        print("       python -m indexing.bm25_index --update <csv_path> <index_dir>")
+        print("       python -m indexing.bm25_index --convert <bm25_index.pkl> <index_dir>")
         sys.exit(1)
     build_bm25_index(sys.argv[1], sys.argv[2])
@@ -0,0 +1,361 @@
+"""
+캐시 유틸리티
+- LRUCache: 스레드 안전 in-process LRU (hit/miss 카운터 포함)
+- TokenCache: 형태소 분석 결과 캐시 (텍스트 해시 + 토크나이저 버전 키, SQLite 영속화)
+- EmbeddingCache: 쿼리 임베딩 캐시 (모델/차원/정규화 텍스트 키, float32 BLOB, TTL/용량 제한)
+"""
+from __future__ import annotations
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+import numpy as np
+
+
+class LRUCache:
+    """스레드 안전 LRU 캐시"""
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        return {"size": len(self._data), "hits": self.hits, "misses": self.misses}
+
+
+def normalize_query(text: str) -> str:
+    """캐시 키용 정규화 (NFC + 공백 정리)"""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFC", text)).strip()
+
+
+_SEP = "\x1f"  # 토큰 구분자 (Unit Separator)
+
+
+class TokenCache:
+    """토큰화 결과 캐시
+
+    키는 sha1(토크나이저 버전 + 텍스트)라서, 같은 텍스트는 어느 문서/쿼리에서 왔든
+    한 번만 분석한다. 토크나이저나 토큰 규칙이 바뀌면 version을 올려 캐시를 무효화한다.
+
+    - path=None: in-process LRU만 사용 (API 쿼리 경로)
+    - path 지정: LRU + SQLite (인덱스 빌드처럼 프로세스 간 재사용이 필요한 경우)
+    """
+
+    def __init__(self, path: Optional[str] = None, version: str = "", lru_size: int = 4096):
+        self.version = version
+        self.lru = LRUCache(lru_size)
+        self._lock = threading.Lock()
+        self.conn: Optional[sqlite3.Connection] = None
+        if path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self.conn = sqlite3.connect(str(path), check_same_thread=False)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS tokens (
+                    key TEXT PRIMARY KEY,
+                    tokens TEXT NOT NULL
+                )
+            """)
+            self.conn.commit()
+
+    def key(self, text: str) -> str:
+        return hashlib.sha1(f"{self.version}\0{text}".encode("utf-8", errors="ignore")).hexdigest()
+
+    def get(self, text: str) -> Optional[list[str]]:
+        return self.get_many([text])[0]
+
+    def get_many(self, texts: list[str]) -> list[Optional[list[str]]]:
+        """텍스트별 캐시된 토큰을 반환합니다 (없으면 None)."""
+        keys = [self.key(t) for t in texts]
+        found: list[Optional[list[str]]] = [self.lru.get(k) for k in keys]
+
+        missing = [k for k, v in zip(keys, found) if v is None]
+        if missing and self.conn is not None:
+            stored = {}
+            with self._lock:
+                for i in range(0, len(missing), 500):
+                    chunk = missing[i:i + 500]
+                    placeholders = ",".join("?" * len(chunk))
+                    rows = self.conn.execute(
+                        f"SELECT key, tokens FROM tokens WHERE key IN ({placeholders})", chunk
+                    ).fetchall()
+                    stored.update(rows)
+            for i, k in enumerate(keys):
+                if found[i] is None and k in stored:
+                    tokens = stored[k].split(_SEP) if stored[k] else []
+                    self.lru.put(k, tokens)
+                    found[i] = tokens
+
+        return [list(v) if v is not None else None for v in found]
+
+    def put_many(self, texts: list[str], token_lists: list[list[str]]):
+        rows = []
+        for text, tokens in zip(texts, token_lists):
+            k = self.key(text)
+            self.lru.put(k, list(tokens))
+            rows.append((k, _SEP.join(tokens)))
+        if rows and self.conn is not None:
+            with self._lock:
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO tokens (key, tokens) VALUES (?, ?)", rows
+                )
+                self.conn.commit()
+
+    def tokenize_many(
+        self,
+        texts: Iterable[str],
+        tokenize_many: Callable[[list[str]], Iterable[list[str]]],
+        chunk_size: int = 2000,
+    ) -> Iterable[list[str]]:
+        """캐시에 없는 텍스트만 tokenize_many로 분석하고, 입력 순서대로 토큰을 돌려줍니다."""
+        texts = list(texts)
+        for start in range(0, len(texts), chunk_size):
+            chunk = texts[start:start + chunk_size]
+            cached = self.get_many(chunk)
+            miss_idx = [i for i, v in enumerate(cached) if v is None]
+            if miss_idx:
+                miss_texts = [chunk[i] for i in miss_idx]
+                computed = list(tokenize_many(miss_texts))
+                self.put_many(miss_texts, computed)
+                for i, tokens in zip(miss_idx, computed):
+                    cached[i] = tokens
+            yield from cached
+
+    def stats(self) -> dict:
+        return self.lru.stats()
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+class EmbeddingCache:
+    """쿼리 임베딩 캐시
+
+    키는 sha1(모델 + 차원 + 정규화 텍스트)이다. 정규화는 NFC + 공백 정리만 하므로
+    의미가 같은 다른 문장까지 합치지는 않는다. 벡터는 float32 BLOB으로 저장한다.
+
+    - ttl_sec: 저장 후 이 시간이 지난 항목은 무시하고 지운다 (0이면 만료 없음)
+    - max_entries: SQLite 항목 수 상한. 넘으면 가장 오래 안 쓰인 항목부터 지운다 (0이면 무제한)
+
+    조회 경로에서는 SQLite에 쓰지 않는다: 디스크 적중의 used_at은 메모리에 모아 두었다가
+    다음 put()(이미 쓰기 트랜잭션을 여는 곳)이나 close()에서 한 번에 반영한다.
+    """
+
+    _EVICT_EVERY = 100  # put N번마다 용량 확인
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        lru_size: int = 1024,
+        ttl_sec: float = 0,
+        max_entries: int = 0,
+    ):
+        self.lru = LRUCache(lru_size)
+        self.ttl_sec = ttl_sec
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._puts = 0
+        self._touched: dict[str, float] = {}  # key → used_at (아직 SQLite에 반영 안 됨)
+        self.conn: Optional[sqlite3.Connection] = None
+        if path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self.conn = sqlite3.connect(str(path), check_same_thread=False)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    key TEXT PRIMARY KEY,
+                    dim INTEGER NOT NULL,
+                    vec BLOB NOT NULL,
+                    created_at REAL NOT NULL,
+                    used_at REAL NOT NULL
+                )
+            """)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_used ON embeddings(used_at)")
+            self.conn.commit()
+
+    def key(self, model: str, dim: int, text: str) -> str:
+        raw = f"{model}\0{dim}\0{normalize_query(text)}"
+        return hashlib.sha1(raw.encode("utf-8", errors="ignore")).hexdigest()
+
+    def get(self, model: str, dim: int, text: str) -> Optional[np.ndarray]:
+        """캐시된 벡터(float32)를 반환합니다 (없거나 만료되면 None)."""
+        k = self.key(model, dim, text)
+        now = time.time()
+        hit = self.lru.get(k)
+        if hit is not None:
+            created_at, vec = hit
+            if not self._expired(created_at, now):
+                if self.conn is not None:
+                    self._touched[k] = now
+                return vec
+            self.lru.pop(k)
+            self._delete(k)
+            return None
+
+        if self.conn is None:
+            return None
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT dim, vec, created_at FROM embeddings WHERE key = ?", (k,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[0] != dim or self._expired(row[2], now):
+                self._touched.pop(k, None)
+                self.conn.execute("DELETE FROM embeddings WHERE key = ?", (k,))
+                self.conn.commit()
+                return None
+            self._touched[k] = now
+        vec = np.frombuffer(row[1], dtype=np.float32)
+        self.lru.put(k, (row[2], vec))
+        return vec
+
+    def put(self, model: str, dim: int, text: str, vector) -> np.ndarray:
+        k = self.key(model, dim, text)
+        vec = np.asarray(vector, dtype=np.float32)
+        vec.setflags(write=False)
+        now = time.time()
+        self.lru.put(k, (now, vec))
+        if self.conn is not None:
+            with self._lock:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO embeddings (key, dim, vec, created_at, used_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (k, int(vec.shape[0]), vec.tobytes(), now, now),
+                )
+                self._flush_touched()
+                self.conn.commit()
+                self._puts += 1
+                if self._puts % self._EVICT_EVERY == 0:
+                    self._evict(now)
+        return vec
+
+    def get_many(self, model: str, dim: int, texts: list[str]) -> list[Optional[np.ndarray]]:
+        """여러 텍스트를 한 번에 조회합니다 (대량 임베딩 재개용, LRU는 거치지 않음)."""
+        keys = [self.key(model, dim, t) for t in texts]
+        found: dict[str, np.ndarray] = {}
+        if self.conn is not None:
+            now = time.time()
+            with self._lock:
+                for i in range(0, len(keys), 500):
+                    chunk = keys[i:i + 500]
+                    placeholders = ",".join("?" * len(chunk))
+                    rows = self.conn.execute(
+                        f"SELECT key, dim, vec, created_at FROM embeddings WHERE key IN ({placeholders})",
+                        chunk,
+                    ).fetchall()
+                    for k, d, blob, created_at in rows:
+                        if d == dim and not self._expired(created_at, now):
+                            found[k] = np.frombuffer(blob, dtype=np.float32)
+        return [found.get(k) for k in keys]
+
+    def put_many(self, model: str, dim: int, texts: list[str], vectors) -> None:
+        """여러 벡터를 한 트랜잭션으로 저장합니다 (LRU는 거치지 않음)."""
+        if self.conn is None:
+            return
+        now = time.time()
+        rows = []
+        for text, vector in zip(texts, vectors):
+            vec = np.asarray(vector, dtype=np.float32)
+            rows.append((self.key(model, dim, text), int(vec.shape[0]), vec.tobytes(), now, now))
+        with self._lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, dim, vec, created_at, used_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._flush_touched()
+            self.conn.commit()
+
+    def clear(self):
+        self.lru.clear()
+        if self.conn is not None:
+            with self._lock:
+                self._touched = {}
+                self.conn.execute("DELETE FROM embeddings")
+                self.conn.commit()
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.ttl_sec > 0 and now - created_at > self.ttl_sec
+
+    def _flush_touched(self):
+        """모아 둔 used_at을 반영합니다. (self._lock 안에서, commit 전에 호출)"""
+        # 조회는 락 없이 기록하므로 dict를 통째로 바꿔 끼운다
+        touched, self._touched = self._touched, {}
+        if touched:
+            self.conn.executemany(
+                "UPDATE embeddings SET used_at = ? WHERE key = ?",
+                [(used_at, k) for k, used_at in touched.items()],
+            )
+
+    def _delete(self, k: str):
+        if self.conn is not None:
+            with self._lock:
+                self._touched.pop(k, None)
+                self.conn.execute("DELETE FROM embeddings WHERE key = ?", (k,))
+                self.conn.commit()
+
+    def _evict(self, now: float):
+        """만료 항목과 용량 초과분을 지웁니다. (self._lock 안에서 호출)"""
+        if self.ttl_sec > 0:
+            self.conn.execute("DELETE FROM embeddings WHERE created_at < ?", (now - self.ttl_sec,))
+        if self.max_entries > 0:
+            count = self.conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            if count > self.max_entries:
+                self.conn.execute(
+                    "DELETE FROM embeddings WHERE key IN "
+                    "(SELECT key FROM embeddings ORDER BY used_at LIMIT ?)",
+                    (count - self.max_entries,),
+                )
+        self.conn.commit()
+
+    def stats(self) -> dict:
+        return self.lru.stats()
+
+    def close(self):
+        if self.conn is not None:
+            with self._lock:
+                self._flush_touched()
+                self.conn.commit()
+            self.conn.close()
+            self.conn = None
@@ -0,0 +1,151 @@
+"""
+엔티티 공출현 인덱스 (월별 희소 행렬)
+- entity_cooccur(entity_id, month_ord, other_id, doc_count): 같은 문서에 링크된 엔티티 쌍을 월별로 센 것
+- 쌍은 양방향으로 저장 → 엔티티 하나의 (entity_id, month_ord) 기본키 범위 스캔으로 끝난다
+- doc_entity 자기 조인으로 엔티티 DB 안에 만든다
+  (create_db는 전체, sync_db는 문서가 바뀐 달만 다시 계산 → build_all.py Step 1에서 항상 최신)
+- 트렌드 공출현 엔티티는 요청 기간의 월 행들을 합쳐 상위 k개만 고른다
+
+사용법 (기존 DB에 전체 재구축):
+  python -m indexing.cooccurrence <entity_db>
+"""
+from __future__ import annotations
+import calendar
+import sqlite3
+import time
+from datetime import date
+from typing import Optional
+
+COOCCUR_TABLE = "entity_cooccur"
+
+# date.toordinal() → SQLite julianday (0001-01-01 = 1721425.5)
+_JULIAN_OFFSET = 1721424.5
+
+COOCCUR_SCHEMA = f"""
+    CREATE TABLE {COOCCUR_TABLE} (
+        entity_id INTEGER NOT NULL,
+        month_ord INTEGER NOT NULL,  -- 그 달 1일의 ordinal
+        other_id INTEGER NOT NULL,
+        doc_count INTEGER NOT NULL,
+        PRIMARY KEY (entity_id, month_ord, other_id)
+    ) WITHOUT ROWID;
+"""
+
+# GROUP BY 결과가 기본키 순서로 나와 WITHOUT ROWID B-tree에 append만 일어난다
+_INSERT_PAIRS = f"""
+    INSERT INTO {COOCCUR_TABLE} (entity_id, month_ord, other_id, doc_count)
+    SELECT a.entity_id,
+           a.date_ord - CAST(strftime('%d', a.date_ord + {_JULIAN_OFFSET}) AS INTEGER) + 1,
+           b.entity_id,
+           COUNT(*)
+    FROM doc_entity a
+    JOIN doc_entity b ON b.doc_num = a.doc_num AND b.entity_id != a.entity_id
+    WHERE a.date_ord BETWEEN ? AND ?
+    GROUP BY 1, 2, 3
+"""
+
+
+def escape_like(text: str) -> str:
+    """LIKE 패턴에 그대로 넣을 수 있게 \\, %, _를 escape합니다 (ESCAPE '\\'와 함께 쓴다)."""
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def month_ordinal(date_ord: int) -> int:
+    """날짜 ordinal → 그 달 1일의 ordinal."""
+    return date.fromordinal(date_ord).replace(day=1).toordinal()
+
+
+def _month_end(month_ord: int) -> int:
+    d = date.fromordinal(month_ord)
+    return month_ord + calendar.monthrange(d.year, d.month)[1] - 1
+
+
+def write_cooccurrence(cursor, months: Optional[set[int]] = None):
+    """doc_entity에서 공출현 행을 다시 계산합니다 (months가 있으면 그 달(1일 ordinal)만).
+
+    테이블은 이미 있어야 한다 (COOCCUR_SCHEMA).
+    """
+    if months is None:
+        cursor.execute(f"DELETE FROM {COOCCUR_TABLE}")
+        cursor.execute(_INSERT_PAIRS, (1, date.max.toordinal()))
+        return
+    for month in sorted(months):
+        cursor.execute(f"DELETE FROM {COOCCUR_TABLE} WHERE month_ord = ?", (month,))
+        cursor.execute(_INSERT_PAIRS, (month, _month_end(month)))
+
+
+def build_cooccurrence(db_path: str) -> int:
+    """엔티티 DB의 공출현 테이블을 처음부터 다시 만들고 행 수를 반환합니다."""
+    print("=== Entity Co-occurrence Build ===")
+    start = time.time()
+    conn = sqlite3.connect(db_path)
+    with conn:
+        conn.execute(f"DROP TABLE IF EXISTS {COOCCUR_TABLE}")
+        conn.executescript(COOCCUR_SCHEMA)
+        write_cooccurrence(conn.cursor())
+    conn.execute(f"ANALYZE {COOCCUR_TABLE}")
+    n_rows = conn.execute(f"SELECT COUNT(*) FROM {COOCCUR_TABLE}").fetchone()[0]
+    conn.close()
+    print(f"Co-occurrence rows: {n_rows} ({time.time() - start:.1f}s)")
+    return n_rows
+
+
+def top_co_entities(
+    conn: sqlite3.Connection,
+    entity_ids: list[int],
+    lo: int,
+    hi: int,
+    k: int = 20,
+    exclude_like: str | None = None,
+) -> list[dict]:
+    """entity_ids 중 하나와 [lo, hi] 기간 안의 달에 함께 나온 엔티티 상위 k개 (문서 수 기준).
+
+    달별 행을 엔티티마다 합산(top-k merge)한다. 기간은 달 단위로 본다
+    (lo가 속한 달부터 hi가 속한 달까지). entity_ids가 여럿이면 그중 둘 이상에 링크된
+    문서가 id마다 한 번씩 더해지므로, 그런 문서만 doc_entity에서 찾아 중복분을 뺀다.
+    """
+    placeholders = ",".join("?" * len(entity_ids))
+    lo_month = month_ordinal(max(lo, 1))
+    hi_day = hi if hi >= date.max.toordinal() else _month_end(month_ordinal(hi))
+    duplicates = "SELECT NULL AS other_id, 0 AS extra"
+    dup_params: list = []
+    if len(entity_ids) > 1:
+        duplicates = f"""
+            SELECT de.entity_id AS other_id, SUM(m.n - 1) AS extra
+            FROM (
+                SELECT doc_num, COUNT(*) AS n FROM doc_entity
+                WHERE entity_id IN ({placeholders}) AND date_ord BETWEEN ? AND ?
+                GROUP BY doc_num HAVING COUNT(*) > 1
+            ) m JOIN doc_entity de ON de.doc_num = m.doc_num
+            GROUP BY de.entity_id
+        """
+        dup_params = list(entity_ids) + [lo_month, hi_day]
+    query = f"""
+        SELECT e.name, e.type, c.co_count - COALESCE(x.extra, 0) AS co_count FROM (
+            SELECT other_id, SUM(doc_count) AS co_count
+            FROM {COOCCUR_TABLE}
+            WHERE entity_id IN ({placeholders}) AND month_ord BETWEEN ? AND ?
+              AND other_id NOT IN ({placeholders})
+            GROUP BY other_id
+        ) c
+        LEFT JOIN ({duplicates}) x ON x.other_id = c.other_id
+        JOIN entity e ON e.id = c.other_id
+    """
+    params: list = list(entity_ids) + [lo_month, hi] + list(entity_ids) + dup_params
+    if exclude_like:
+        query += " WHERE e.name NOT LIKE ? ESCAPE '\\'"
+        params.append(f"%{escape_like(exclude_like)}%")
+    query += " ORDER BY co_count DESC, e.id LIMIT ?"
+    params.append(k)
+    return [
+        {"name": name, "type": etype, "count": count}
+        for name, etype, count in conn.execute(query, params)
+    ]
+
+
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) < 2:
+        print("Usage: python -m indexing.cooccurrence <entity_db>")
+        sys.exit(1)
+    build_cooccurrence(sys.argv[1])
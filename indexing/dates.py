@@ -0,0 +1,47 @@
+"""
+날짜 ordinal 변환
+- "YYYY-MM-DD" 문자열을 정수(date.toordinal)로 바꿔 인덱스에서 범위 비교/이진 탐색에 사용
+- 날짜가 없거나 잘못된 문서는 0
+"""
+from __future__ import annotations
+import calendar
+from datetime import date
+from typing import Optional
+
+MISSING_ORDINAL = 0
+
+
+def date_ordinal(value: Optional[str]) -> int:
+    """"YYYY-MM-DD..." 문자열을 ordinal로 변환합니다 (실패 시 0)."""
+    if not value:
+        return MISSING_ORDINAL
+    try:
+        return date(int(value[0:4]), int(value[5:7]), int(value[8:10])).toordinal()
+    except (ValueError, IndexError):
+        return MISSING_ORDINAL
+
+
+def range_ordinals(date_start: Optional[str], date_end: Optional[str]) -> tuple[int, int]:
+    """검색용 날짜 범위를 [start, end] ordinal로 변환합니다 (양 끝 포함).
+
+    "YYYY-MM" / "YYYY"처럼 부분 날짜가 오면 start는 기간의 첫날, end는 마지막 날로 본다.
+    범위가 없으면 (0, date.max) — 날짜 없는 문서(0)는 start가 주어질 때만 빠진다.
+    """
+    lo = _partial_ordinal(date_start, end=False) if date_start else MISSING_ORDINAL
+    hi = _partial_ordinal(date_end, end=True) if date_end else date.max.toordinal()
+    return lo, hi
+
+
+def _partial_ordinal(value: str, end: bool) -> int:
+    parts = value.strip()[:10].split("-")
+    try:
+        y = int(parts[0])
+        m = int(parts[1]) if len(parts) > 1 and parts[1] else (12 if end else 1)
+        if len(parts) > 2 and parts[2]:
+            d = int(parts[2])
+        else:
+            d = calendar.monthrange(y, m)[1] if end else 1
+        return date(y, m, d).toordinal()
+    except (ValueError, IndexError):
+        # 파싱할 수 없는 경계는 필터를 걸지 않는다.
+        return date.max.toordinal() if end else MISSING_ORDINAL
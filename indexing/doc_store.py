@@ -0,0 +1,194 @@
+"""
+공유 문서 저장소 (컬럼형, memmap)
+- 문서 본문/메타데이터를 세대마다 한 벌만 둔다 (BM25 docs.jsonl, 벡터 payload 대신)
+- 필드별로 UTF-8 바이트를 이어 붙인 blob + int64 오프셋 → 문서 번호 i의 필드는 슬라이스 한 번
+- 문서 번호는 날짜순 dense 정수 (BM25 문서 번호와 순서가 비슷해 페이지 지역성이 좋다)
+
+본문을 읽는 곳:
+- 세대마다 새로 만들고 문서 번호도 매번 다시 매기므로, 같은 세대의 BM25 인덱스만 문서 번호로 참조한다
+- EntityDB는 본문 컬럼 없이 contentless FTS 색인만 두고, 본문/짧은 키워드 검색은 doc_id로 여기서 읽는다
+- 벡터 저장소(Qdrant, 로컬)는 세대 밖에서 증분 갱신되므로 doc_id/필터 키만 payload에 두고,
+  검색 결과 본문은 API가 doc_lookup으로 여기서 채운다
+
+디스크 포맷 (디렉토리 하나):
+- meta.json             : 문서 수, 필드 목록
+- doc_ids.json          : 문서 번호 → doc_id
+- <field>.bin           : 필드 값(UTF-8)을 문서 번호 순으로 이어 붙인 것
+- <field>.offsets.npy   : int64[N+1], <field>.bin 바이트 오프셋
+"""
+from __future__ import annotations
+import csv
+import json
+import mmap
+import os
+import re
+import shutil
+from pathlib import Path
+from typing import Iterable, Optional
+
+import numpy as np
+
+from indexing.dates import date_ordinal
+
+STORE_FORMAT = "slowletter-docs"
+STORE_VERSION = 1
+
+FIELDS = ("date", "title", "content", "persons", "organizations", "concepts")
+
+
+class DocStore:
+    """읽기 전용 문서 저장소. 필드 값은 mmap 슬라이스에서 바로 디코딩한다."""
+
+    def __init__(self, path: str):
+        p = Path(path)
+        with open(p / "meta.json", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("format") != STORE_FORMAT:
+            raise ValueError(f"Not a doc store directory: {p}")
+        self.path = str(p)
+        self.n_docs = int(meta["n_docs"])
+        self.fields = tuple(meta["fields"])
+        with open(p / "doc_ids.json", encoding="utf-8") as f:
+            self.doc_ids: list[str] = json.load(f)
+        self._index = {d: i for i, d in enumerate(self.doc_ids)}
+
+        self._blobs: dict[str, Optional[mmap.mmap]] = {}
+        self._offsets: dict[str, np.ndarray] = {}
+        for field in self.fields:
+            self._offsets[field] = np.load(p / f"{field}.offsets.npy", mmap_mode="r")
+            self._blobs[field] = None
+            if int(self._offsets[field][-1]) > 0:
+                with open(p / f"{field}.bin", "rb") as f:
+                    self._blobs[field] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __len__(self) -> int:
+        return self.n_docs
+
+    def index_of(self, doc_id: str) -> int:
+        """doc_id의 문서 번호 (없으면 -1)."""
+        return self._index.get(doc_id, -1)
+
+    def indices(self, doc_ids: Iterable[str]) -> np.ndarray:
+        """doc_id 목록 → 문서 번호 배열 (없는 문서는 -1)."""
+        return np.fromiter((self._index.get(d, -1) for d in doc_ids), dtype=np.int64)
+
+    def raw(self, i: int, field: str) -> memoryview:
+        """문서 번호 i의 필드 바이트 (복사 없는 memoryview)."""
+        blob = self._blobs[field]
+        if blob is None:
+            return memoryview(b"")
+        offsets = self._offsets[field]
+        return memoryview(blob)[int(offsets[i]):int(offsets[i + 1])]
+
+    def field(self, i: int, field: str) -> str:
+        return str(self.raw(i, field), "utf-8")
+
+    def get(self, i: int, fields: Optional[Iterable[str]] = None) -> dict:
+        """문서 번호 i의 필드들을 dict로 반환합니다."""
+        return {f: self.field(i, f) for f in (fields or self.fields)}
+
+    def find(self, field: str, text: str) -> np.ndarray:
+        """필드 값에 text가 들어간 문서 번호 (오름차순, SQLite LIKE처럼 ASCII만 대소문자 무시).
+
+        blob 전체를 정규식 한 번으로 훑고 위치를 오프셋으로 문서 번호에 대응시킨다.
+        """
+        blob = self._blobs[field]
+        needle = text.encode("utf-8")
+        if not needle:
+            return np.arange(self.n_docs, dtype=np.int64)
+        if blob is None:
+            return np.empty(0, dtype=np.int64)
+        # 전방 탐색으로 겹치는 위치까지 모두 찾는다 (문서 경계를 걸친 일치는 아래에서 버린다)
+        pattern = re.compile(b"(?=" + re.escape(needle) + b")", re.IGNORECASE)
+        pos = np.fromiter((m.start() for m in pattern.finditer(blob)), dtype=np.int64)
+        offsets = self._offsets[field]
+        docs = np.searchsorted(offsets, pos, side="right") - 1
+        docs = docs[pos + len(needle) <= offsets[docs + 1]]
+        return np.unique(docs)
+
+    def get_documents(self, doc_ids: list[str]) -> dict[str, dict]:
+        """doc_id 목록의 문서를 반환합니다 (EntityDB.get_documents와 같은 형태)."""
+        docs: dict[str, dict] = {}
+        for doc_id in doc_ids:
+            i = self._index.get(doc_id)
+            if i is not None:
+                docs[doc_id] = {"doc_id": doc_id, **self.get(i)}
+        return docs
+
+    def close(self):
+        for blob in self._blobs.values():
+            if blob is not None:
+                blob.close()
+        self._blobs = {f: None for f in self.fields}
+
+
+def write_doc_store(path: str, doc_ids: list[str], records: list[dict], fields: tuple = FIELDS):
+    """문서들을 날짜순으로 정렬해 저장소 디렉토리를 씁니다 (임시 디렉토리 후 rename)."""
+    out_dir = Path(path)
+    tmp_dir = out_dir.with_name(out_dir.name + ".tmp")
+    if tmp_dir.exists():
+        shutil.rmtree(tmp_dir)
+    tmp_dir.mkdir(parents=True)
+
+    dates = np.asarray([date_ordinal(r.get("date", "")) for r in records], dtype=np.int32)
+    order = np.argsort(dates, kind="stable")
+
+    for field in fields:
+        offsets = np.zeros(len(order) + 1, dtype=np.int64)
+        with open(tmp_dir / f"{field}.bin", "wb") as f:
+            for k, i in enumerate(order):
+                data = str(records[i].get(field) or "").encode("utf-8")
+                f.write(data)
+                offsets[k + 1] = offsets[k] + len(data)
+        np.save(tmp_dir / f"{field}.offsets.npy", offsets)
+    with open(tmp_dir / "doc_ids.json", "w", encoding="utf-8") as f:
+        json.dump([doc_ids[i] for i in order], f, ensure_ascii=False)
+    with open(tmp_dir / "meta.json", "w", encoding="utf-8") as f:
+        json.dump({
+            "format": STORE_FORMAT,
+            "version": STORE_VERSION,
+            "n_docs": len(order),
+            "fields": list(fields),
+        }, f, ensure_ascii=False, indent=2)
+
+    old_dir = out_dir.with_name(out_dir.name + ".old")
+    if old_dir.exists():
+        shutil.rmtree(old_dir)
+    if out_dir.exists():
+        os.replace(out_dir, old_dir)
+    os.replace(tmp_dir, out_dir)
+    if old_dir.exists():
+        shutil.rmtree(old_dir)
+
+
+def build_doc_store(csv_path: str, path: str):
+    """CSV에서 문서 저장소를 만듭니다 (doc_id 중복 시 마지막 행 기준)."""
+    print("=== Doc Store Build ===")
+    latest: dict[str, dict] = {}
+    with open(csv_path, encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            # BM25(_read_csv_docs)와 같은 doc_id 규칙
+            doc_id = row.get("ID", "") or ""
+            content = row.get("cleaned_content_for_api", "") or ""
+            if not doc_id or not content:
+                continue
+            latest[doc_id] = {
+                "date": (row.get("date", "") or "")[:10],
+                "title": row.get("title", "") or "",
+                "content": content,
+                "persons": row.get("solar_persons", "") or "",
+                "organizations": row.get("solar_organizations", "") or "",
+                "concepts": row.get("solar_concepts", "") or "",
+            }
+    doc_ids = list(latest)
+    write_doc_store(path, doc_ids, [latest[d] for d in doc_ids])
+    print(f"Doc store saved: {path} ({len(doc_ids)} docs)")
+    print("=== Build Complete ===")
+
+
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) < 3:
+        print("Usage: python -m indexing.doc_store <csv_path> <store_dir>")
+        sys.exit(1)
+    build_doc_store(sys.argv[1], sys.argv[2])
@@ -4,30 +4,95 @@
 - Qdrant 로컬 모드 (파일 기반, 서버 불필요)
 """
 from __future__ import annotations
+import contextlib
 import csv
 import json
+import queue
+import random
+import threading
 import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional
 
 import numpy as np
 
+from indexing.dates import date_ordinal, range_ordinals
+
 try:
-    from openai import OpenAI
+    from openai import OpenAI, RateLimitError, APIConnectionError, APITimeoutError, InternalServerError
 except ImportError:
     print("pip install openai")
     raise
 
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("cl100k_base")  # text-embedding-3-* 토크나이저
+except Exception:
+    _ENCODING = None
+
 try:
     from qdrant_client import QdrantClient
     from qdrant_client.models import (
         Distance, VectorParams, PointStruct,
         Filter, FieldCondition, Range, MatchValue,
-        PayloadSchemaType,
+        PayloadSchemaType, IsEmptyCondition, PayloadField, FilterSelector,
+        ScalarQuantization, ScalarQuantizationConfig, ScalarType,
+        BinaryQuantization, BinaryQuantizationConfig,
+        SearchParams, QuantizationSearchParams,
     )
 except ImportError:
-    print("pip install qdrant-client")
-    raise
+    # VECTOR_BACKEND=local이면 Qdrant 없이도 동작한다 (indexing/local_vectors.py).
+    QdrantClient = None
+
+
+def count_tokens(text: str) -> int:
+    """임베딩 토큰 수 (tiktoken이 없으면 글자 수로 보수적으로 추정)"""
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text, disallowed_special=()))
+    return len(text)
+
+
+class _RateLimiter:
+    """동시 요청들이 공유하는 백오프 상태
+
+    429를 받으면 모든 워커가 pause_until까지 새 요청을 멈춘다. 대기 시간은
+    Retry-After(있으면)와 직전 대기의 2배 중 큰 값이며, 성공할 때마다 줄어든다.
+    """
+
+    def __init__(self, initial: float = 1.0, maximum: float = 60.0):
+        self.initial = initial
+        self.maximum = maximum
+        self.delay = initial
+        self.pause_until = 0.0
+        self.rate_limited = 0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        while True:
+            with self._lock:
+                remaining = self.pause_until - time.monotonic()
+            if remaining <= 0:
+                return
+            time.sleep(remaining)
+
+    def backoff(self, hint: float = 0.0):
+        with self._lock:
+            self.delay = min(self.maximum, max(hint, self.delay * 2))
+            pause = self.delay * random.uniform(1.0, 1.25)
+            self.pause_until = max(self.pause_until, time.monotonic() + pause)
+            self.rate_limited += 1
+
+    def success(self):
+        with self._lock:
+            self.delay = max(self.initial, self.delay * 0.8)
+
+
+def _retry_after(e: Exception) -> float:
+    try:
+        return float(e.response.headers.get("retry-after", 0))
+    except Exception:
+        return 0.0
 
 
 class SlowLetterEmbedder:
@@ -38,7 +103,9 @@ class SlowLetterEmbedder:
         openai_api_key: str,
         model: str = "text-embedding-3-large",
         dim: int = 3072,
+        query_cache=None,
     ):
+        """query_cache: indexing.cache.EmbeddingCache (있으면 embed_query 결과를 재사용)"""
         # OPENAI_API_KEY가 비어있거나 placeholder(한글 등)인 경우, 클라이언트가
         # Authorization 헤더 구성 과정에서 UnicodeEncodeError를 낼 수 있다.
         if not openai_api_key or not str(openai_api_key).strip():
@@ -51,37 +118,150 @@ class SlowLetterEmbedder:
         self.client = OpenAI(api_key=openai_api_key)
         self.model = model
         self.dim = dim
+        self.query_cache = query_cache
 
-    def embed_texts(self, texts: list[str], batch_size: int = 100) -> list[list[float]]:
-        """텍스트 리스트를 임베딩으로 변환합니다."""
-        all_embeddings = []
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i:i + batch_size]
-            # 빈 텍스트 처리
-            batch = [t if t.strip() else "빈 문서" for t in batch]
-
-            response = self.client.embeddings.create(
-                model=self.model,
-                input=batch,
-                dimensions=self.dim,
-            )
-            embeddings = [item.embedding for item in response.data]
-            all_embeddings.extend(embeddings)
-
-            if i + batch_size < len(texts):
-                print(f"  Embedded {i + batch_size}/{len(texts)}...")
-                time.sleep(0.5)  # Rate limit 대응
-
-        return all_embeddings
+    def embed_texts(
+        self,
+        texts: list[str],
+        batch_size: int = 100,
+        max_concurrency: int = 4,
+        max_batch_tokens: int = 200_000,
+        checkpoint=None,
+        max_retries: int = 8,
+    ) -> list[list[float]]:
+        """텍스트 리스트를 임베딩으로 변환합니다. (입력 순서대로, iter_embeddings 참고)"""
+        results: list[Optional[list[float]]] = [None] * len(texts)
+        for batch, embeddings in self.iter_embeddings(
+            texts, batch_size, max_concurrency, max_batch_tokens, checkpoint, max_retries
+        ):
+            for i, emb in zip(batch, embeddings):
+                results[i] = emb
+        return results
+
+    def iter_embeddings(
+        self,
+        texts: list[str],
+        batch_size: int = 100,
+        max_concurrency: int = 4,
+        max_batch_tokens: int = 200_000,
+        checkpoint=None,
+        max_retries: int = 8,
+    ) -> Iterator[tuple[list[int], list[list[float]]]]:
+        """끝난 배치부터 (입력 인덱스 목록, 임베딩 목록)을 돌려줍니다 (순서 보장 없음).
+
+        - 배치는 batch_size개 또는 max_batch_tokens 토큰을 넘지 않게 나눈다.
+        - 동시에 진행하는 요청은 최대 max_concurrency개. 소비자가 느리면 새 요청도 멈춘다.
+        - 429/일시 오류는 모든 요청이 함께 물러났다가 재시도한다 (_RateLimiter).
+        - checkpoint(EmbeddingCache)가 있으면 끝난 배치를 바로 저장하고, 다시 실행하면
+          이미 임베딩된 텍스트는 API를 호출하지 않는다.
+        """
+        # 빈 텍스트 처리
+        texts = [t if t.strip() else "빈 문서" for t in texts]
+
+        todo = list(range(len(texts)))
+        if checkpoint is not None:
+            cached = checkpoint.get_many(self.model, self.dim, texts)
+            hits = [i for i, vec in enumerate(cached) if vec is not None]
+            if hits:
+                print(f"  Checkpoint: {len(hits)}/{len(texts)} already embedded")
+            for start in range(0, len(hits), batch_size):
+                batch = hits[start:start + batch_size]
+                yield batch, [cached[i].tolist() for i in batch]
+            todo = [i for i, vec in enumerate(cached) if vec is None]
+            del cached
+
+        batches = iter(self._plan_batches(texts, todo, batch_size, max_batch_tokens))
+        limiter = _RateLimiter()
+        done = len(texts) - len(todo)
+        with ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="embed") as pool:
+            pending: dict = {}
+
+            def submit_next():
+                batch = next(batches, None)
+                if batch is not None:
+                    future = pool.submit(self._embed_batch, [texts[i] for i in batch], limiter, max_retries)
+                    pending[future] = batch
+
+            for _ in range(max_concurrency):
+                submit_next()
+            try:
+                while pending:
+                    finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        batch = pending.pop(future)
+                        embeddings = future.result()
+                        if checkpoint is not None:
+                            checkpoint.put_many(self.model, self.dim, [texts[i] for i in batch], embeddings)
+                        done += len(batch)
+                        print(f"  Embedded {done}/{len(texts)}...")
+                        yield batch, embeddings
+                        submit_next()
+            except BaseException:
+                for future in pending:
+                    future.cancel()
+                raise
+
+        if limiter.rate_limited:
+            print(f"  (rate limited {limiter.rate_limited} times)")
+
+    @staticmethod
+    def _plan_batches(texts: list[str], indices: list[int], batch_size: int,
+                      max_batch_tokens: int) -> list[list[int]]:
+        """입력 수와 토큰 수 한도를 모두 지키도록 배치를 나눕니다."""
+        batches: list[list[int]] = []
+        current: list[int] = []
+        tokens = 0
+        for i in indices:
+            n = count_tokens(texts[i])
+            if current and (len(current) >= batch_size or tokens + n > max_batch_tokens):
+                batches.append(current)
+                current, tokens = [], 0
+            current.append(i)
+            tokens += n
+        if current:
+            batches.append(current)
+        return batches
+
+    def _embed_batch(self, batch: list[str], limiter: _RateLimiter, max_retries: int) -> list[list[float]]:
+        # 재시도는 여기서 직접 관리한다 (클라이언트 자체 재시도는 끔).
+        client = self.client.with_options(max_retries=0)
+        for attempt in range(max_retries + 1):
+            limiter.wait()
+            try:
+                response = client.embeddings.create(
+                    model=self.model,
+                    input=batch,
+                    dimensions=self.dim,
+                )
+            except RateLimitError as e:
+                if attempt == max_retries:
+                    raise
+                limiter.backoff(_retry_after(e))
+                continue
+            except (APIConnectionError, APITimeoutError, InternalServerError):
+                if attempt == max_retries:
+                    raise
+                limiter.backoff()
+                continue
+            limiter.success()
+            return [item.embedding for item in response.data]
 
     def embed_query(self, query: str) -> list[float]:
-        """단일 쿼리를 임베딩으로 변환합니다."""
+        """단일 쿼리를 임베딩으로 변환합니다. (캐시 적중 시 API 호출 없음)"""
+        if self.query_cache is not None:
+            cached = self.query_cache.get(self.model, self.dim, query)
+            if cached is not None:
+                return cached.tolist()
+
         response = self.client.embeddings.create(
             model=self.model,
             input=[query],
             dimensions=self.dim,
         )
-        return response.data[0].embedding
+        embedding = response.data[0].embedding
+        if self.query_cache is not None:
+            self.query_cache.put(self.model, self.dim, query, embedding)
+        return embedding
 
 
 class VectorStore:
@@ -89,13 +269,32 @@ class VectorStore:
 
     COLLECTION_NAME = "slowletter"
 
-    def __init__(self, path_or_url: str):
+    def __init__(self, path_or_url: str, quantization: str = "", oversampling: float = 3.0,
+                 manifest=None, slim_payload: bool = False):
         """
         Qdrant 클라이언트 초기화
         - localhost:6333 등 URL 형태면 서버 모드
         - 그 외는 로컬 path 모드
+
+        quantization: "" | "scalar" (int8) | "binary"
+        양자화 벡터는 RAM, 원본 float32는 디스크에 두고, 검색은 양자화 벡터로
+        top_k * oversampling개를 고른 뒤 원본으로 재채점(rescore)한다.
+
+        manifest: indexing.vector_manifest.VectorManifest. 있으면 upsert/delete 때 함께
+        갱신하고, get_existing_hashes가 컬렉션 scroll 대신 매니페스트를 읽는다.
+
+        slim_payload: 검색 시 doc_id/date만 받아온다. 본문은 HybridSearchEngine이 최종
+        top_k에 대해서만 문서 저장소에서 채운다 (doc_lookup).
         """
         import os
+        if QdrantClient is None:
+            raise ImportError("pip install qdrant-client (또는 VECTOR_BACKEND=local)")
+        if quantization not in ("", "scalar", "binary"):
+            raise ValueError(f"Unsupported quantization: {quantization}")
+        self.quantization = quantization
+        self.oversampling = oversampling
+        self.manifest = manifest
+        self.slim_payload = slim_payload
         # 환경변수 QDRANT_URL 우선
         url = os.getenv("QDRANT_URL", path_or_url)
         
@@ -123,8 +322,16 @@ class VectorStore:
         collections = [c.name for c in self.client.get_collections().collections]
         if self.COLLECTION_NAME in collections and recreate:
             self.client.delete_collection(self.COLLECTION_NAME)
+            if self.manifest is not None:
+                self.manifest.clear()
 
         if self.COLLECTION_NAME in collections and not recreate:
+            # 기존 컬렉션에 양자화 설정만 추가 (Qdrant가 백그라운드에서 양자화 벡터를 만든다)
+            if self.quantization:
+                self.client.update_collection(
+                    collection_name=self.COLLECTION_NAME,
+                    quantization_config=self._quantization_config(),
+                )
             return
 
         self.client.create_collection(
@@ -132,7 +339,9 @@ class VectorStore:
             vectors_config=VectorParams(
                 size=dim,
                 distance=Distance.COSINE,
+                on_disk=bool(self.quantization),
             ),
+            quantization_config=self._quantization_config(),
         )
 
         # 페이로드 인덱스 생성 (메타데이터 필터링용)
@@ -142,6 +351,60 @@ class VectorStore:
                 field_name=field,
                 field_schema=PayloadSchemaType.KEYWORD,
             )
+        self._create_date_ord_index()
+
+    def _quantization_config(self):
+        if self.quantization == "scalar":
+            return ScalarQuantization(
+                scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=0.99, always_ram=True)
+            )
+        if self.quantization == "binary":
+            return BinaryQuantization(binary=BinaryQuantizationConfig(always_ram=True))
+        return None
+
+    def _create_date_ord_index(self):
+        """날짜 범위 필터용 정수 인덱스 (date_ord = date.toordinal())"""
+        self.client.create_payload_index(
+            collection_name=self.COLLECTION_NAME,
+            field_name="date_ord",
+            field_schema=PayloadSchemaType.INTEGER,
+        )
+
+    def backfill_date_ordinals(self, limit: int = 1000) -> int:
+        """date_ord가 없는 기존 포인트에 채워 넣습니다 (구버전 컬렉션 마이그레이션)."""
+        if not self.collection_exists():
+            return 0
+        self._create_date_ord_index()
+
+        missing = Filter(must=[IsEmptyCondition(is_empty=PayloadField(key="date_ord"))])
+        by_ord: dict[int, list] = {}
+        next_offset = None
+        while True:
+            points, next_offset = self.client.scroll(
+                collection_name=self.COLLECTION_NAME,
+                scroll_filter=missing,
+                limit=limit,
+                offset=next_offset,
+                with_payload=["date"],
+                with_vectors=False,
+            )
+            for p in points:
+                by_ord.setdefault(date_ordinal(str((p.payload or {}).get("date", ""))), []).append(p.id)
+            if next_offset is None:
+                break
+
+        # 같은 날짜끼리 묶어서 한 번에 set_payload
+        for ord_, ids in by_ord.items():
+            for i in range(0, len(ids), limit):
+                self.client.set_payload(
+                    collection_name=self.COLLECTION_NAME,
+                    payload={"date_ord": ord_},
+                    points=ids[i:i + limit],
+                )
+        total = sum(len(ids) for ids in by_ord.values())
+        if total:
+            print(f"Backfilled date_ord for {total} points")
+        return total
 
     def upsert_documents(
         self,
@@ -154,8 +417,14 @@ class VectorStore:
 
         Point id는 doc_id를 hash로 변환해서 사용합니다 (서버 모드 호환).
         """
-        import hashlib
-        
+        with self._manifest_writing():
+            self._upsert_batches(doc_ids, embeddings, payloads, batch_size)
+        print(f"Upserted {len(doc_ids)} documents to vector store")
+
+    def _manifest_writing(self):
+        return self.manifest.writing() if self.manifest is not None else contextlib.nullcontext()
+
+    def _upsert_batches(self, doc_ids, embeddings, payloads, batch_size: int):
         for i in range(0, len(doc_ids), batch_size):
             batch_ids = doc_ids[i:i + batch_size]
             batch_embeddings = embeddings[i:i + batch_size]
@@ -164,7 +433,7 @@ class VectorStore:
             points = []
             for (did, emb, payload) in zip(batch_ids, batch_embeddings, batch_payloads):
                 # Point ID는 hash로 변환 (서버 모드 호환)
-                point_id = int(hashlib.sha256(did.encode()).hexdigest()[:16], 16)
+                point_id = _point_id(did)
                 points.append(
                     PointStruct(
                         id=point_id,
@@ -177,13 +446,16 @@ class VectorStore:
                 collection_name=self.COLLECTION_NAME,
                 points=points,
             )
-
-        print(f"Upserted {len(doc_ids)} documents to vector store")
+            if self.manifest is not None:
+                self.manifest.upsert(
+                    (p.payload["doc_id"], str(p.id), str(p.payload.get("content_hash", "")),
+                     int(p.payload.get("date_ord") or 0))
+                    for p in points
+                )
 
     def delete_recent_points(self, days: int = 2) -> int:
         """최근 N일분 벡터를 삭제합니다 (재임베딩용)."""
         from datetime import datetime, timedelta
-        from qdrant_client.models import Filter, FieldCondition, Range
 
         if not self.collection_exists():
             return 0
@@ -191,59 +463,95 @@ class VectorStore:
         # days=1 → 오늘만, days=2 → 어제+오늘
         cutoff = (datetime.now() - timedelta(days=max(days - 1, 0))).strftime("%Y-%m-%d")
 
-        # date 필드가 "YYYY-MM-DD" 문자열이므로 >= cutoff 로 필터
-        # Qdrant keyword 필터는 Range를 지원하지 않으므로 scroll + delete로 처리
-        to_delete = []
-        next_offset = None
-        while True:
-            points, next_offset = self.client.scroll(
-                collection_name=self.COLLECTION_NAME,
-                limit=1000,
-                offset=next_offset,
-                with_payload=["date", "doc_id"],
-                with_vectors=False,
-            )
-            for p in points:
-                payload = p.payload or {}
-                date_val = str(payload.get("date", ""))[:10]
-                if date_val >= cutoff:
-                    to_delete.append(p.id)
-            if next_offset is None:
-                break
-
-        if to_delete:
-            self.client.delete(
-                collection_name=self.COLLECTION_NAME,
-                points_selector=to_delete,
-            )
-        print(f"Deleted {len(to_delete)} recent vectors (>= {cutoff})")
-        return len(to_delete)
-
-    def get_existing_hashes(self, limit: int = 2000) -> dict:
-        """현재 컬렉션에 들어있는 문서들의 content_hash를 가져옵니다."""
-        existing: dict[str, str] = {}
+        # date_ord 정수 인덱스에 Range 필터로 바로 삭제 (구버전 포인트는 먼저 채운다)
+        self.backfill_date_ordinals()
+        recent = Filter(must=[FieldCondition(key="date_ord", range=Range(gte=date_ordinal(cutoff)))])
+        count = self.client.count(
+            collection_name=self.COLLECTION_NAME, count_filter=recent, exact=True
+        ).count
+        with self._manifest_writing():
+            if count:
+                self.client.delete(
+                    collection_name=self.COLLECTION_NAME,
+                    points_selector=FilterSelector(filter=recent),
+                )
+            if self.manifest is not None:
+                self.manifest.delete_since(date_ordinal(cutoff))
+        print(f"Deleted {count} recent vectors (>= {cutoff})")
+        return count
+
+    def get_existing_hashes(self, limit: int = 2000, verify_sample: int = 64) -> dict:
+        """현재 컬렉션에 들어있는 문서들의 content_hash를 가져옵니다.
+
+        매니페스트가 있고 포인트 수가 맞으면 매니페스트만 읽는다 (컬렉션 scroll 없음).
+        단, 쓰다가 중단된 흔적(pending)이 있거나 무작위 verify_sample개 포인트의 payload
+        해시가 매니페스트와 다르면 (수는 같아도 밖에서 고쳐 쓴 경우) 컬렉션을 기준으로
+        매니페스트를 다시 쓴다.
+        """
         if not self.collection_exists():
-            return existing
+            if self.manifest is not None:
+                self.manifest.clear()
+            return {}
+
+        if self.manifest is not None:
+            total = self.client.count(collection_name=self.COLLECTION_NAME, exact=True).count
+            if total != self.manifest.count():
+                print(f"Vector manifest out of sync ({self.manifest.count()} vs {total} points), reconciling...")
+            elif self.manifest.pending:
+                print("Vector manifest has an interrupted write, reconciling...")
+            elif not self._manifest_sample_matches(verify_sample):
+                print("Vector manifest differs from sampled collection payloads, reconciling...")
+            else:
+                return self.manifest.hashes()
+
+        rows = self.scroll_manifest_rows(limit=limit)
+        if self.manifest is not None:
+            self.manifest.replace_all(rows)
+        return {doc_id: h for doc_id, _, h, _ in rows}
+
+    def _manifest_sample_matches(self, n: int) -> bool:
+        """매니페스트 무작위 n행을 컬렉션 payload(doc_id/content_hash)와 비교합니다."""
+        rows = self.manifest.sample(n) if n > 0 else []
+        if not rows:
+            return True
+        points = self.client.retrieve(
+            collection_name=self.COLLECTION_NAME,
+            ids=[int(point_id) for _, point_id, _, _ in rows],
+            with_payload=["doc_id", "content_hash"],
+            with_vectors=False,
+        )
+        actual = {str(p.id): p.payload or {} for p in points}
+        return all(
+            str(actual.get(point_id, {}).get("doc_id", "")) == doc_id
+            and str(actual[point_id].get("content_hash", "")) == h
+            for doc_id, point_id, h, _ in rows
+        )
 
+    def scroll_manifest_rows(self, limit: int = 2000) -> list[tuple[str, str, str, int]]:
+        """컬렉션 전체에서 (doc_id, point_id, content_hash, date_ord)만 읽습니다."""
+        rows = []
         next_offset = None
         while True:
             points, next_offset = self.client.scroll(
                 collection_name=self.COLLECTION_NAME,
                 limit=limit,
                 offset=next_offset,
-                with_payload=True,
+                with_payload=["doc_id", "content_hash", "date_ord", "date"],
                 with_vectors=False,
             )
             for p in points:
                 payload = p.payload or {}
                 # 서버 모드 호환: payload에서 doc_id 가져오기
                 doc_id = str(payload.get("doc_id", ""))
-                h = str(payload.get("content_hash", ""))
-                if doc_id:
-                    existing[doc_id] = h
+                if not doc_id:
+                    continue
+                date_ord = payload.get("date_ord")
+                if date_ord is None:
+                    date_ord = date_ordinal(str(payload.get("date", "")))
+                rows.append((doc_id, str(p.id), str(payload.get("content_hash", "")), int(date_ord)))
             if next_offset is None:
                 break
-        return existing
+        return rows
 
     def search(
         self,
@@ -257,9 +565,17 @@ class VectorStore:
         must_conditions = []
 
         if date_start or date_end:
-            # 날짜 범위 필터 - Qdrant에서는 문자열 비교로 처리
-            # 실제 배포시 datetime 인덱스 사용 권장
-            pass
+            # 날짜 범위 필터 - date_ord 정수 인덱스 (양 끝 포함, 부분 날짜는 기간 전체)
+            lo, hi = range_ordinals(date_start, date_end)
+            must_conditions.append(
+                FieldCondition(
+                    key="date_ord",
+                    range=Range(
+                        gte=lo if date_start else None,
+                        lte=hi if date_end else None,
+                    ),
+                )
+            )
 
         if entity_filter:
             # 엔티티 필터 (persons, organizations, concepts 중 하나에 포함)
@@ -277,7 +593,12 @@ class VectorStore:
             query_vector=query_vector,
             limit=top_k,
             query_filter=search_filter,
-            with_payload=True,
+            with_payload=list(SLIM_PAYLOAD_KEYS) if self.slim_payload else True,
+            search_params=SearchParams(
+                quantization=QuantizationSearchParams(
+                    rescore=True, oversampling=self.oversampling
+                )
+            ) if self.quantization else None,
         )
 
         return [
@@ -294,6 +615,98 @@ class VectorStore:
             for hit in results
         ]
 
+    def strip_payloads(self) -> int:
+        """기존 포인트에서 slim payload에 없는 필드(본문 등)를 지웁니다.
+
+        content가 남아 있는 포인트만 대상이라, 한 번 정리된 뒤에는 거의 비용이 없다.
+        """
+        has_content = Filter(must_not=[IsEmptyCondition(is_empty=PayloadField(key="content"))])
+        n = self.client.count(self.COLLECTION_NAME, count_filter=has_content, exact=True).count
+        if n:
+            self.client.delete_payload(
+                collection_name=self.COLLECTION_NAME,
+                keys=list(FULL_PAYLOAD_KEYS),
+                points=FilterSelector(filter=has_content),
+            )
+            print(f"Slimmed payloads: {n} points")
+        return n
+
+
+class _Upserter:
+    """임베딩 배치를 별도 스레드에서 저장소에 반영합니다.
+
+    큐가 max_pending개로 차면 put()이 막히고, 그동안 임베딩 쪽도 새 요청을 보내지 않는다
+    (backpressure). 메모리에는 대기 중인 배치 몇 개만 남는다.
+    """
+
+    def __init__(self, upsert_fn, max_pending: int = 4, on_done=None):
+        self.upsert_fn = upsert_fn
+        self.on_done = on_done
+        self.queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        self.error: Optional[BaseException] = None
+        self.upserted = 0
+        self.thread = threading.Thread(target=self._run, name="vector-upsert", daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            if self.error is not None:
+                continue  # 실패 후에는 남은 배치를 버린다
+            try:
+                self.upsert_fn(*item)
+                self.upserted += len(item[0])
+                if self.on_done is not None:
+                    self.on_done(item[0])
+            except BaseException as e:
+                self.error = e
+
+    def put(self, doc_ids: list[str], embeddings: list, payloads: list[dict]):
+        while True:
+            if self.error is not None:
+                raise self.error
+            try:
+                self.queue.put((doc_ids, embeddings, payloads), timeout=1)
+                return
+            except queue.Full:
+                continue
+
+    def close(self, raise_error: bool = True):
+        self.queue.put(None)
+        self.thread.join()
+        if raise_error and self.error is not None:
+            raise self.error
+
+
+def _read_progress(path: Optional[Path]) -> dict:
+    if path is None or not path.exists():
+        return {}
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except ValueError:
+        return {}
+
+
+def _write_progress(path: Optional[Path], progress: dict):
+    if path is None:
+        return
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(progress, ensure_ascii=False), encoding="utf-8")
+    tmp.replace(path)
+
+
+# slim payload에 남기는 필드 (doc_id, 날짜 필터, 증분 빌드 해시, 엔티티 필터)
+SLIM_PAYLOAD_KEYS = ("doc_id", "date", "date_ord", "content_hash", "all_entities")
+FULL_PAYLOAD_KEYS = ("title", "content", "persons", "organizations", "concepts", "events", "locations")
+
+
+def _point_id(doc_id: str) -> int:
+    import hashlib
+
+    return int(hashlib.sha256(doc_id.encode()).hexdigest()[:16], 16)
+
 
 def _hash_text(t: str) -> str:
     import hashlib
@@ -308,23 +721,53 @@ def build_index(
     incremental: bool = True,
     recreate: bool = False,
     refresh_days: int = 0,
+    store=None,
+    checkpoint_path: Optional[str] = None,
+    max_concurrency: int = 4,
+    slim_payload: bool = False,
 ):
     """CSV에서 벡터 인덱스를 구축합니다.
 
     - incremental=True: 기존 Qdrant 컬렉션이 있으면 doc_id/content_hash 기준으로 증분 임베딩
     - recreate=True: 벡터 컬렉션을 삭제 후 전체 재생성
+    - store: 미리 연 저장소 (예: LocalVectorStore). 없으면 VectorStore(vector_dir)
+    - checkpoint_path: 임베딩 체크포인트 SQLite. 중간에 실패해도 재실행 시 완료된 배치는
+      다시 과금하지 않는다. 저장소 반영까지 성공하면 비운다.
+    - slim_payload: payload에 doc_id/날짜/해시/엔티티 필터 키만 저장 (본문은 문서 저장소에서 조회).
+      기존 포인트의 본문 필드도 함께 지운다.
+
+    임베딩 배치는 끝나는 대로 업서트 스레드로 넘어가 바로 저장소에 반영된다 (스트리밍).
+    중단된 뒤 다시 실행하면 이미 반영된 문서는 content_hash가 같아 건너뛰고, 중단된
+    전체 재빌드(recreate)는 컬렉션을 다시 지우지 않고 이어서 진행한다.
 
     기본은 증분(incremental)이며, 일주일에 한 번 등 필요할 때 recreate를 사용합니다.
     """
     print("=== Vector Index Build ===")
 
+    progress_path = Path(checkpoint_path).with_suffix(".progress.json") if checkpoint_path else None
+    progress = _read_progress(progress_path)
+
     # 0) store 준비
-    store = VectorStore(vector_dir)
+    if store is None:
+        store = VectorStore(vector_dir)
+    if recreate and progress.get("recreate"):
+        print(f"중단된 전체 재빌드 이어서 진행 (반영됨: {progress.get('upserted', 0)}건, "
+              f"마지막 doc_id: {progress.get('last_doc_id', '')})")
+        recreate = False
+        incremental = True
     store.create_collection(dim=3072, recreate=recreate)
+    if recreate:
+        progress = {"recreate": True, "upserted": 0, "last_doc_id": ""}
+        _write_progress(progress_path, progress)
+
+    # 로컬 저장소: 이전 실행에서 staging에 남은 배치를 먼저 반영한다.
+    if hasattr(store, "commit_staged"):
+        store.commit_staged()
 
     existing_hashes = {}
     if incremental and not recreate:
         # refresh_days > 0이면 최근 N일분 벡터 삭제 → 재임베딩 (교정·교열 반영)
+        store.backfill_date_ordinals()
         if refresh_days > 0:
             store.delete_recent_points(days=refresh_days)
         print("Loading existing vector index (hashes)...")
@@ -372,6 +815,7 @@ def build_index(
         doc_ids.append(doc_id)
         payloads.append({
             "date": (row.get("date", "") or "")[:10],
+            "date_ord": date_ordinal((row.get("date", "") or "")[:10]),
             "title": title,
             "content": content,
             "persons": persons,
@@ -382,21 +826,51 @@ def build_index(
             "content_hash": h,
             "all_entities": "; ".join(filter(None, [persons, orgs, concepts])),
         })
+        if slim_payload:
+            payloads[-1] = {k: payloads[-1][k] for k in SLIM_PAYLOAD_KEYS if k in payloads[-1]}
 
     # 3. 임베딩 생성
     print(f"Embedding targets: {len(texts)} (skipped unchanged: {skipped})")
     if not texts:
         print("No changes. Vector index is up to date.")
+        if slim_payload and hasattr(store, "strip_payloads"):
+            store.strip_payloads()
+        if progress_path is not None and progress_path.exists():
+            progress_path.unlink()
         print("=== Build Complete ===")
         return
 
-    embedder = SlowLetterEmbedder(openai_api_key)
-    embeddings = embedder.embed_texts(texts)
-    print(f"Generated {len(embeddings)} embeddings")
+    from indexing.cache import EmbeddingCache
+    checkpoint = EmbeddingCache(checkpoint_path, lru_size=0) if checkpoint_path else None
+
+    # 4. 임베딩 → 업서트 스트리밍 (로컬 저장소는 staging에 쌓았다가 한 번에 반영)
+    def on_done(batch_ids: list[str]):
+        progress["upserted"] = progress.get("upserted", 0) + len(batch_ids)
+        progress["last_doc_id"] = batch_ids[-1]
+        _write_progress(progress_path, progress)
 
-    # 4. 벡터 저장소에 삽입
-    print("Upserting to vector store...")
-    store.upsert_documents(doc_ids, embeddings, payloads)
+    embedder = SlowLetterEmbedder(openai_api_key)
+    upserter = _Upserter(getattr(store, "stage_documents", store.upsert_documents), on_done=on_done)
+    try:
+        for batch, embeddings in embedder.iter_embeddings(
+            texts, max_concurrency=max_concurrency, checkpoint=checkpoint
+        ):
+            upserter.put([doc_ids[i] for i in batch], embeddings, [payloads[i] for i in batch])
+    except BaseException:
+        upserter.close(raise_error=False)
+        raise
+    upserter.close()
+    if hasattr(store, "commit_staged"):
+        store.commit_staged()
+    print(f"Upserted {upserter.upserted} documents")
+    if slim_payload and hasattr(store, "strip_payloads"):
+        store.strip_payloads()
+
+    if checkpoint is not None:
+        checkpoint.clear()
+        checkpoint.close()
+    if progress_path is not None and progress_path.exists():
+        progress_path.unlink()
 
     print("=== Build Complete ===")
 
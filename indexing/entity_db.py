@@ -1,163 +1,520 @@
 """
 SQLite 기반 엔티티 데이터베이스 구축
-- 문서 테이블: 전체 문서 메타데이터 + 콘텐츠
-- 엔티티 테이블: 엔티티-문서 관계 (시계열 쿼리용)
+- 문서 테이블: 문서 메타데이터 (본문은 세대의 문서 저장소 한 벌만, doc_id로 읽는다)
+- 엔티티 사전(entity) + 정수 링크 테이블(doc_entity): 이름을 id로 한 번 풀고 날짜 범위 스캔
+- 엔티티 롤업(entity_rollup): 일/ISO 주/월별 문서 수와 최신 문서 → 타임라인은 키 조회
+- FTS5 trigram 인덱스: 키워드/언론사/엔티티 이름 부분 문자열 검색 (3글자 이상은 인덱스 조회)
 """
 from __future__ import annotations
+import calendar
+import copy
 import csv
+import hashlib
+import itertools
+import json
 import sqlite3
 from collections import defaultdict
+from datetime import date, timedelta
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 
+from indexing.cache import LRUCache, normalize_query
+from indexing.cooccurrence import (
+    COOCCUR_SCHEMA, COOCCUR_TABLE, escape_like, month_ordinal, top_co_entities, write_cooccurrence,
+)
+from indexing.dates import date_ordinal, range_ordinals
+from indexing.doc_store import DocStore
+from indexing.sqlite_pool import ReadOnlyPool
 
-def create_db(csv_path: str, db_path: str) -> None:
-    """CSV에서 SQLite DB를 구축합니다."""
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
+# 키워드 검색 대상 컬럼 (content 외에는 documents와 같은 이름)
+# documents에 본문이 없으므로 documents_fts는 contentless 테이블이고, 행은 create_db/sync_db가 넣는다
+FTS_COLUMNS = ("title", "content", "concepts", "events", "organizations")
 
-    # 테이블 생성
-    cursor.executescript("""
-        DROP TABLE IF EXISTS documents;
-        DROP TABLE IF EXISTS entities;
-        DROP TABLE IF EXISTS daily_summaries;
+# sync_db가 지우지 못하고 남긴 documents_fts 행이 문서 수의 이 비율을 넘으면 FTS를 다시 채운다
+FTS_MAX_STALE_RATIO = 0.2
 
-        CREATE TABLE documents (
-            doc_id TEXT PRIMARY KEY,
-            date TEXT NOT NULL,
-            title TEXT NOT NULL,
-            content TEXT NOT NULL,
-            content_for_service TEXT,
-            persons TEXT,
-            organizations TEXT,
-            concepts TEXT,
-            events TEXT,
-            locations TEXT,
-            total_entities INTEGER DEFAULT 0
-        );
-
-        CREATE TABLE entities (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            entity_name TEXT NOT NULL,
-            entity_type TEXT NOT NULL,  -- person, organization, concept, event, location
-            doc_id TEXT NOT NULL,
-            date TEXT NOT NULL,
-            FOREIGN KEY (doc_id) REFERENCES documents(doc_id)
-        );
-
-        -- 날짜별 요약 (시계열 브라우징용)
-        CREATE TABLE daily_summaries (
-            date TEXT PRIMARY KEY,
-            doc_count INTEGER,
-            titles TEXT,  -- JSON array
-            top_persons TEXT,
-            top_organizations TEXT,
-            top_concepts TEXT
-        );
-
-        -- 인덱스
-        CREATE INDEX idx_documents_date ON documents(date);
-        CREATE INDEX idx_entities_name ON entities(entity_name);
-        CREATE INDEX idx_entities_type_date ON entities(entity_type, date);
-        CREATE INDEX idx_entities_name_date ON entities(entity_name, date);
-        CREATE INDEX idx_entities_doc ON entities(doc_id);
-    """)
 
-    # CSV 읽기 및 삽입
-    print(f"Reading CSV: {csv_path}")
-    with open(csv_path, encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        rows = list(reader)
-
-    print(f"Total rows: {len(rows)}")
-
-    # 문서 삽입
-    doc_count = 0
-    entity_count = 0
-    for row in rows:
-        doc_id = row.get("ID", "")
-        date = row.get("date", "")[:10]  # YYYY-MM-DD
-        title = row.get("title", "")
-        content = row.get("cleaned_content_for_api", "")
-        content_svc = row.get("cleaned_content_for_service", "")
-        persons = row.get("solar_persons", "")
-        orgs = row.get("solar_organizations", "")
-        concepts = row.get("solar_concepts", "")
-        events = row.get("solar_events", "")
-        locations = row.get("solar_locations", "")
-        total_ent = int(row.get("total_entities", 0) or 0)
-
-        if not doc_id or not content:
+# (원본 테이블, FTS 테이블, 컬럼): external content trigram 인덱스
+FTS_TABLES = (
+    ("entity", "entity_fts", ("name", "aliases")),
+)
+
+
+def _create_fts(cursor) -> bool:
+    """trigram FTS5 인덱스를 만듭니다 (documents_fts는 빈 테이블, entity_fts는 동기화 트리거 포함).
+
+    SQLite에 FTS5/trigram이 없으면 False (EntityDB는 LIKE 스캔으로 동작).
+    documents_fts는 contentless라 색인만 저장한다. 3.40에는 contentless_delete가 없어
+    행을 지우려면 원래 값이 필요하므로, 지운 문서의 행은 남겨 두고 documents.id를 재사용하지 않는다
+    (AUTOINCREMENT → 남은 행은 어떤 문서와도 조인되지 않는다).
+    """
+    try:
+        cursor.execute(f"""
+            CREATE VIRTUAL TABLE documents_fts USING fts5(
+                {", ".join(FTS_COLUMNS)}, content='', tokenize='trigram'
+            )
+        """)
+    except sqlite3.OperationalError as e:
+        print(f"Warning: FTS5 trigram unavailable ({e}), keyword search falls back to LIKE")
+        return False
+    for table, fts, columns in FTS_TABLES:
+        cols = ", ".join(columns)
+        new_cols = ", ".join(f"new.{c}" for c in columns)
+        old_cols = ", ".join(f"old.{c}" for c in columns)
+        cursor.execute(f"""
+            CREATE VIRTUAL TABLE {fts} USING fts5(
+                {cols}, content='{table}', content_rowid='id', tokenize='trigram'
+            )
+        """)
+        cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+        cursor.executescript(f"""
+            CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN
+                INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_cols});
+            END;
+            CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN
+                INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_cols});
+            END;
+            CREATE TRIGGER {fts}_au AFTER UPDATE ON {table} BEGIN
+                INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_cols});
+                INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_cols});
+            END;
+        """)
+    return True
+
+
+def _fts_row(doc_num: int, values: tuple, content: str) -> tuple:
+    """documents_fts 행 (rowid + FTS_COLUMNS 순서 값)."""
+    row = dict(zip(DOC_COLUMNS, values), content=content)
+    return (doc_num,) + tuple(row[c] for c in FTS_COLUMNS)
+
+
+def _insert_fts(cursor, rows):
+    cursor.executemany(
+        f"INSERT INTO documents_fts (rowid, {', '.join(FTS_COLUMNS)}) "
+        f"VALUES ({', '.join('?' * (len(FTS_COLUMNS) + 1))})",
+        rows,
+    )
+
+
+def _refill_fts(cursor, docs: dict[str, tuple], contents: dict[str, str]):
+    """documents_fts를 비우고 현재 문서로 다시 채웁니다 (남은 행 정리)."""
+    cursor.execute("INSERT INTO documents_fts(documents_fts) VALUES ('delete-all')")
+    _insert_fts(cursor, (
+        _fts_row(doc_num, docs[doc_id], contents[doc_id])
+        for doc_num, doc_id in cursor.execute("SELECT id, doc_id FROM documents").fetchall()
+    ))
+    cursor.execute("INSERT OR REPLACE INTO db_meta (key, value) VALUES ('fts_stale', '0')")
+
+
+# entity_rules.json의 타입 키 → entity.type
+RULE_TYPES = {"person": "person", "org": "organization"}
+
+# documents 컬럼 → entity.type
+ENTITY_COLUMNS = {
+    "persons": "person",
+    "organizations": "organization",
+    "concepts": "concept",
+    "events": "event",
+    "locations": "location",
+}
+
+
+def load_entity_rules(rules_path: Optional[str]) -> dict[str, dict[str, str]]:
+    """entity_rules.json을 {entity.type: {별칭: 대표 이름}}으로 읽습니다.
+
+    대표 이름이 빈 값인 규칙(웹 표시에서 빼는 항목)은 DB에서는 원래 이름 그대로 둔다.
+    """
+    if not rules_path or not Path(rules_path).exists():
+        return {}
+    with open(rules_path, encoding="utf-8") as f:
+        raw = json.load(f)
+    rules: dict[str, dict[str, str]] = {}
+    for key, mapping in raw.items():
+        etype = RULE_TYPES.get(key)
+        if etype is None:
             continue
+        rules[etype] = {alias: canonical for alias, canonical in mapping.items() if canonical}
+    return rules
 
-        cursor.execute("""
-            INSERT OR REPLACE INTO documents
-            (doc_id, date, title, content, content_for_service,
-             persons, organizations, concepts, events, locations, total_entities)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (doc_id, date, title, content, content_svc,
-              persons, orgs, concepts, events, locations, total_ent))
-        doc_count += 1
-
-        # 엔티티 삽입
-        entity_map = {
-            "person": persons,
-            "organization": orgs,
-            "concept": concepts,
-            "event": events,
-            "location": locations,
-        }
-        for etype, evalue in entity_map.items():
-            if evalue:
-                for name in evalue.split(";"):
-                    name = name.strip()
-                    if name:
-                        cursor.execute("""
-                            INSERT INTO entities (entity_name, entity_type, doc_id, date)
-                            VALUES (?, ?, ?, ?)
-                        """, (name, etype, doc_id, date))
-                        entity_count += 1
+
+class _EntityDictionary:
+    """엔티티 사전: (대표 이름, 타입) → 정수 id, 별칭 수집
+
+    conn을 주면 기존 entity 테이블에서 시작하고, 새로 생기거나 별칭이 늘어난 id를 기록한다.
+    """
+
+    def __init__(self, rules: dict[str, dict[str, str]], conn=None):
+        self.rules = rules
+        self.ids: dict[tuple[str, str], int] = {}
+        self.aliases: dict[int, set[str]] = defaultdict(set)
+        self.dirty: set[int] = set()
+        self._next_id = 1
+        if conn is not None:
+            for entity_id, name, etype, aliases in conn.execute(
+                "SELECT id, name, type, aliases FROM entity"
+            ):
+                self.ids[(name, etype)] = entity_id
+                self.aliases[entity_id].update(_split_names(aliases))
+                self._next_id = max(self._next_id, entity_id + 1)
+
+    def resolve(self, name: str, etype: str) -> int:
+        canonical = self.rules.get(etype, {}).get(name, name)
+        key = (canonical, etype)
+        entity_id = self.ids.get(key)
+        if entity_id is None:
+            entity_id = self._next_id
+            self._next_id += 1
+            self.ids[key] = entity_id
+            self.dirty.add(entity_id)
+        if name != canonical and name not in self.aliases[entity_id]:
+            self.aliases[entity_id].add(name)
+            self.dirty.add(entity_id)
+        return entity_id
+
+    def rows(self, only_dirty: bool = False):
+        for (name, etype), entity_id in self.ids.items():
+            if only_dirty and entity_id not in self.dirty:
+                continue
+            yield entity_id, name, etype, "; ".join(sorted(self.aliases.get(entity_id, ())))
+
+
+def _split_names(value: str) -> list[str]:
+    return [n.strip() for n in (value or "").split(";") if n.strip()]
+
+
+# documents 컬럼 순서 (content_hash는 나머지 값과 본문으로 계산)
+DOC_COLUMNS = (
+    "doc_id", "date", "title",
+    "persons", "organizations", "concepts", "events", "locations", "total_entities",
+)
+
+SCHEMA_VERSION = 6
+
+_SCHEMA = """
+    -- id는 doc_entity/entity_rollup/FTS가 참조하는 문서 번호 (INTEGER PRIMARY KEY라 VACUUM에도 유지)
+    -- AUTOINCREMENT: 지운 문서의 id를 다시 쓰지 않는다 (documents_fts에 남은 행이 새 문서에 붙지 않게)
+    CREATE TABLE documents (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        doc_id TEXT NOT NULL UNIQUE,
+        date TEXT NOT NULL,
+        title TEXT NOT NULL,
+        persons TEXT,
+        organizations TEXT,
+        concepts TEXT,
+        events TEXT,
+        locations TEXT,
+        total_entities INTEGER DEFAULT 0,
+        content_hash TEXT NOT NULL DEFAULT ''  -- 증분 동기화 변경 감지
+    );
+
+    -- 엔티티 사전 (대표 이름 + 타입당 한 행, entity_rules.json 별칭 포함)
+    CREATE TABLE entity (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        type TEXT NOT NULL,  -- person, organization, concept, event, location
+        aliases TEXT NOT NULL DEFAULT '',  -- '; ' 구분
+        UNIQUE (name, type)
+    );
+
+    -- 엔티티-문서 관계 (정수만, 엔티티별 날짜 범위 스캔용)
+    -- doc_num은 documents.id: 바뀐 문서는 sync_db가 새 id로 다시 넣고 링크도 다시 만든다
+    CREATE TABLE doc_entity (
+        entity_id INTEGER NOT NULL,
+        date_ord INTEGER NOT NULL,
+        doc_num INTEGER NOT NULL,
+        PRIMARY KEY (entity_id, date_ord, doc_num)
+    ) WITHOUT ROWID;
+
+    -- 엔티티별 기간 롤업 (타임라인 키 조회용, granularity: day/week/month)
+    -- start_ord~end_ord는 기간의 첫날/마지막 날 ordinal, week는 ISO 주 (YYYY-Www)
+    CREATE TABLE entity_rollup (
+        entity_id INTEGER NOT NULL,
+        granularity TEXT NOT NULL,
+        start_ord INTEGER NOT NULL,
+        end_ord INTEGER NOT NULL,
+        period TEXT NOT NULL,
+        doc_count INTEGER NOT NULL,
+        doc_nums TEXT NOT NULL,  -- 최신 문서 documents.id (',' 구분, 최대 ROLLUP_TOP_DOCS개)
+        PRIMARY KEY (entity_id, granularity, start_ord)
+    ) WITHOUT ROWID;
+
+    -- 날짜별 요약 (시계열 브라우징용)
+    CREATE TABLE daily_summaries (
+        date TEXT PRIMARY KEY,
+        doc_count INTEGER,
+        titles TEXT,  -- JSON array
+        top_persons TEXT,
+        top_organizations TEXT,
+        top_concepts TEXT
+    );
+
+    -- 빌드 정보 (스키마 버전, 엔티티 규칙 해시)
+    CREATE TABLE db_meta (
+        key TEXT PRIMARY KEY,
+        value TEXT NOT NULL
+    );
+"""
+
+# 보조 인덱스 (create_db는 데이터를 모두 넣은 뒤 만든다)
+_INDEXES = """
+    CREATE INDEX idx_documents_date ON documents(date);
+    CREATE INDEX idx_entity_name ON entity(name);
+    CREATE INDEX idx_doc_entity_doc ON doc_entity(doc_num);
+"""
+
+
+def _read_csv_docs(csv_path: str) -> tuple[dict[str, tuple], dict[str, str]]:
+    """CSV를 doc_id → documents 행 값(DOC_COLUMNS 순서 + content_hash), doc_id → 본문으로 읽습니다.
+
+    본문은 documents에 넣지 않고 FTS 색인에만 쓴다.
+    doc_id 중복 시 마지막 행 기준 (문서와 엔티티 링크가 어긋나지 않게)
+    """
+    docs: dict[str, tuple] = {}
+    contents: dict[str, str] = {}
+    with open(csv_path, encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            doc_id = row.get("ID", "")
+            content = row.get("cleaned_content_for_api", "")
+            if not doc_id or not content:
+                continue
+            values = (
+                doc_id,
+                row.get("date", "")[:10],  # YYYY-MM-DD
+                row.get("title", ""),
+                row.get("solar_persons", ""),
+                row.get("solar_organizations", ""),
+                row.get("solar_concepts", ""),
+                row.get("solar_events", ""),
+                row.get("solar_locations", ""),
+                int(row.get("total_entities", 0) or 0),
+            )
+            digest = hashlib.sha1("\x1f".join(map(str, values + (content,))).encode("utf-8")).hexdigest()
+            docs[doc_id] = values + (digest,)
+            contents[doc_id] = content
+    return docs, contents
+
+
+# 행 값에서 엔티티 컬럼 위치
+_ENTITY_VALUE_INDEX = tuple((DOC_COLUMNS.index(c), etype) for c, etype in ENTITY_COLUMNS.items())
+
+
+def _entity_links(dictionary: _EntityDictionary, values: tuple, doc_num: int) -> list[tuple]:
+    """문서 행 값에서 (entity_id, date_ord, doc_num) 링크를 만듭니다."""
+    date_ord = date_ordinal(values[1])
+    links = set()
+    for i, etype in _ENTITY_VALUE_INDEX:
+        for name in _split_names(values[i]):
+            links.add((dictionary.resolve(name, etype), date_ord, doc_num))
+    return sorted(links)
+
+
+def _write_daily_summaries(cursor, dates: Optional[set[str]] = None):
+    """documents에서 날짜별 요약을 다시 계산합니다 (dates가 있으면 그 날짜만)."""
+    query = "SELECT date, title, persons, organizations, concepts FROM documents WHERE date != ''"
+    params: list = []
+    if dates is not None:
+        if not dates:
+            return
+        cursor.execute("CREATE TEMP TABLE IF NOT EXISTS _changed_dates (date TEXT PRIMARY KEY)")
+        cursor.execute("DELETE FROM _changed_dates")
+        cursor.executemany("INSERT OR IGNORE INTO _changed_dates VALUES (?)", [(d,) for d in dates])
+        cursor.execute("DELETE FROM daily_summaries WHERE date IN (SELECT date FROM _changed_dates)")
+        query += " AND date IN (SELECT date FROM _changed_dates)"
+    query += " ORDER BY id"
 
     # 날짜별 요약 생성 (Python으로 처리 - Mac SQLite 호환성)
     daily_data = defaultdict(lambda: {"titles": [], "persons": set(), "orgs": set(), "concepts": set()})
-    for row in rows:
-        d = row.get("date", "")[:10]
-        if not d or not row.get("cleaned_content_for_api", ""):
-            continue
-        daily_data[d]["titles"].append(row.get("title", ""))
-        for p in row.get("solar_persons", "").split(";"):
-            p = p.strip()
-            if p:
-                daily_data[d]["persons"].add(p)
-        for o in row.get("solar_organizations", "").split(";"):
-            o = o.strip()
-            if o:
-                daily_data[d]["orgs"].add(o)
-        for c in row.get("solar_concepts", "").split(";"):
-            c = c.strip()
-            if c:
-                daily_data[d]["concepts"].add(c)
-
-    for date_key, info in daily_data.items():
-        cursor.execute("""
-            INSERT OR REPLACE INTO daily_summaries
-            (date, doc_count, titles, top_persons, top_organizations, top_concepts)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (
+    for d, title, persons, orgs, concepts in cursor.execute(query, params).fetchall():
+        daily_data[d]["titles"].append(title)
+        daily_data[d]["persons"].update(_split_names(persons))
+        daily_data[d]["orgs"].update(_split_names(orgs))
+        daily_data[d]["concepts"].update(_split_names(concepts))
+
+    cursor.executemany("""
+        INSERT OR REPLACE INTO daily_summaries
+        (date, doc_count, titles, top_persons, top_organizations, top_concepts)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, [
+        (
             date_key,
             len(info["titles"]),
             " | ".join(info["titles"]),
             "; ".join(info["persons"]),
             "; ".join(info["orgs"]),
             "; ".join(info["concepts"]),
-        ))
+        )
+        for date_key, info in daily_data.items()
+    ])
+
+
+GRANULARITIES = ("day", "week", "month")
+ROLLUP_TOP_DOCS = 5
+
+
+@lru_cache(maxsize=65536)
+def _bucket(date_ord: int, granularity: str) -> tuple[int, int, str]:
+    """날짜 ordinal → (기간 첫날 ordinal, 마지막 날 ordinal, 기간 이름)."""
+    d = date.fromordinal(date_ord)
+    if granularity == "month":
+        last = calendar.monthrange(d.year, d.month)[1]
+        return (d.replace(day=1).toordinal(), d.replace(day=last).toordinal(),
+                f"{d.year}-{d.month:02d}")
+    if granularity == "week":
+        year, week, weekday = d.isocalendar()
+        start = d - timedelta(days=weekday - 1)
+        return start.toordinal(), start.toordinal() + 6, f"{year}-W{week:02d}"
+    return date_ord, date_ord, d.isoformat()
+
+
+def _aligned_range(
+    date_start: Optional[str], date_end: Optional[str], granularity: str
+) -> Optional[tuple[int, int]]:
+    """검색 기간이 granularity 기간 경계에 맞으면 [lo, hi] ordinal, 아니면 None."""
+    lo, hi = range_ordinals(date_start, date_end)
+    lo = max(lo, 1)
+    if date_start and _bucket(lo, granularity)[0] != lo:
+        return None
+    if date_end and hi < date.max.toordinal() and _bucket(hi, granularity)[1] != hi:
+        return None
+    return lo, hi
+
+
+def _write_rollups(cursor, entity_ids: Optional[set[int]] = None):
+    """doc_entity에서 엔티티 롤업을 다시 계산합니다 (entity_ids가 있으면 그 엔티티만).
+
+    링크를 (엔티티, 날짜 역순)으로 한 번 훑어 엔티티마다 기간별 문서 수와 최신 문서
+    ROLLUP_TOP_DOCS개를 모은다. 날짜가 없는 문서(date_ord 0)는 롤업에 넣지 않는다.
+    """
+    query = "SELECT entity_id, date_ord, doc_num FROM doc_entity WHERE date_ord > 0"
+    if entity_ids is not None:
+        if not entity_ids:
+            return
+        cursor.execute("CREATE TEMP TABLE IF NOT EXISTS _changed_entities (id INTEGER PRIMARY KEY)")
+        cursor.execute("DELETE FROM _changed_entities")
+        cursor.executemany("INSERT OR IGNORE INTO _changed_entities VALUES (?)", [(e,) for e in entity_ids])
+        cursor.execute("DELETE FROM entity_rollup WHERE entity_id IN (SELECT id FROM _changed_entities)")
+        query += " AND entity_id IN (SELECT id FROM _changed_entities)"
+    query += " ORDER BY entity_id, date_ord DESC, doc_num DESC"
+    rows = cursor.execute(query).fetchall()
+
+    def rollup_rows():
+        for entity_id, links in itertools.groupby(rows, key=lambda r: r[0]):
+            buckets: dict[tuple[str, int], list] = {}
+            for _, date_ord, doc_num in links:
+                for g in GRANULARITIES:
+                    start, end, period = _bucket(date_ord, g)
+                    b = buckets.get((g, start))
+                    if b is None:
+                        b = buckets[(g, start)] = [end, period, 0, []]
+                    b[2] += 1
+                    if len(b[3]) < ROLLUP_TOP_DOCS:
+                        b[3].append(doc_num)
+            for (g, start), (end, period, count, doc_nums) in sorted(buckets.items()):
+                yield entity_id, g, start, end, period, count, ",".join(map(str, doc_nums))
+
+    cursor.executemany("""
+        INSERT INTO entity_rollup
+        (entity_id, granularity, start_ord, end_ord, period, doc_count, doc_nums)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """, rollup_rows())
+
+
+def _rules_hash(rules: dict) -> str:
+    return hashlib.sha1(json.dumps(rules, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def _write_meta(cursor, rules: dict):
+    cursor.executemany("INSERT OR REPLACE INTO db_meta (key, value) VALUES (?, ?)", [
+        ("schema_version", str(SCHEMA_VERSION)),
+        ("rules_hash", _rules_hash(rules)),
+    ])
+
+
+def create_db(csv_path: str, db_path: str, rules_path: Optional[str] = None) -> None:
+    """CSV에서 SQLite DB를 처음부터 구축합니다 (벌크 로드).
+
+    rules_path: entity_rules.json (별칭 → 대표 이름). 없으면 원래 이름을 그대로 쓴다.
+
+    CSV는 한 번만 읽고, 문서 id를 미리 정해 executemany로 넣은 뒤 인덱스/FTS를 만든다.
+    로드 중에는 저널과 fsync를 끄므로 (중간에 죽으면 DB가 깨진다) 새 세대 디렉토리처럼
+    아직 아무도 읽지 않는 파일에 쓴다. 끝나면 ANALYZE 후 WAL로 전환한다.
+    """
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=OFF")
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.execute("PRAGMA cache_size=-262144")  # 256MB
+    conn.execute("PRAGMA temp_store=MEMORY")
+    cursor = conn.cursor()
 
+    # 테이블 생성
+    cursor.executescript("""
+        DROP TABLE IF EXISTS documents_fts;
+        DROP TABLE IF EXISTS entity_fts;
+        DROP TABLE IF EXISTS entities;
+        DROP TABLE IF EXISTS entity_rollup;
+        DROP TABLE IF EXISTS entity_cooccur;
+        DROP TABLE IF EXISTS doc_entity;
+        DROP TABLE IF EXISTS entity;
+        DROP TABLE IF EXISTS documents;
+        DROP TABLE IF EXISTS daily_summaries;
+        DROP TABLE IF EXISTS db_meta;
+    """ + _SCHEMA + COOCCUR_SCHEMA)
+
+    # CSV 읽기 및 삽입
+    print(f"Reading CSV: {csv_path}")
+    docs, contents = _read_csv_docs(csv_path)
+    print(f"Total rows: {len(docs)}")
+
+    rules = load_entity_rules(rules_path)
+    dictionary = _EntityDictionary(rules)
+
+    # 문서 삽입 (id를 직접 매겨 lastrowid 없이 링크를 만든다)
+    links = []
+
+    def doc_rows():
+        for doc_num, values in enumerate(docs.values(), start=1):
+            links.extend(_entity_links(dictionary, values, doc_num))
+            yield (doc_num,) + values
+
+    placeholders = ", ".join("?" * (len(DOC_COLUMNS) + 2))
+    cursor.execute("BEGIN")
+    cursor.executemany(
+        f"INSERT INTO documents (id, {', '.join(DOC_COLUMNS)}, content_hash) VALUES ({placeholders})",
+        doc_rows(),
+    )
+    cursor.executemany(
+        "INSERT INTO entity (id, name, type, aliases) VALUES (?, ?, ?, ?)", dictionary.rows()
+    )
+    # 기본키 순서로 넣으면 WITHOUT ROWID B-tree에 append만 일어난다
+    links.sort()
+    cursor.executemany(
+        "INSERT INTO doc_entity (entity_id, date_ord, doc_num) VALUES (?, ?, ?)", links
+    )
+    _write_rollups(cursor)
+    _write_daily_summaries(cursor)
+    _write_meta(cursor, rules)
+    conn.commit()
+
+    # 인덱스, 키워드 검색 인덱스 (문서를 모두 넣은 뒤 한 번에 만든다)
+    cursor.executescript(_INDEXES)
+    # 공출현은 doc_entity 자기 조인이라 doc_num 인덱스가 생긴 뒤에 만든다
+    write_cooccurrence(cursor)
+    has_fts = _create_fts(cursor)
+    if has_fts:
+        _insert_fts(cursor, (
+            _fts_row(doc_num, values, contents[doc_id])
+            for doc_num, (doc_id, values) in enumerate(docs.items(), start=1)
+        ))
     conn.commit()
-    print(f"DB created: {doc_count} documents, {entity_count} entity links")
+    cursor.execute("ANALYZE")
+    conn.commit()
+    conn.execute("PRAGMA journal_mode=WAL")
+    print(f"DB created: {len(docs)} documents, {len(links)} entity links"
+          + (", FTS5 trigram index" if has_fts else ""))
 
-    # 통계 출력 (Mac SQLite 호환 - 서브쿼리 사용)
-    cursor.execute("SELECT COUNT(*) FROM (SELECT DISTINCT entity_name FROM entities)")
-    unique_entities = cursor.fetchone()[0]
+    # 통계 출력
+    unique_entities = cursor.execute("SELECT COUNT(*) FROM entity").fetchone()[0]
     cursor.execute("SELECT COUNT(*) FROM (SELECT DISTINCT date FROM documents)")
     unique_dates = cursor.fetchone()[0]
     print(f"Unique entities: {unique_entities}, Unique dates: {unique_dates}")
@@ -165,68 +522,330 @@ def create_db(csv_path: str, db_path: str) -> None:
     conn.close()
 
 
+def _db_meta(conn) -> dict:
+    """db_meta 키/값 (db_meta가 없는 구버전 DB면 빈 dict)."""
+    try:
+        return dict(conn.execute("SELECT key, value FROM db_meta"))
+    except sqlite3.OperationalError:
+        return {}
+
+
+def _sync_ready(conn, rules: dict) -> bool:
+    """증분 동기화가 가능한 DB인지 (같은 스키마 버전, 같은 엔티티 규칙)."""
+    meta = _db_meta(conn)
+    return (meta.get("schema_version") == str(SCHEMA_VERSION)
+            and meta.get("rules_hash") == _rules_hash(rules))
+
+
+def sync_db(
+    csv_path: str,
+    db_path: str,
+    rules_path: Optional[str] = None,
+    base_path: Optional[str] = None,
+) -> dict:
+    """CSV와 DB를 doc_id/content_hash로 비교해 바뀐 문서만 반영합니다.
+
+    - 추가/변경/삭제를 한 트랜잭션으로 적용 (WAL이라 읽는 쪽은 막히지 않고 이전 상태를 본다)
+    - 바뀐 문서는 지우고 새 id로 다시 넣는다 (링크/롤업/공출현은 어차피 다시 계산한다).
+      contentless FTS에서 지우지 못한 행은 남겨 두고, 문서 수의 FTS_MAX_STALE_RATIO를 넘으면 다시 채운다
+    - daily_summaries는 바뀐 날짜만, entity_rollup은 링크가 바뀐 엔티티만,
+      entity_cooccur는 바뀐 문서가 속한 달만 다시 계산한다
+    base_path: 기준 DB (새 세대 디렉토리에 쓸 때 이전 세대 DB를 복사해서 시작한다)
+    스키마 버전이나 entity_rules.json이 바뀌었으면 create_db로 전체 재구축한다.
+    """
+    rules = load_entity_rules(rules_path)
+    if base_path and Path(base_path).exists() and Path(base_path).resolve() != Path(db_path).resolve():
+        # SQLite backup API: WAL에 남은 내용까지 일관된 스냅샷으로 복사
+        src = sqlite3.connect(base_path)
+        dst = sqlite3.connect(db_path)
+        src.backup(dst)
+        src.close()
+        dst.close()
+
+    conn = sqlite3.connect(db_path)
+    if not _sync_ready(conn, rules):
+        conn.close()
+        print("No compatible entity DB found (schema or entity rules changed), running full build.")
+        create_db(csv_path, db_path, rules_path)
+        return {"full_build": True}
+
+    conn.execute("PRAGMA journal_mode=WAL")
+    print(f"Reading CSV: {csv_path}")
+    docs, contents = _read_csv_docs(csv_path)
+    existing = {
+        doc_id: (doc_num, h, d)
+        for doc_num, doc_id, h, d in conn.execute("SELECT id, doc_id, content_hash, date FROM documents")
+    }
+    added = [d for d in docs if d not in existing]
+    changed = [d for d in docs if d in existing and existing[d][1] != docs[d][-1]]
+    removed = [d for d in existing if d not in docs]
+    print(f"Entity DB diff: added {len(added)}, changed {len(changed)}, removed {len(removed)}, "
+          f"unchanged {len(docs) - len(added) - len(changed)}")
+    stats = {"added": len(added), "changed": len(changed), "removed": len(removed)}
+    if not (added or changed or removed):
+        conn.close()
+        return stats
+
+    dictionary = _EntityDictionary(rules, conn)
+    has_fts = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'documents_fts'"
+    ).fetchone() is not None
+    touched_dates = set()
+    touched_entities = set()
+    placeholders = ", ".join("?" * (len(DOC_COLUMNS) + 1))
+
+    with conn:  # 한 트랜잭션
+        cursor = conn.cursor()
+        for doc_id in removed + changed:
+            doc_num, _, old_date = existing[doc_id]
+            touched_dates.add(old_date)
+            touched_entities.update(r[0] for r in cursor.execute(
+                "SELECT entity_id FROM doc_entity WHERE doc_num = ?", (doc_num,)
+            ).fetchall())
+            cursor.execute("DELETE FROM doc_entity WHERE doc_num = ?", (doc_num,))
+            cursor.execute("DELETE FROM documents WHERE id = ?", (doc_num,))
+
+        links = []
+        fts_rows = []
+        for doc_id in changed + added:
+            values = docs[doc_id]
+            cursor.execute(
+                f"INSERT INTO documents ({', '.join(DOC_COLUMNS)}, content_hash) VALUES ({placeholders})",
+                values,
+            )
+            links += _entity_links(dictionary, values, cursor.lastrowid)
+            fts_rows.append(_fts_row(cursor.lastrowid, values, contents[doc_id]))
+            touched_dates.add(values[1])
+
+        if has_fts:
+            stale = int(_db_meta(conn).get("fts_stale", 0)) + len(removed) + len(changed)
+            if stale > FTS_MAX_STALE_RATIO * len(docs):
+                print(f"Refilling documents_fts ({stale} stale rows)")
+                _refill_fts(cursor, docs, contents)
+            else:
+                _insert_fts(cursor, fts_rows)
+                cursor.execute(
+                    "INSERT OR REPLACE INTO db_meta (key, value) VALUES ('fts_stale', ?)", (str(stale),)
+                )
+
+        cursor.executemany("""
+            INSERT INTO entity (id, name, type, aliases) VALUES (?, ?, ?, ?)
+            ON CONFLICT (id) DO UPDATE SET aliases = excluded.aliases
+        """, list(dictionary.rows(only_dirty=True)))
+        cursor.executemany(
+            "INSERT OR IGNORE INTO doc_entity (entity_id, date_ord, doc_num) VALUES (?, ?, ?)", links
+        )
+        # 더 이상 어떤 문서에도 링크되지 않은 엔티티는 사전에서 뺀다
+        cursor.executemany("""
+            DELETE FROM entity WHERE id = ?
+              AND NOT EXISTS (SELECT 1 FROM doc_entity WHERE entity_id = entity.id)
+        """, [(e,) for e in touched_entities])
+        _write_rollups(cursor, touched_entities | {link[0] for link in links})
+        touched_ords = {date_ordinal(d) for d in touched_dates}
+        write_cooccurrence(cursor, {month_ordinal(o) for o in touched_ords if o > 0})
+        _write_daily_summaries(cursor, {d for d in touched_dates if d})
+
+    conn.close()
+    print("Entity DB synced.")
+    return stats
+
+
 class EntityDB:
-    """엔티티 DB 쿼리 인터페이스"""
+    """엔티티 DB 쿼리 인터페이스
+
+    빌드가 끝난 DB를 읽기만 한다. 연결은 스레드마다 하나씩 (ReadOnlyPool, mode=ro)이라
+    API 스레드풀의 동시 요청이 연결 하나를 두고 기다리지 않는다.
+    doc_store: 같은 세대의 문서 저장소. 본문(검색 결과, 대표 문서 발췌, 짧은 키워드 검색)은
+    여기서 doc_id로 읽는다. 없으면 본문은 빈 문자열이고 짧은 키워드는 본문 밖에서만 찾는다.
+    """
 
-    def __init__(self, db_path: str):
+    def __init__(
+        self,
+        db_path: str,
+        trend_cache_size: int = 256,
+        mmap_mb: int = 1024,
+        cache_mb: int = 64,
+        doc_store: Optional[DocStore] = None,
+    ):
         self.db_path = db_path
-        self.conn = sqlite3.connect(db_path, check_same_thread=False)
-        self.conn.row_factory = sqlite3.Row
+        self.doc_store = doc_store
+        self.pool = ReadOnlyPool(db_path, mmap_mb=mmap_mb, cache_mb=cache_mb)
+        # 쿼리가 entity/doc_entity 테이블을 전제하므로 스키마가 다른 DB(세대 도입 전 SQLITE_DB 등)는
+        # 열 때 거부한다. 읽기 전용이라 여기서 마이그레이션하지 않는다 → sync_db/build_all.py로 다시 빌드.
+        version = _db_meta(self.conn).get("schema_version")
+        if version != str(SCHEMA_VERSION):
+            self.pool.close()
+            raise ValueError(
+                f"Entity DB schema {version or 'unversioned'} != {SCHEMA_VERSION}: {db_path} "
+                f"(rebuild with build_all.py)"
+            )
+        tables = {r[0] for r in self.conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        self.has_fts = "documents_fts" in tables
+        self.has_rollups = "entity_rollup" in tables
+        self.has_cooccur = COOCCUR_TABLE in tables
+        # 키워드 트렌드 결과 캐시 (EntityDB는 세대마다 새로 열리므로 DB가 바뀌면 같이 비워진다)
+        self._trend_cache = LRUCache(trend_cache_size)
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """현재 스레드의 읽기 전용 연결."""
+        return self.pool.connection()
+
+    def _keyword_filter(self, keyword: str, columns: tuple[str, ...]) -> tuple[str, list]:
+        """documents d에 대한 '컬럼 중 하나에 keyword 포함' 조건과 파라미터를 반환합니다.
+
+        trigram은 3글자 이상만 인덱스로 찾을 수 있어서, 짧은 키워드는 LIKE 스캔으로 대신한다.
+        본문은 documents에 없으므로 문서 저장소를 훑어 나온 doc_id 목록으로 조건을 건다.
+        """
+        if self.has_fts and len(keyword.strip()) >= 3:
+            phrase = '"' + keyword.replace('"', '""') + '"'
+            return (
+                "d.id IN (SELECT rowid FROM documents_fts WHERE documents_fts MATCH ?)",
+                [f"{{{' '.join(columns)}}} : {phrase}"],
+            )
+        conds = [f"d.{c} LIKE ?" for c in columns if c != "content"]
+        params = [f"%{keyword}%"] * len(conds)
+        if "content" in columns and self.doc_store is not None:
+            doc_ids = [self.doc_store.doc_ids[i] for i in self.doc_store.find("content", keyword)]
+            conds.append("d.doc_id IN (SELECT value FROM json_each(?))")
+            params.append(json.dumps(doc_ids, ensure_ascii=False))
+        return "(" + (" OR ".join(conds) or "0") + ")", params
+
+    def _with_content(self, docs: list[dict], key: str = "content", max_chars: int = 0) -> list[dict]:
+        """문서 저장소에서 doc_id로 본문을 읽어 채웁니다 (max_chars > 0이면 앞부분만)."""
+        for doc in docs:
+            i = self.doc_store.index_of(doc["doc_id"]) if self.doc_store is not None else -1
+            content = self.doc_store.field(i, "content") if i >= 0 else ""
+            doc[key] = content[:max_chars] if max_chars else content
+        return docs
+
+    def resolve_entity_ids(self, name: str, entity_type: Optional[str] = None) -> list[int]:
+        """이름(또는 별칭)에 name이 들어간 엔티티 id 목록을 반환합니다.
+
+        사전은 문서보다 훨씬 작아서, trigram 인덱스를 못 쓰는 짧은 이름도 LIKE로 충분히 빠르다.
+        """
+        if self.has_fts and len(name.strip()) >= 3:
+            query = """
+                SELECT e.id FROM entity e
+                WHERE e.id IN (SELECT rowid FROM entity_fts WHERE entity_fts MATCH ?)
+            """
+            params: list = ['"' + name.replace('"', '""') + '"']
+        else:
+            query = "SELECT e.id FROM entity e WHERE (e.name LIKE ? OR e.aliases LIKE ?)"
+            params = [f"%{name}%"] * 2
+        if entity_type:
+            query += " AND e.type = ?"
+            params.append(entity_type)
+        return [row[0] for row in self.conn.execute(query, params)]
+
+    @staticmethod
+    def _entity_links_filter(
+        entity_ids: list[int],
+        date_start: Optional[str] = None,
+        date_end: Optional[str] = None,
+    ) -> tuple[str, list]:
+        """doc_entity 조건: 엔티티 id별 (entity_id, date_ord) 기본키 범위 스캔."""
+        placeholders = ",".join("?" * len(entity_ids))
+        cond = f"entity_id IN ({placeholders})"
+        params: list = list(entity_ids)
+        if date_start or date_end:
+            lo, hi = range_ordinals(date_start, date_end)
+            cond += " AND date_ord BETWEEN ? AND ?"
+            params += [lo, hi]
+        return cond, params
 
     def get_entity_timeline(
         self,
         entity_name: str,
         date_start: Optional[str] = None,
         date_end: Optional[str] = None,
-        granularity: str = "day",  # day, week, month
+        granularity: str = "day",  # day, week(ISO), month
         limit: int = 50,
     ) -> list[dict]:
-        """특정 엔티티의 시간순 보도 흐름을 반환합니다."""
-        if granularity == "month":
-            date_expr = "SUBSTR(r.doc_date, 1, 7)"
-        elif granularity == "week":
-            date_expr = "SUBSTR(r.doc_date, 1, 7) || '-W' || CAST((CAST(SUBSTR(r.doc_date, 9, 2) AS INTEGER) - 1) / 7 + 1 AS TEXT)"
-        else:
-            date_expr = "r.doc_date"
-
-        # 서브쿼리로 DISTINCT 처리 후 집계 (Mac SQLite 호환)
-        inner = """
-            SELECT DISTINCT e.doc_id, e.date as doc_date, d.title
-            FROM entities e
-            JOIN documents d ON e.doc_id = d.doc_id
-            WHERE e.entity_name LIKE ?
+        """특정 엔티티의 시간순 보도 흐름을 반환합니다.
+
+        기간이 롤업 경계에 맞으면 entity_rollup 키 조회 (이름이 여러 엔티티로 풀리면 합산),
+        아니면 doc_entity 범위 스캔 후 같은 기준으로 묶는다.
         """
-        params = [f"%{entity_name}%"]
+        if granularity not in GRANULARITIES:
+            granularity = "day"
+        entity_ids = self.resolve_entity_ids(entity_name)
+        if not entity_ids:
+            return []
 
-        if date_start:
-            inner += " AND e.date >= ?"
-            params.append(date_start)
-        if date_end:
-            inner += " AND e.date <= ?"
-            params.append(date_end)
+        bounds = _aligned_range(date_start, date_end, granularity)
+        if self.has_rollups and bounds is not None:
+            return self._timeline_from_rollups(entity_ids, granularity, *bounds, limit)
 
-        query = f"""
-            SELECT {date_expr} as period,
-                   COUNT(*) as doc_count,
-                   GROUP_CONCAT(r.title, ' | ') as titles
-            FROM ({inner}) r
-            GROUP BY {date_expr}
-            ORDER BY period ASC
-            LIMIT ?
+        # 기간이 경계에 안 맞으면 링크를 직접 훑어 묶는다
+        cond, params = self._entity_links_filter(entity_ids, date_start, date_end)
+        buckets: dict[int, dict] = {}
+        for date_ord, title in self.conn.execute(f"""
+            SELECT date_ord, title FROM (
+                SELECT DISTINCT date_ord, doc_num FROM doc_entity WHERE {cond} AND date_ord > 0
+            ) de JOIN documents d ON d.id = de.doc_num
+            ORDER BY date_ord DESC, doc_num DESC
+        """, params):
+            start, _, period = _bucket(date_ord, granularity)
+            b = buckets.setdefault(start, {"period": period, "doc_count": 0, "titles": []})
+            b["doc_count"] += 1
+            if len(b["titles"]) < ROLLUP_TOP_DOCS:
+                b["titles"].append(title)
+        return [buckets[k] for k in sorted(buckets)[:limit]]
+
+    def _timeline_from_rollups(
+        self, entity_ids: list[int], granularity: str, lo: int, hi: int, limit: int
+    ) -> list[dict]:
+        """entity_rollup을 엔티티들에 걸쳐 기간별로 합칩니다 (스캔 경로와 같은 결과).
+
+        엔티티별 링크는 문서당 하나라 합이 곧 문서 수이고, 여러 엔티티에 같이 링크된
+        문서만 중복분을 빼 준다. 최신 문서는 엔티티별 상위 목록을 (날짜, id) 역순으로 병합한다.
         """
-        params.append(limit)
+        placeholders = ",".join("?" * len(entity_ids))
+        rows = self.conn.execute(f"""
+            SELECT start_ord, MIN(period) AS period, SUM(doc_count) AS doc_count,
+                   GROUP_CONCAT(doc_nums) AS doc_nums
+            FROM entity_rollup
+            WHERE entity_id IN ({placeholders}) AND granularity = ? AND start_ord >= ? AND end_ord <= ?
+            GROUP BY start_ord
+            ORDER BY start_ord ASC
+            LIMIT ?
+        """, (*entity_ids, granularity, lo, hi, limit)).fetchall()
 
-        cursor = self.conn.execute(query, params)
+        duplicates: dict[int, int] = defaultdict(int)
+        if len(entity_ids) > 1 and rows:
+            for date_ord, extra in self.conn.execute(f"""
+                SELECT MIN(date_ord), COUNT(*) - 1 FROM doc_entity
+                WHERE entity_id IN ({placeholders}) AND date_ord BETWEEN ? AND ?
+                GROUP BY doc_num HAVING COUNT(*) > 1
+            """, (*entity_ids, max(lo, 1), hi)):
+                duplicates[_bucket(date_ord, granularity)[0]] += extra
+
+        doc_nums = {int(r) for row in rows for r in row["doc_nums"].split(",") if r}
+        docs = self._doc_headers(doc_nums)
         results = []
-        for row in cursor:
-            titles = row["titles"].split(" | ") if row["titles"] else []
+        for row in rows:
+            latest = sorted({int(r) for r in row["doc_nums"].split(",") if r},
+                            key=lambda n: (docs[n][0], n) if n in docs else (0, n), reverse=True)
             results.append({
                 "period": row["period"],
-                "doc_count": row["doc_count"],
-                "titles": titles[:5],
+                "doc_count": row["doc_count"] - duplicates.get(row["start_ord"], 0),
+                "titles": [docs[n][1] for n in latest[:ROLLUP_TOP_DOCS] if n in docs],
             })
         return results
 
+    def _doc_headers(self, doc_nums: set[int]) -> dict[int, tuple[int, str]]:
+        """문서 id → (날짜 ordinal, 제목)."""
+        if not doc_nums:
+            return {}
+        placeholders = ",".join("?" * len(doc_nums))
+        return {
+            doc_num: (date_ordinal(d), title)
+            for doc_num, d, title in self.conn.execute(
+                f"SELECT id, date, title FROM documents WHERE id IN ({placeholders})", list(doc_nums)
+            )
+        }
+
     def get_trend_data(
         self,
         keyword: str,
@@ -234,21 +853,39 @@ class EntityDB:
         date_end: Optional[str] = None,
         granularity: str = "month",
     ) -> dict:
-        """키워드 트렌드 데이터를 반환합니다."""
+        """키워드 트렌드 데이터를 반환합니다.
+
+        키워드는 임의 문자열이라 미리 집계할 수 없어, 같은 (키워드, 기간, 단위) 결과를 캐시한다.
+        """
+        key = (normalize_query(keyword), date_start, date_end, granularity)
+        cached = self._trend_cache.get(key)
+        if cached is None:
+            cached = self._compute_trend_data(keyword, date_start, date_end, granularity)
+            self._trend_cache.put(key, cached)
+        return copy.deepcopy(cached)
+
+    def _compute_trend_data(
+        self,
+        keyword: str,
+        date_start: Optional[str],
+        date_end: Optional[str],
+        granularity: str,
+    ) -> dict:
         if granularity == "month":
             date_group = "SUBSTR(d.date, 1, 7)"
         else:
             date_group = "d.date"
 
+        kw_cond, kw_params = self._keyword_filter(keyword, ("content", "title", "concepts", "events"))
+
         # 키워드 포함 문서의 시계열 분포
         query = f"""
             SELECT {date_group} as period,
                    COUNT(*) as doc_count
             FROM documents d
-            WHERE (d.content LIKE ? OR d.title LIKE ?
-                   OR d.concepts LIKE ? OR d.events LIKE ?)
+            WHERE {kw_cond}
         """
-        params = [f"%{keyword}%"] * 4
+        params = list(kw_params)
 
         if date_start:
             query += " AND d.date >= ?"
@@ -263,39 +900,18 @@ class EntityDB:
         timeline = [{"period": row["period"], "count": row["doc_count"]} for row in cursor]
 
         # 공출현 엔티티 (키워드와 함께 등장하는 엔티티)
-        co_query = """
-            SELECT e.entity_name, e.entity_type, COUNT(*) as co_count
-            FROM entities e
-            JOIN documents d ON e.doc_id = d.doc_id
-            WHERE (d.content LIKE ? OR d.title LIKE ?
-                   OR d.concepts LIKE ? OR d.events LIKE ?)
-              AND e.entity_name NOT LIKE ?
-        """
-        co_params = [f"%{keyword}%"] * 4 + [f"%{keyword}%"]
-
-        if date_start:
-            co_query += " AND d.date >= ?"
-            co_params.append(date_start)
-        if date_end:
-            co_query += " AND d.date <= ?"
-            co_params.append(date_end)
-
-        co_query += " GROUP BY e.entity_name, e.entity_type ORDER BY co_count DESC LIMIT 20"
-
-        cursor = self.conn.execute(co_query, co_params)
-        co_entities = [
-            {"name": row["entity_name"], "type": row["entity_type"], "count": row["co_count"]}
-            for row in cursor
-        ]
+        total_count = sum(t["count"] for t in timeline)
+        co_entities = self._indexed_co_entities(keyword, kw_cond, kw_params, total_count, date_start, date_end)
+        if co_entities is None:
+            co_entities = self._scan_co_entities(keyword, kw_cond, kw_params, date_start, date_end)
 
         # 대표 문서 (기간별 1건씩)
-        repr_query = """
-            SELECT d.doc_id, d.date, d.title, SUBSTR(d.content, 1, 200) as snippet
+        repr_query = f"""
+            SELECT d.doc_id, d.date, d.title
             FROM documents d
-            WHERE (d.content LIKE ? OR d.title LIKE ?
-                   OR d.concepts LIKE ? OR d.events LIKE ?)
+            WHERE {kw_cond}
         """
-        repr_params = [f"%{keyword}%"] * 4
+        repr_params = list(kw_params)
         if date_start:
             repr_query += " AND d.date >= ?"
             repr_params.append(date_start)
@@ -305,16 +921,96 @@ class EntityDB:
         repr_query += " ORDER BY d.date DESC LIMIT 10"
 
         cursor = self.conn.execute(repr_query, repr_params)
-        representative_docs = [dict(row) for row in cursor]
+        representative_docs = self._with_content([dict(row) for row in cursor], "snippet", 200)
 
         return {
             "keyword": keyword,
             "timeline": timeline,
             "co_entities": co_entities,
             "representative_docs": representative_docs,
-            "total_count": sum(t["count"] for t in timeline),
+            "total_count": total_count,
         }
 
+    def _exact_entity_ids(self, name: str) -> list[int]:
+        """이름이나 별칭 하나가 name과 정확히 같은 엔티티 id 목록."""
+        return [row[0] for row in self.conn.execute("""
+            SELECT id FROM entity
+            WHERE name = ? OR ('; ' || aliases || '; ') LIKE ? ESCAPE '\\'
+        """, (name, f"%; {escape_like(name)}; %"))]
+
+    def _indexed_co_entities(
+        self,
+        keyword: str,
+        kw_cond: str,
+        kw_params: list,
+        n_keyword_docs: int,
+        date_start: Optional[str],
+        date_end: Optional[str],
+        k: int = 20,
+    ) -> Optional[list[dict]]:
+        """키워드가 엔티티 이름(별칭)과 같고 기간이 달 경계에 맞으면 공출현 인덱스로 답합니다.
+
+        인덱스는 "엔티티에 링크된 문서"를 센 값이라, 그 문서 집합이 "키워드가 본문에 나온
+        문서"(timeline, representative_docs의 기준)와 같을 때만 쓴다. 예를 들어 별칭으로만
+        나온 문서가 있거나 키워드가 다른 단어 안에 들어 있으면 두 집합이 달라진다.
+        n_keyword_docs: 같은 기간의 키워드 포함 문서 수 (timeline 합계)
+        인덱스로 답할 수 없으면 None (조인 쿼리로 넘어간다).
+        """
+        if not self.has_cooccur:
+            return None
+        entity_ids = self._exact_entity_ids(keyword.strip())
+        if not entity_ids:
+            return None
+        bounds = _aligned_range(date_start, date_end, "month")
+        if bounds is None:
+            return None
+
+        # 링크된 문서 수 == 그중 키워드 포함 문서 수 == 키워드 포함 문서 수 → 두 집합이 같다
+        link_cond, link_params = self._entity_links_filter(entity_ids, date_start, date_end)
+        n_linked, n_both = self.conn.execute(f"""
+            SELECT COUNT(*), COALESCE(SUM({kw_cond}), 0) FROM documents d
+            WHERE d.id IN (SELECT doc_num FROM doc_entity WHERE {link_cond})
+        """, kw_params + link_params).fetchone()
+        if not n_linked == n_both == n_keyword_docs:
+            return None
+
+        lo, hi = bounds
+        return top_co_entities(self.conn, entity_ids, lo, hi, k=k, exclude_like=keyword)
+
+    def _scan_co_entities(
+        self,
+        keyword: str,
+        kw_cond: str,
+        kw_params: list,
+        date_start: Optional[str],
+        date_end: Optional[str],
+    ) -> list[dict]:
+        """키워드 포함 문서의 엔티티 링크를 직접 세어 공출현 엔티티를 구합니다."""
+        co_query = f"""
+            SELECT e.name as entity_name, e.type as entity_type, COUNT(*) as co_count
+            FROM documents d
+            JOIN doc_entity de ON de.doc_num = d.id
+            JOIN entity e ON e.id = de.entity_id
+            WHERE {kw_cond}
+              AND e.name NOT LIKE ? ESCAPE '\\'
+        """
+        co_params = kw_params + [f"%{escape_like(keyword)}%"]
+
+        if date_start:
+            co_query += " AND d.date >= ?"
+            co_params.append(date_start)
+        if date_end:
+            co_query += " AND d.date <= ?"
+            co_params.append(date_end)
+
+        co_query += " GROUP BY e.id ORDER BY co_count DESC LIMIT 20"
+
+        cursor = self.conn.execute(co_query, co_params)
+        return [
+            {"name": row["entity_name"], "type": row["entity_type"], "count": row["co_count"]}
+            for row in cursor
+        ]
+
     def search_by_entity(
         self,
         entity_name: str,
@@ -324,30 +1020,27 @@ class EntityDB:
         limit: int = 20,
     ) -> list[dict]:
         """엔티티 이름으로 관련 문서를 검색합니다."""
-        query = """
-            SELECT DISTINCT d.doc_id, d.date, d.title, d.content,
+        entity_ids = self.resolve_entity_ids(entity_name, entity_type)
+        if not entity_ids:
+            return []
+
+        # 최신순 상위 limit건을 링크 테이블에서 먼저 고른 뒤 본문을 읽는다
+        cond, params = self._entity_links_filter(entity_ids, date_start, date_end)
+        query = f"""
+            SELECT d.doc_id, d.date, d.title,
                    d.persons, d.organizations, d.concepts
-            FROM entities e
-            JOIN documents d ON e.doc_id = d.doc_id
-            WHERE e.entity_name LIKE ?
+            FROM (
+                SELECT DISTINCT doc_num, date_ord FROM doc_entity
+                WHERE {cond}
+                ORDER BY date_ord DESC LIMIT ?
+            ) de
+            JOIN documents d ON d.id = de.doc_num
+            ORDER BY de.date_ord DESC
         """
-        params = [f"%{entity_name}%"]
-
-        if entity_type:
-            query += " AND e.entity_type = ?"
-            params.append(entity_type)
-        if date_start:
-            query += " AND e.date >= ?"
-            params.append(date_start)
-        if date_end:
-            query += " AND e.date <= ?"
-            params.append(date_end)
-
-        query += " ORDER BY d.date DESC LIMIT ?"
         params.append(limit)
 
         cursor = self.conn.execute(query, params)
-        return [dict(row) for row in cursor]
+        return self._with_content([dict(row) for row in cursor])
 
     def search_by_source(
         self,
@@ -358,17 +1051,18 @@ class EntityDB:
         limit: int = 20,
     ) -> list[dict]:
         """언론사 이름으로 관련 문서를 검색합니다."""
-        query = """
-            SELECT d.doc_id, d.date, d.title, d.content,
+        media_cond, params = self._keyword_filter(media_name, ("organizations",))
+        query = f"""
+            SELECT d.doc_id, d.date, d.title,
                    d.persons, d.organizations, d.concepts
             FROM documents d
-            WHERE d.organizations LIKE ?
+            WHERE {media_cond}
         """
-        params = [f"%{media_name}%"]
 
         if topic:
-            query += " AND (d.content LIKE ? OR d.title LIKE ? OR d.concepts LIKE ?)"
-            params.extend([f"%{topic}%"] * 3)
+            topic_cond, topic_params = self._keyword_filter(topic, ("content", "title", "concepts"))
+            query += f" AND {topic_cond}"
+            params.extend(topic_params)
         if date_start:
             query += " AND d.date >= ?"
             params.append(date_start)
@@ -380,15 +1074,38 @@ class EntityDB:
         params.append(limit)
 
         cursor = self.conn.execute(query, params)
-        return [dict(row) for row in cursor]
+        return self._with_content([dict(row) for row in cursor])
+
+    def get_documents(self, doc_ids: list[str]) -> dict[str, dict]:
+        """doc_id 목록의 문서를 한 번에 가져옵니다 (본문은 문서 저장소에서)."""
+        docs: dict[str, dict] = {}
+        ids = list(dict.fromkeys(doc_ids))
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            placeholders = ",".join("?" * len(chunk))
+            cursor = self.conn.execute(f"""
+                SELECT doc_id, date, title, persons, organizations, concepts
+                FROM documents
+                WHERE doc_id IN ({placeholders})
+            """, chunk)
+            for doc in self._with_content([dict(row) for row in cursor]):
+                docs[doc["doc_id"]] = doc
+        return docs
+
+    def get_document(self, doc_id: str) -> Optional[dict]:
+        """문서 한 건 (없으면 None)."""
+        return self.get_documents([doc_id]).get(doc_id)
 
     def close(self):
-        self.conn.close()
+        self.pool.close()
 
 
 if __name__ == "__main__":
     import sys
     if len(sys.argv) < 3:
-        print("Usage: python entity_db.py <csv_path> <db_path>")
+        print("Usage: python entity_db.py [--sync] <csv_path> <db_path> [entity_rules.json]")
         sys.exit(1)
-    create_db(sys.argv[1], sys.argv[2])
+    if sys.argv[1] == "--sync":
+        sync_db(sys.argv[2], sys.argv[3], sys.argv[4] if len(sys.argv) > 4 else None)
+        sys.exit(0)
+    create_db(sys.argv[1], sys.argv[2], sys.argv[3] if len(sys.argv) > 3 else None)
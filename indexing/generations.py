@@ -0,0 +1,106 @@
+"""
+인덱스 세대(generation) 관리
+- build_all.py는 매 빌드를 generations/<이름>/ 디렉토리에 새로 쓴다
+- 빌드가 끝나면 "current" 심볼릭 링크를 원자적으로 교체해 공개한다
+- API는 current 링크를 감시하다가 새 세대를 백그라운드에서 로드해 교체한다
+
+디렉토리 구조:
+    data/processed/
+      current -> generations/20260301-080012
+      generations/
+        20260228-080010/{entities.db, bm25/, docs/}
+        20260301-080012/{entities.db, bm25/, docs/}
+"""
+from __future__ import annotations
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Optional
+
+GENERATIONS_DIRNAME = "generations"
+CURRENT_LINK_NAME = "current"
+
+# 세대 안의 파일 이름
+ENTITY_DB_NAME = "entities.db"
+BM25_DIR_NAME = "bm25"
+DOC_STORE_NAME = "docs"  # 공유 문서 저장소 (indexing.doc_store)
+
+
+def current_generation(processed_dir: Path) -> Optional[Path]:
+    """current 링크가 가리키는 세대 디렉토리를 반환합니다 (없으면 None)."""
+    link = processed_dir / CURRENT_LINK_NAME
+    if not link.is_symlink():
+        return None
+    target = (link.parent / os.readlink(link)).resolve()
+    return target if target.is_dir() else None
+
+
+def generation_name(gen_dir: Optional[Path]) -> str:
+    return gen_dir.name if gen_dir is not None else "legacy"
+
+
+def new_generation(processed_dir: Path) -> Path:
+    """새 세대 디렉토리를 만듭니다."""
+    root = processed_dir / GENERATIONS_DIRNAME
+    root.mkdir(parents=True, exist_ok=True)
+    name = time.strftime("%Y%m%d-%H%M%S")
+    gen_dir = root / name
+    n = 1
+    while gen_dir.exists():
+        n += 1
+        gen_dir = root / f"{name}-{n}"
+    gen_dir.mkdir()
+    return gen_dir
+
+
+def swap_link(link: Path, target: Path):
+    """link를 target을 가리키도록 원자적으로 교체합니다 (symlink 생성 후 rename).
+
+    읽는 쪽은 교체 전후 어느 시점에도 링크를 (이전 또는 새 대상으로) 읽을 수 있다.
+    """
+    tmp_link = link.with_name(f".{link.name}.tmp")
+    if tmp_link.is_symlink() or tmp_link.exists():
+        tmp_link.unlink()
+    os.symlink(os.path.relpath(target, link.parent), tmp_link)
+    os.replace(tmp_link, link)
+
+
+def publish_generation(processed_dir: Path, gen_dir: Path):
+    """current 링크를 gen_dir로 원자적으로 교체합니다."""
+    swap_link(processed_dir / CURRENT_LINK_NAME, gen_dir)
+    print(f"Published generation: {gen_dir.name}")
+
+
+def prune_generations(processed_dir: Path, keep: int = 3) -> list[str]:
+    """current를 제외하고 오래된 세대를 지웁니다 (최근 keep개 유지).
+
+    이미 열려 있는 파일(memmap, SQLite)은 삭제 후에도 기존 프로세스에서 계속 읽힌다.
+    """
+    root = processed_dir / GENERATIONS_DIRNAME
+    if not root.is_dir():
+        return []
+    current = current_generation(processed_dir)
+    gens = sorted((p for p in root.iterdir() if p.is_dir()), key=lambda p: p.name)
+    removed = []
+    for gen_dir in gens[:-keep] if keep > 0 else gens:
+        if current is not None and gen_dir.resolve() == current:
+            continue
+        shutil.rmtree(gen_dir, ignore_errors=True)
+        removed.append(gen_dir.name)
+    return removed
+
+
+def resolve_index_paths(
+    processed_dir: Path,
+    legacy_db: Path,
+    legacy_bm25: Path,
+) -> tuple[Optional[Path], Path, Path]:
+    """현재 세대의 (세대 디렉토리, entities.db, bm25 디렉토리)를 반환합니다.
+
+    아직 세대가 없으면 세대 도입 전 경로(legacy)를 돌려준다.
+    """
+    gen_dir = current_generation(processed_dir)
+    if gen_dir is None:
+        return None, legacy_db, legacy_bm25
+    return gen_dir, gen_dir / ENTITY_DB_NAME, gen_dir / BM25_DIR_NAME
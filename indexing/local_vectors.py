@@ -0,0 +1,786 @@
+"""
+로컬 벡터 저장소 (Qdrant 없이 사용)
+- 정규화된 임베딩을 float16 (또는 행별 스케일 int8) 행렬로 저장, np.memmap으로 로드
+- 검색: 블록 단위 행렬-벡터 곱 + argpartition (정확 검색)
+- 2단계 검색 (선택): 앞쪽 tier_dim 차원만 잘라낸 prefix 행렬(Matryoshka)로 후보를 고르고
+  전체 차원으로 재채점 → 검색마다 전체 행렬을 읽지 않는다
+- 문서가 많으면 IVF(k-means 목록)로 후보를 줄여 근사 검색
+- 문서 번호는 날짜순 → 날짜 범위는 연속 구간 (BM25 인덱스와 같은 방식)
+- 쓰기마다 versions/<번호>/ 디렉토리를 새로 쓰고 "current" 심볼릭 링크를 원자적으로 교체해
+  공개한다 (indexing.generations와 같은 방식). 공개된 버전은 바뀌지 않으므로 읽는 쪽은
+  링크가 가리키는 버전 하나의 파일만 읽고, 링크가 바뀌면 새 버전을 연다.
+- 버전은 기본 세그먼트 + 델타 세그먼트: upsert는 새 행만 델타에 쓰고 기본 세그먼트는
+  하드링크로 재사용한다 (교체/삭제된 행은 live 표시로 가린다). 델타가 커지면 하나로 합친다.
+"""
+from __future__ import annotations
+import json
+import mmap
+import os
+import shutil
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from indexing.dates import date_ordinal, range_ordinals
+from indexing.generations import swap_link
+
+
+# 디스크 포맷
+#   <path>/
+#     current -> versions/00000012
+#     versions/00000012/
+#       meta.json          : 차원, dtype, 살아있는 문서 수, 세그먼트 목록
+#       base/              : 기본 세그먼트 (이전 버전과 하드링크로 공유)
+#       base.live.npy      : bool[N], 살아있는 행 (교체/삭제가 없으면 없음)
+#       delta/             : 마지막 합치기 이후 추가된 행 (선택)
+#       delta.live.npy
+#
+# 세그먼트 (디렉토리 하나, 버전 도입 전에는 <path> 자체가 세그먼트 하나였다)
+# - meta.json            : 차원, dtype, 문서 수, IVF 목록 수
+# - vectors.npy          : float16[N, dim] 또는 int8[N, dim] (L2 정규화 후 저장)
+# - scales.npy           : float32[N], int8일 때 행별 스케일
+# - prefix.npy           : float32[N, tier_dim], 앞쪽 차원만 잘라 재정규화 (2단계 검색 사용 시)
+#                          (작은 행렬이라 변환 비용이 없는 float32로 둔다)
+# - doc_dates.npy        : int32[N], 날짜 ordinal (오름차순)
+# - doc_ids.json         : 문서 번호 → doc_id
+# - doc_hashes.json      : 문서 번호 → content_hash
+# - docs.jsonl           : payload (결과 표시용, 상위 K건만 읽음)
+# - docs_offsets.npy     : int64[N+1], docs.jsonl 바이트 오프셋
+# - entities.json        : 엔티티 목록 (all_entities를 ';'로 분리)
+# - entity_offsets.npy   : int64[E+1]
+# - entity_docs.npy      : int32[P], 엔티티별 문서 번호 (오름차순)
+# - ivf_centroids.npy    : float32[L, dim] (IVF 사용 시)
+# - ivf_offsets.npy      : int64[L+1]
+# - ivf_docs.npy         : int32[N], 목록별 문서 번호 (목록 안에서 오름차순)
+STORE_FORMAT = "slowletter-vectors"
+STORE_VERSION = 2
+
+CURRENT_LINK_NAME = "current"
+VERSIONS_DIRNAME = "versions"
+KEEP_VERSIONS = 3  # current 포함, 이전 버전을 연 채로 있는 프로세스를 위해 조금 남긴다
+_SEGMENT_FILES = {
+    "meta.json", "vectors.npy", "scales.npy", "prefix.npy", "doc_dates.npy", "doc_ids.json",
+    "doc_hashes.json", "docs.jsonl", "docs_offsets.npy", "entities.json", "entity_offsets.npy",
+    "entity_docs.npy", "ivf_centroids.npy", "ivf_offsets.npy", "ivf_docs.npy",
+}
+
+
+def _load_array(path: Path) -> np.ndarray:
+    return np.load(path, mmap_mode="r")
+
+
+def _normalize_rows(mat: np.ndarray) -> np.ndarray:
+    mat = np.asarray(mat, dtype=np.float32)
+    norms = np.linalg.norm(mat, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return mat / norms
+
+
+def _split_entities(value: str) -> list[str]:
+    return [e.strip() for e in (value or "").split(";") if e.strip()]
+
+
+def _link_segment(src: Path, dst: Path):
+    """세그먼트 파일들을 하드링크로 새 버전에 가져옵니다 (안 되면 복사)."""
+    dst.mkdir(parents=True)
+    for f in src.iterdir():
+        if not f.is_file() or f.is_symlink():
+            continue
+        try:
+            os.link(f, dst / f.name)
+        except OSError:
+            shutil.copy2(f, dst / f.name)
+
+
+class _Segment:
+    """세그먼트 하나의 파일 (읽기 전용)"""
+
+    def __init__(self, path: Path):
+        with open(path / "meta.json", encoding="utf-8") as f:
+            self.meta = json.load(f)
+        if self.meta.get("format") != STORE_FORMAT:
+            raise ValueError(f"Not a local vector store: {path}")
+
+        self.path = path
+        self.dim = int(self.meta["dim"])
+        self.dtype = self.meta["dtype"]
+        self.n_docs = int(self.meta["n_docs"])
+        with open(path / "doc_ids.json", encoding="utf-8") as f:
+            self.doc_ids: list[str] = json.load(f)
+        with open(path / "doc_hashes.json", encoding="utf-8") as f:
+            self.doc_hashes: list[str] = json.load(f)
+        with open(path / "entities.json", encoding="utf-8") as f:
+            self.entities = {e: i for i, e in enumerate(json.load(f))}
+
+        self.vectors = _load_array(path / "vectors.npy")
+        self.scales = _load_array(path / "scales.npy") if self.dtype == "int8" else None
+        self.doc_dates = _load_array(path / "doc_dates.npy")
+        self.entity_offsets = _load_array(path / "entity_offsets.npy")
+        self.entity_docs = _load_array(path / "entity_docs.npy")
+        self.docs_offsets = _load_array(path / "docs_offsets.npy")
+        self.docs_mm: Optional[mmap.mmap] = None
+        if self.n_docs > 0:
+            with open(path / "docs.jsonl", "rb") as f:
+                self.docs_mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self.tier_dim = int(self.meta.get("tier_dim", 0))
+        self.prefix = _load_array(path / "prefix.npy") if self.tier_dim else None
+
+        self.centroids = None
+        if self.meta.get("n_lists", 0) > 0:
+            self.centroids = np.asarray(_load_array(path / "ivf_centroids.npy"), dtype=np.float32)
+            self.ivf_offsets = _load_array(path / "ivf_offsets.npy")
+            self.ivf_docs = _load_array(path / "ivf_docs.npy")
+
+    def payload(self, i: int) -> dict:
+        s = int(self.docs_offsets[i])
+        e = int(self.docs_offsets[i + 1])
+        return json.loads(self.docs_mm[s:e].decode("utf-8"))
+
+    def rows_float32(self, rows, tier: bool = False) -> np.ndarray:
+        """행(슬라이스 또는 번호 배열)을 float32로 복원합니다. tier=True면 prefix 행렬."""
+        if tier:
+            return self.prefix[rows]
+        mat = np.asarray(self.vectors[rows], dtype=np.float32)
+        if self.scales is not None:
+            mat *= np.asarray(self.scales[rows], dtype=np.float32)[:, None]
+        return mat
+
+
+class _Snapshot:
+    """한 시점의 저장소 (버전 디렉토리 하나, 읽기 전용, 교체 단위)
+
+    - segments: [기본 세그먼트, (있으면) 델타 세그먼트]
+    - live: 세그먼트별 살아있는 행 표시 (bool[N], 교체/삭제된 행이 없으면 None)
+    """
+
+    def __init__(self, path: Path):
+        with open(path / "meta.json", encoding="utf-8") as f:
+            self.meta = json.load(f)
+        if self.meta.get("format") != STORE_FORMAT:
+            raise ValueError(f"Not a local vector store: {path}")
+
+        self.path = path
+        self.dim = int(self.meta["dim"])
+        self.dtype = self.meta["dtype"]
+        self.segments: list[_Segment] = []
+        self.live: list[Optional[np.ndarray]] = []
+        if "segments" not in self.meta:  # 버전 도입 전: 디렉토리 자체가 세그먼트 하나
+            self.segments.append(_Segment(path))
+            self.live.append(None)
+        for entry in self.meta.get("segments", []):
+            self.segments.append(_Segment(path / entry["name"]))
+            self.live.append(np.load(path / entry["live"]) if entry.get("live") else None)
+        self.n_docs = sum(len(self.live_rows(k)) for k in range(len(self.segments)))
+
+    def live_rows(self, k: int) -> np.ndarray:
+        """세그먼트 k의 살아있는 행 번호 (오름차순)."""
+        live = self.live[k]
+        if live is None:
+            return np.arange(self.segments[k].n_docs)
+        return np.flatnonzero(live)
+
+
+class LocalVectorStore:
+    """memmap 행렬 기반 벡터 저장소 (VectorStore와 같은 인터페이스)"""
+
+    COLLECTION_NAME = "slowletter"
+
+    def __init__(
+        self,
+        path: str,
+        dtype: str = "float16",
+        ivf_min_docs: int = 0,
+        nprobe: int = 16,
+        exact_max_rows: int = 20000,
+        tier_dim: int = 0,
+        rescore_k: int = 300,
+        block_rows: int = 8192,
+        delta_ratio: float = 0.1,
+        max_dead_ratio: float = 0.2,
+    ):
+        """
+        - dtype: 새로 쓸 때의 저장 형식 ("float16" | "int8"). 기존 저장소는 meta.json을 따른다.
+        - ivf_min_docs: 문서 수가 이 이상이면 쓰기 시 IVF 목록을 만든다 (0이면 사용 안 함)
+        - nprobe: IVF 검색 시 살펴볼 목록 수
+        - exact_max_rows: 후보 구간이 이보다 작으면 IVF가 있어도 정확 검색
+        - tier_dim: 쓰기 시 만들 prefix 차원 수 (0이면 2단계 검색 안 함)
+        - rescore_k: 2단계 검색에서 전체 차원으로 재채점할 후보 수
+        - delta_ratio: 델타가 기본 세그먼트의 이 비율을 넘으면 하나로 합쳐 다시 쓴다
+        - max_dead_ratio: 교체/삭제로 가려진 행이 전체의 이 비율을 넘어도 합친다
+        """
+        if dtype not in ("float16", "int8"):
+            raise ValueError(f"Unsupported dtype: {dtype}")
+        self.path = Path(path)
+        self.dtype = dtype
+        self.ivf_min_docs = ivf_min_docs
+        self.nprobe = nprobe
+        self.exact_max_rows = exact_max_rows
+        self.tier_dim = tier_dim
+        self.rescore_k = rescore_k
+        self.block_rows = block_rows
+        self.delta_ratio = delta_ratio
+        self.max_dead_ratio = max_dead_ratio
+        self._lock = threading.Lock()
+        self._snap: Optional[_Snapshot] = None
+        self._stamp = None
+        self._maybe_reload()
+        print(f"로컬 벡터 저장소: {self.path} ({self._snap.n_docs if self._snap else 0} docs)")
+
+    # ---------- 읽기 ----------
+
+    def _current_stamp(self):
+        """("version", 링크 대상) | ("legacy", ino, mtime) | None"""
+        try:
+            return ("version", os.readlink(self.path / CURRENT_LINK_NAME))
+        except OSError:
+            pass
+        try:
+            st = os.stat(self.path / "meta.json")  # 버전 도입 전 저장소
+            return ("legacy", st.st_ino, st.st_mtime_ns)
+        except FileNotFoundError:
+            return None
+
+    def _maybe_reload(self) -> Optional[_Snapshot]:
+        """current 링크가 바뀌었으면 (다른 프로세스가 새 버전을 공개했으면) 그 버전을 엽니다."""
+        for attempt in range(3):
+            stamp = self._current_stamp()
+            if stamp == self._stamp:
+                return self._snap
+            with self._lock:
+                if stamp == self._stamp:
+                    return self._snap
+                try:
+                    if stamp is None:
+                        snap = None
+                    elif stamp[0] == "version":
+                        snap = _Snapshot(self.path / stamp[1])
+                    else:
+                        snap = _Snapshot(self.path)
+                except FileNotFoundError:
+                    # 여는 사이 새 버전이 공개되고 이 버전이 정리됨 → 링크를 다시 읽는다
+                    if attempt == 2:
+                        raise
+                    continue
+                self._snap, self._stamp = snap, stamp
+                return snap
+        return self._snap
+
+    def collection_exists(self) -> bool:
+        return self._current_stamp() is not None
+
+    def backfill_date_ordinals(self, limit: int = 1000) -> int:
+        """VectorStore 호환용. 로컬 저장소는 doc_dates.npy로 날짜를 이미 인덱싱한다."""
+        return 0
+
+    def get_existing_hashes(self, limit: int = 2000) -> dict:
+        """현재 저장소에 들어있는 문서들의 content_hash를 가져옵니다."""
+        s = self._maybe_reload()
+        if s is None:
+            return {}
+        hashes = {}
+        for k, seg in enumerate(s.segments):
+            for i in s.live_rows(k):
+                hashes[seg.doc_ids[i]] = seg.doc_hashes[i]
+        return hashes
+
+    def search(
+        self,
+        query_vector: list[float],
+        top_k: int = 10,
+        date_start: Optional[str] = None,
+        date_end: Optional[str] = None,
+        entity_filter: Optional[str] = None,
+    ) -> list[dict]:
+        """벡터 유사도(코사인) 검색을 수행합니다."""
+        s = self._maybe_reload()
+        if s is None or s.n_docs == 0 or top_k <= 0:
+            return []
+
+        q = np.asarray(query_vector, dtype=np.float32)
+        norm = float(np.linalg.norm(q))
+        if norm > 0:
+            q = q / norm
+
+        # 세그먼트마다 상위 top_k를 구해 점수순으로 합친다
+        hits = []
+        for seg, live in zip(s.segments, s.live):
+            idx, scores = self._search_segment(seg, live, q, top_k, date_start, date_end, entity_filter)
+            hits.extend((float(sc), seg, int(i)) for i, sc in zip(idx, scores))
+        hits.sort(key=lambda h: -h[0])
+
+        results = []
+        for score, seg, i in hits[:top_k]:
+            payload = seg.payload(i)
+            results.append({
+                "doc_id": seg.doc_ids[i],
+                "score": score,
+                "date": payload.get("date", ""),
+                "title": payload.get("title", ""),
+                "content": payload.get("content", ""),
+                "persons": payload.get("persons", ""),
+                "organizations": payload.get("organizations", ""),
+                "concepts": payload.get("concepts", ""),
+            })
+        return results
+
+    def _search_segment(self, s: _Segment, live: Optional[np.ndarray], q: np.ndarray, top_k: int,
+                        date_start: Optional[str], date_end: Optional[str],
+                        entity_filter: Optional[str]) -> tuple[np.ndarray, np.ndarray]:
+        """세그먼트 하나에서 (행 번호, 점수) 상위 top_k개 (점수 내림차순)."""
+        empty = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32))
+        if s.n_docs == 0:
+            return empty
+
+        # 날짜 범위 → 연속된 문서 번호 구간 [lo, hi)
+        lo, hi = 0, s.n_docs
+        if date_start or date_end:
+            d_lo, d_hi = range_ordinals(date_start, date_end)
+            lo = int(np.searchsorted(s.doc_dates, d_lo, side="left"))
+            hi = int(np.searchsorted(s.doc_dates, d_hi, side="right"))
+        if lo >= hi:
+            return empty
+
+        if entity_filter:
+            e = s.entities.get(entity_filter.strip())
+            if e is None:
+                return empty
+            docs = s.entity_docs[s.entity_offsets[e]:s.entity_offsets[e + 1]]
+            candidates = np.asarray(docs[np.searchsorted(docs, lo):np.searchsorted(docs, hi)])
+        elif s.centroids is not None and hi - lo > self.exact_max_rows:
+            candidates = self._ivf_candidates(s, q, lo, hi)
+        else:
+            candidates = None  # [lo, hi) 전체
+        if candidates is not None and live is not None:
+            candidates = candidates[live[candidates]]
+        n_candidates = hi - lo if candidates is None else len(candidates)
+
+        # 2단계: prefix 차원으로 rescore_k개를 고른 뒤 전체 차원으로 재채점
+        first_k = max(self.rescore_k, top_k)
+        if s.prefix is not None and n_candidates > first_k:
+            q_tier = q[:s.tier_dim]
+            q_tier = q_tier / (float(np.linalg.norm(q_tier)) or 1.0)
+            idx, scores = self._score(s, lo, hi, candidates, q_tier, tier=True)
+            if live is not None:
+                scores[~live[idx]] = -np.inf
+            candidates = np.sort(idx[self._top_k(scores, first_k)])
+
+        idx, scores = self._score(s, lo, hi, candidates, q)
+        if live is not None:
+            scores[~live[idx]] = -np.inf
+        top = self._top_k(scores, top_k)
+        top = top[np.isfinite(scores[top])]
+        return idx[top], scores[top]
+
+    def _score(self, s: _Segment, lo: int, hi: int, candidates: Optional[np.ndarray],
+               q: np.ndarray, tier: bool = False):
+        """[lo, hi) 구간 (candidates=None) 또는 후보 문서들을 블록 단위로 채점합니다."""
+        if candidates is None:
+            scores = np.empty(hi - lo, dtype=np.float32)
+            for a in range(lo, hi, self.block_rows):
+                b = min(a + self.block_rows, hi)
+                scores[a - lo:b - lo] = s.rows_float32(slice(a, b), tier) @ q
+            return np.arange(lo, hi), scores
+
+        scores = np.empty(len(candidates), dtype=np.float32)
+        for a in range(0, len(candidates), self.block_rows):
+            b = min(a + self.block_rows, len(candidates))
+            scores[a:b] = s.rows_float32(candidates[a:b], tier) @ q
+        return candidates, scores
+
+    def _ivf_candidates(self, s: _Segment, q: np.ndarray, lo: int, hi: int) -> np.ndarray:
+        """질의와 가까운 nprobe개 목록에서 [lo, hi) 구간 문서만 모읍니다."""
+        n_lists = len(s.centroids)
+        probe = min(self.nprobe, n_lists)
+        lists = np.argpartition(-(s.centroids @ q), probe - 1)[:probe]
+        parts = []
+        for l in lists:
+            docs = s.ivf_docs[s.ivf_offsets[l]:s.ivf_offsets[l + 1]]
+            parts.append(docs[np.searchsorted(docs, lo):np.searchsorted(docs, hi)])
+        return np.sort(np.concatenate(parts)) if parts else np.empty(0, dtype=np.int32)
+
+    @staticmethod
+    def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+        if len(scores) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(len(scores))
+        return top[np.argsort(-scores[top], kind="stable")]
+
+    # ---------- 쓰기 ----------
+
+    def create_collection(self, dim: int = 3072, recreate: bool = False):
+        """빈 저장소를 만듭니다. recreate=True면 기존 저장소를 비웁니다."""
+        if self.collection_exists() and not recreate:
+            return
+        version = self._new_version()
+        self._write_segment(version / "base", dim, self.dtype, [], [], np.empty((0, dim), dtype=np.float32), [])
+        self._publish(version, dim, self.dtype, [{"name": "base", "live": None}], n_docs=0)
+
+    def upsert_documents(
+        self,
+        doc_ids: list[str],
+        embeddings: list[list[float]],
+        payloads: list[dict],
+        batch_size: int = 100,
+    ):
+        """문서를 추가하거나 같은 doc_id를 교체합니다. (새 행만 델타 세그먼트에 씀)"""
+        s = self._maybe_reload()
+        if s is None:
+            raise RuntimeError("create_collection()을 먼저 호출하세요.")
+        if not doc_ids:
+            return
+
+        # 같은 doc_id가 여러 번 오면 마지막 것을 쓴다.
+        last = {did: i for i, did in enumerate(doc_ids)}
+        order = sorted(last.values())
+        new_ids = [doc_ids[i] for i in order]
+        if isinstance(embeddings, np.ndarray) and len(order) == len(doc_ids):
+            new_vecs = embeddings  # memmap이면 그대로 두고 _write_segment가 블록 단위로 읽는다
+        else:
+            new_vecs = np.asarray([embeddings[i] for i in order], dtype=np.float32)
+        new_payloads = [{**payloads[i], "doc_id": doc_ids[i]} for i in order]
+
+        self._apply(s, set(new_ids), new_ids, new_vecs, new_payloads)
+        print(f"Upserted {len(new_ids)} documents to vector store")
+
+    def stage_documents(self, doc_ids: list[str], embeddings: list[list[float]], payloads: list[dict]):
+        """upsert할 배치를 staging 파일에 덧붙입니다. commit_staged()가 한 번에 반영합니다.
+
+        배치마다 새 버전을 공개하지 않기 위한 경로다. 벡터를 먼저 쓰고 문서 줄을
+        나중에 쓰므로, 중간에 죽어도 문서 줄이 있는 행까지는 온전하다.
+        """
+        s = self._maybe_reload()
+        if s is None:
+            raise RuntimeError("create_collection()을 먼저 호출하세요.")
+        vecs = np.asarray(embeddings, dtype=np.float32)
+        if vecs.ndim != 2 or vecs.shape[1] != s.dim:
+            raise ValueError(f"임베딩 차원 불일치: {vecs.shape} (저장소 {s.dim}차원)")
+        staging = self._staging_dir()
+        staging.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            with open(staging / "vectors.f32", "ab") as f:
+                f.write(vecs.tobytes())
+            with open(staging / "docs.jsonl", "a", encoding="utf-8") as f:
+                for did, payload in zip(doc_ids, payloads):
+                    f.write(json.dumps({"doc_id": did, "payload": payload}, ensure_ascii=False) + "\n")
+
+    def commit_staged(self) -> int:
+        """staging에 쌓인 배치를 저장소에 반영하고 staging을 지웁니다."""
+        staging = self._staging_dir()
+        if not (staging / "docs.jsonl").exists():
+            return 0
+        s = self._maybe_reload()
+        if s is None:
+            raise RuntimeError("create_collection()을 먼저 호출하세요.")
+
+        docs = []
+        with open(staging / "docs.jsonl", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    docs.append(json.loads(line))
+                except ValueError:
+                    break  # 쓰다 만 마지막 줄
+        n_rows = os.path.getsize(staging / "vectors.f32") // (4 * s.dim)
+        n = min(len(docs), n_rows)
+        if n:
+            vecs = np.memmap(staging / "vectors.f32", dtype=np.float32, mode="r", shape=(n_rows, s.dim))[:n]
+            self.upsert_documents([d["doc_id"] for d in docs[:n]], vecs, [d["payload"] for d in docs[:n]])
+            del vecs
+        shutil.rmtree(staging)
+        return n
+
+    def _staging_dir(self) -> Path:
+        return self.path.with_name(self.path.name + ".staging")
+
+    def delete_recent_points(self, days: int = 2) -> int:
+        """최근 N일분 벡터를 삭제합니다 (재임베딩용)."""
+        s = self._maybe_reload()
+        if s is None:
+            return 0
+        cutoff = (datetime.now() - timedelta(days=max(days - 1, 0))).strftime("%Y-%m-%d")
+        # 세그먼트마다 문서 번호가 날짜순이므로 cutoff 이후는 꼬리 구간이다.
+        drop = set()
+        for k, seg in enumerate(s.segments):
+            start = int(np.searchsorted(seg.doc_dates, date_ordinal(cutoff), side="left"))
+            rows = s.live_rows(k)
+            drop.update(seg.doc_ids[i] for i in rows[rows >= start])
+        if drop:
+            self._apply(s, drop, [], np.empty((0, s.dim), dtype=np.float32), [])
+        print(f"Deleted {len(drop)} recent vectors (>= {cutoff})")
+        return len(drop)
+
+    def delete_documents(self, doc_ids: list[str]) -> int:
+        """doc_id 목록을 삭제합니다."""
+        s = self._maybe_reload()
+        if s is None:
+            return 0
+        existing = self.get_existing_hashes()
+        drop = {did for did in doc_ids if did in existing}
+        if drop:
+            self._apply(s, drop, [], np.empty((0, s.dim), dtype=np.float32), [])
+        return len(drop)
+
+    def _apply(self, s: _Snapshot, drop: set, new_ids: list[str],
+               new_vecs: np.ndarray, new_payloads: list[dict]):
+        """drop의 doc_id를 가리고 새 행을 더한 새 버전을 공개합니다.
+
+        기본 세그먼트는 하드링크로 재사용하고 live 표시만 새로 쓴다. 새 행은 기존 델타의
+        살아있는 행과 함께 델타 세그먼트로 다시 쓴다. 델타나 가려진 행이 많아지면
+        모든 살아있는 행을 기본 세그먼트 하나로 합쳐 다시 쓴다.
+        """
+        lives = []
+        for seg, live in zip(s.segments, s.live):
+            mask = np.ones(seg.n_docs, dtype=bool) if live is None else np.array(live)
+            if drop:
+                mask &= np.fromiter((did not in drop for did in seg.doc_ids), dtype=bool, count=seg.n_docs)
+            lives.append(mask)
+
+        n_base = int(lives[0].sum())
+        n_delta = sum(int(m.sum()) for m in lives[1:]) + len(new_ids)
+        n_rows = sum(seg.n_docs for seg in s.segments) + len(new_ids)
+        n_dead = n_rows - n_base - n_delta
+        compact = n_delta > self.delta_ratio * max(n_base, 1) or n_dead > self.max_dead_ratio * n_rows
+
+        version = self._new_version()
+        entries = []
+        if compact:
+            sources = [(seg, np.flatnonzero(m)) for seg, m in zip(s.segments, lives)]
+            self._write_segment(version / "base", s.dim, s.dtype, sources, new_ids, new_vecs, new_payloads)
+            entries.append({"name": "base", "live": None})
+        else:
+            parts = [("base", s.segments[0], lives[0])]
+            if len(s.segments) > 1:
+                parts.append(("delta", s.segments[1], lives[1]))
+            if new_ids:
+                # 델타는 작으므로 살아있는 행 + 새 행으로 다시 쓴다
+                sources = [(seg, np.flatnonzero(m)) for name, seg, m in parts if name == "delta"]
+                self._write_segment(version / "delta", s.dim, s.dtype, sources, new_ids, new_vecs, new_payloads)
+                parts = [p for p in parts if p[0] != "delta"]
+                entries.append({"name": "delta", "live": None})
+            for name, seg, mask in parts:
+                if name == "delta" and not mask.any():
+                    continue
+                _link_segment(seg.path, version / name)
+                live_name = None
+                if not mask.all():
+                    live_name = f"{name}.live.npy"
+                    np.save(version / live_name, mask)
+                entries.append({"name": name, "live": live_name})
+            entries.sort(key=lambda e: e["name"] != "base")
+        self._publish(version, s.dim, s.dtype, entries, n_docs=n_base + n_delta)
+
+    def _new_version(self) -> Path:
+        """다음 번호의 (아직 공개되지 않은) 버전 디렉토리를 만듭니다."""
+        root = self.path / VERSIONS_DIRNAME
+        root.mkdir(parents=True, exist_ok=True)
+        numbers = [int(p.name) for p in root.iterdir() if p.name.isdigit()]
+        version = root / f"{max(numbers, default=0) + 1:08d}"
+        version.mkdir()
+        return version
+
+    def _publish(self, version: Path, dim: int, dtype: str, entries: list[dict], n_docs: int):
+        """버전 meta.json을 쓰고 current 링크를 원자적으로 교체한 뒤 이전 버전을 정리합니다.
+
+        읽는 프로세스는 이미 연 버전의 파일(memmap)을 계속 사용한다.
+        """
+        meta = {
+            "format": STORE_FORMAT,
+            "version": STORE_VERSION,
+            "dim": dim,
+            "dtype": dtype,
+            "n_docs": n_docs,
+            "segments": entries,
+            "built_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        with open(version / "meta.json", "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+        swap_link(self.path / CURRENT_LINK_NAME, version)
+
+        # 버전 도입 전 단일 디렉토리 파일은 첫 버전에 (하드링크로) 옮겨졌다
+        for name in _SEGMENT_FILES:
+            (self.path / name).unlink(missing_ok=True)
+        versions = sorted(p for p in (self.path / VERSIONS_DIRNAME).iterdir() if p.name.isdigit())
+        for old in versions[:-KEEP_VERSIONS]:
+            if old != version:
+                shutil.rmtree(old, ignore_errors=True)
+        self._maybe_reload()
+
+    def _write_segment(self, out_dir: Path, dim: int, dtype: str, sources: list,
+                       new_ids: list[str], new_vecs: np.ndarray, new_payloads: list[dict]):
+        """세그먼트 하나를 씁니다: 기존 행(sources) + 새 행.
+
+        sources=[(세그먼트, 행 번호 배열), ...]의 행은 (양자화된 그대로) 복사한다.
+        """
+        doc_ids = [seg.doc_ids[i] for seg, rows in sources for i in rows] + new_ids
+        payloads = [seg.payload(int(i)) for seg, rows in sources for i in rows] + new_payloads
+        starts = np.cumsum([0] + [len(rows) for _, rows in sources])
+        n_old = int(starts[-1])
+        n = len(doc_ids)
+        dates = np.asarray([date_ordinal(p.get("date", "")) for p in payloads], dtype=np.int32)
+        order = np.argsort(dates, kind="stable")  # 날짜순 재번호
+        out_dir.mkdir(parents=True)
+
+        # 1. 벡터 (블록 단위로 복사/양자화해 메모리 사용을 제한)
+        np_dtype = np.float16 if dtype == "float16" else np.int8
+        vectors = np.lib.format.open_memmap(out_dir / "vectors.npy", mode="w+", dtype=np_dtype, shape=(n, dim))
+        scales = np.ones(n, dtype=np.float32)
+        for a in range(0, n, self.block_rows):
+            b = min(a + self.block_rows, n)
+            sel = order[a:b]
+            from_old = sel < n_old
+            if from_old.any():
+                old_sel = sel[from_old]
+                block = np.empty((len(old_sel), dim), dtype=np_dtype)
+                block_scales = np.ones(len(old_sel), dtype=np.float32)
+                for (seg, rows), start, end in zip(sources, starts[:-1], starts[1:]):
+                    m = (old_sel >= start) & (old_sel < end)
+                    if m.any():
+                        src = rows[old_sel[m] - start]
+                        block[m] = seg.vectors[src]
+                        if seg.scales is not None:
+                            block_scales[m] = seg.scales[src]
+                vectors[a:b][from_old] = block
+                scales[a:b][from_old] = block_scales
+            if (~from_old).any():
+                rows = _normalize_rows(new_vecs[sel[~from_old] - n_old])
+                if dtype == "int8":
+                    row_scale = np.abs(rows).max(axis=1) / 127.0
+                    row_scale[row_scale == 0] = 1.0
+                    vectors[a:b][~from_old] = np.round(rows / row_scale[:, None]).astype(np.int8)
+                    scales[a:b][~from_old] = row_scale
+                else:
+                    vectors[a:b][~from_old] = rows.astype(np.float16)
+        vectors.flush()
+        if dtype == "int8":
+            np.save(out_dir / "scales.npy", scales)
+
+        # 2단계 검색용 prefix 행렬 (저장된 행에서 앞쪽 차원만 잘라 재정규화)
+        tier_dim = self.tier_dim if 0 < self.tier_dim < dim else 0
+        if tier_dim:
+            prefix = np.lib.format.open_memmap(
+                out_dir / "prefix.npy", mode="w+", dtype=np.float32, shape=(n, tier_dim)
+            )
+            for a in range(0, n, self.block_rows):
+                b = min(a + self.block_rows, n)
+                rows = np.asarray(vectors[a:b, :tier_dim], dtype=np.float32)
+                if dtype == "int8":
+                    rows *= scales[a:b, None]
+                prefix[a:b] = _normalize_rows(rows)
+            prefix.flush()
+            del prefix
+
+        doc_ids = [doc_ids[i] for i in order]
+        payloads = [payloads[i] for i in order]
+        np.save(out_dir / "doc_dates.npy", dates[order])
+        with open(out_dir / "doc_ids.json", "w", encoding="utf-8") as f:
+            json.dump(doc_ids, f, ensure_ascii=False)
+        with open(out_dir / "doc_hashes.json", "w", encoding="utf-8") as f:
+            json.dump([str(p.get("content_hash", "")) for p in payloads], f)
+
+        # 2. payload (JSONL + 바이트 오프셋)
+        docs_offsets = np.zeros(n + 1, dtype=np.int64)
+        with open(out_dir / "docs.jsonl", "wb") as f:
+            for i, p in enumerate(payloads):
+                line = (json.dumps(p, ensure_ascii=False) + "\n").encode("utf-8")
+                f.write(line)
+                docs_offsets[i + 1] = docs_offsets[i] + len(line)
+        np.save(out_dir / "docs_offsets.npy", docs_offsets)
+
+        # 3. 엔티티 포스팅
+        postings: dict[str, list[int]] = {}
+        for i, p in enumerate(payloads):
+            for e in set(_split_entities(p.get("all_entities", ""))):
+                postings.setdefault(e, []).append(i)
+        entities = sorted(postings)
+        entity_offsets = np.zeros(len(entities) + 1, dtype=np.int64)
+        entity_offsets[1:] = np.cumsum([len(postings[e]) for e in entities])
+        entity_docs = np.asarray([i for e in entities for i in postings[e]], dtype=np.int32)
+        with open(out_dir / "entities.json", "w", encoding="utf-8") as f:
+            json.dump(entities, f, ensure_ascii=False)
+        np.save(out_dir / "entity_offsets.npy", entity_offsets)
+        np.save(out_dir / "entity_docs.npy", entity_docs)
+
+        # 4. IVF (선택)
+        n_lists = 0
+        if self.ivf_min_docs > 0 and n >= self.ivf_min_docs:
+            n_lists = self._build_ivf(out_dir, vectors, scales if dtype == "int8" else None)
+
+        meta = {
+            "format": STORE_FORMAT,
+            "version": STORE_VERSION,
+            "dim": dim,
+            "dtype": dtype,
+            "n_docs": n,
+            "n_entities": len(entities),
+            "n_lists": n_lists,
+            "tier_dim": tier_dim,
+            "built_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        with open(out_dir / "meta.json", "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+        del vectors
+
+    def _build_ivf(self, out_dir: Path, vectors: np.ndarray, scales: Optional[np.ndarray],
+                   n_iter: int = 8, sample_size: int = 20000) -> int:
+        """구면 k-means로 IVF 목록을 만듭니다. 목록 수는 √N."""
+        n = len(vectors)
+        n_lists = max(1, int(np.sqrt(n)))
+
+        def rows(idx):
+            mat = np.asarray(vectors[idx], dtype=np.float32)
+            if scales is not None:
+                mat *= scales[idx][:, None]
+            return mat
+
+        rng = np.random.default_rng(0)
+        sample = np.sort(rng.choice(n, size=min(n, sample_size), replace=False))
+        train = rows(sample)
+        centroids = train[rng.choice(len(train), size=n_lists, replace=False)]
+        for _ in range(n_iter):
+            assign = np.argmax(train @ centroids.T, axis=1)
+            for l in range(n_lists):
+                members = train[assign == l]
+                if len(members):
+                    centroids[l] = members.sum(axis=0)
+            centroids = _normalize_rows(centroids)
+
+        assign = np.empty(n, dtype=np.int32)
+        for a in range(0, n, self.block_rows):
+            b = min(a + self.block_rows, n)
+            assign[a:b] = np.argmax(rows(slice(a, b)) @ centroids.T, axis=1)
+        ivf_docs = np.argsort(assign, kind="stable").astype(np.int32)  # 목록 안에서 문서 번호 오름차순
+        ivf_offsets = np.zeros(n_lists + 1, dtype=np.int64)
+        ivf_offsets[1:] = np.cumsum(np.bincount(assign, minlength=n_lists))
+
+        np.save(out_dir / "ivf_centroids.npy", centroids.astype(np.float32))
+        np.save(out_dir / "ivf_offsets.npy", ivf_offsets)
+        np.save(out_dir / "ivf_docs.npy", ivf_docs)
+        return n_lists
+
+
+def open_vector_store(backend: str, qdrant_url: str, local_dir: str,
+                      quantization: str = "", manifest_path: Optional[str] = None,
+                      slim_payload: bool = False, **local_options):
+    """설정에 맞는 벡터 저장소를 엽니다.
+
+    - backend="local": LocalVectorStore(local_dir) — Qdrant 불필요, 다중 프로세스 읽기 가능
+      (doc_hashes.json이 매니페스트 역할을 하므로 manifest_path는 쓰지 않는다)
+    - 그 외: Qdrant VectorStore(qdrant_url, quantization, 동기화 매니페스트)
+
+    slim_payload는 Qdrant 검색 시 받아오는 payload를 줄인다. 로컬 저장소는 상위 K건의
+    payload만 읽으므로 build_index가 slim payload를 쓰는 것만으로 충분하다.
+    """
+    if backend == "local":
+        return LocalVectorStore(local_dir, **local_options)
+    from indexing.embedder import VectorStore
+    manifest = None
+    if manifest_path:
+        from indexing.vector_manifest import VectorManifest
+        manifest = VectorManifest(manifest_path)
+    return VectorStore(qdrant_url, quantization=quantization, manifest=manifest,
+                       slim_payload=slim_payload)
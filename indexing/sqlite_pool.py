@@ -0,0 +1,76 @@
+"""
+SQLite 읽기 전용 연결 풀 (스레드별 연결)
+- FastAPI 동기 엔드포인트는 스레드풀에서 돌아서, 연결 하나를 공유하면 호출이 연결 잠금에서 줄을 선다
+- 스레드마다 mode=ro 연결을 하나씩 열어 재사용 → 요청마다 connect/close 없음, 준비된 문장 캐시도 유지
+- query_only + mmap + 큰 페이지 캐시: 빌드가 끝난 세대 DB를 읽기만 하는 용도
+"""
+from __future__ import annotations
+import sqlite3
+import threading
+from pathlib import Path
+
+
+class ReadOnlyPool:
+    """스레드별 읽기 전용 SQLite 연결"""
+
+    def __init__(
+        self,
+        db_path: str,
+        mmap_mb: int = 1024,
+        cache_mb: int = 64,
+        cached_statements: int = 256,
+        row_factory=sqlite3.Row,
+    ):
+        self.db_path = str(db_path)
+        self.mmap_mb = mmap_mb
+        self.cache_mb = cache_mb
+        self.cached_statements = cached_statements
+        self.row_factory = row_factory
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # 스레드 → 연결 (끝난 스레드의 연결은 다음 연결을 열 때 닫는다)
+        self._conns: dict[threading.Thread, sqlite3.Connection] = {}
+        self._closed = False
+
+    def connection(self) -> sqlite3.Connection:
+        """현재 스레드의 연결 (없으면 연다)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._closed:
+            conn = self._open()
+            self._local.conn = conn
+        return conn
+
+    def _open(self) -> sqlite3.Connection:
+        with self._lock:
+            if self._closed:
+                raise sqlite3.ProgrammingError(f"Connection pool is closed: {self.db_path}")
+            for thread in [t for t in self._conns if not t.is_alive()]:
+                self._conns.pop(thread).close()
+
+            uri = Path(self.db_path).resolve().as_uri() + "?mode=ro"
+            # 연결은 만든 스레드가 아닌 곳에서 닫힌다 (close()/GC의 __del__, 끝난 스레드 정리)
+            # → check_same_thread=False. 사용은 여전히 만든 스레드에서만 한다.
+            conn = sqlite3.connect(
+                uri, uri=True, check_same_thread=False, cached_statements=self.cached_statements
+            )
+            conn.row_factory = self.row_factory
+            conn.execute("PRAGMA query_only=ON")
+            conn.execute(f"PRAGMA mmap_size={self.mmap_mb * 2**20}")
+            conn.execute(f"PRAGMA cache_size=-{self.cache_mb * 1024}")  # KiB
+            self._conns[threading.current_thread()] = conn
+            return conn
+
+    def __len__(self) -> int:
+        return len(self._conns)
+
+    def close(self):
+        """모든 스레드의 연결을 닫습니다 (이후 connection()은 실패)."""
+        with self._lock:
+            self._closed = True
+            for conn in self._conns.values():
+                conn.close()
+            self._conns.clear()
+
+    def __del__(self):
+        # 세대 교체 후 마지막 참조가 사라질 때 (sqlite3 연결은 순환 참조라 GC를 기다리지 않는다)
+        self.close()
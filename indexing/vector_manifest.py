@@ -0,0 +1,154 @@
+"""
+벡터 동기화 매니페스트
+- Qdrant 컬렉션에 들어있는 문서를 로컬 SQLite에 doc_id → (point_id, content_hash, date_ord)로 기록
+- upsert/delete마다 함께 갱신 → 증분 빌드의 변경 감지가 컬렉션 전체 scroll 없이 O(변경분)
+- 포인트 수가 어긋나거나, 쓰다가 중단된 흔적(pending)이 있거나, 무작위 표본의 해시가 컬렉션과
+  다르면 payload 일부(doc_id/content_hash/date_ord)만 scroll해 다시 맞춘다
+
+사용법 (정합성 점검):
+  python -m indexing.vector_manifest <qdrant_url_or_path> <manifest_db> [--fix]
+"""
+from __future__ import annotations
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterable
+
+
+class VectorManifest:
+    """doc_id → point_id/content_hash/date_ord 기록 (SQLite)"""
+
+    def __init__(self, path: str):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = str(path)
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS points (
+                doc_id TEXT PRIMARY KEY,
+                point_id TEXT NOT NULL,         -- uint64라 SQLite INTEGER에 안 들어감
+                content_hash TEXT NOT NULL,
+                date_ord INTEGER NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_points_date ON points(date_ord)")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS manifest_meta (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            )
+        """)
+        self.conn.commit()
+        self._lock = threading.Lock()
+
+    def count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM points").fetchone()[0]
+
+    @property
+    def pending(self) -> bool:
+        """컬렉션 쓰기가 매니페스트 갱신 전에 중단된 적이 있는지."""
+        row = self.conn.execute("SELECT value FROM manifest_meta WHERE key = 'pending'").fetchone()
+        return row is not None and row[0] == "1"
+
+    def _set_pending(self, value: bool):
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO manifest_meta (key, value) VALUES ('pending', ?)",
+                ("1" if value else "0",),
+            )
+            self.conn.commit()
+
+    @contextmanager
+    def writing(self):
+        """컬렉션 쓰기 구간 표시: 끝까지 가지 못하면 pending이 남아 다음 확인 때 다시 맞춘다."""
+        self._set_pending(True)
+        yield
+        self._set_pending(False)
+
+    def sample(self, n: int) -> list[tuple[str, str, str, int]]:
+        """무작위 n개 행 (정합성 표본 검사용)."""
+        return self.conn.execute(
+            "SELECT doc_id, point_id, content_hash, date_ord FROM points ORDER BY RANDOM() LIMIT ?",
+            (n,),
+        ).fetchall()
+
+    def hashes(self) -> dict[str, str]:
+        return dict(self.conn.execute("SELECT doc_id, content_hash FROM points"))
+
+    def upsert(self, rows: Iterable[tuple[str, str, str, int]]):
+        """(doc_id, point_id, content_hash, date_ord) 행을 기록합니다."""
+        with self._lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO points (doc_id, point_id, content_hash, date_ord) "
+                "VALUES (?, ?, ?, ?)",
+                list(rows),
+            )
+            self.conn.commit()
+
+    def delete_since(self, date_ord: int) -> int:
+        with self._lock:
+            cur = self.conn.execute("DELETE FROM points WHERE date_ord >= ?", (date_ord,))
+            self.conn.commit()
+        return cur.rowcount
+
+    def clear(self):
+        with self._lock:
+            self.conn.execute("DELETE FROM points")
+            self.conn.commit()
+
+    def replace_all(self, rows: Iterable[tuple[str, str, str, int]]):
+        with self._lock:
+            self.conn.execute("DELETE FROM points")
+            self.conn.execute("INSERT OR REPLACE INTO manifest_meta (key, value) VALUES ('pending', '0')")
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO points (doc_id, point_id, content_hash, date_ord) "
+                "VALUES (?, ?, ?, ?)",
+                list(rows),
+            )
+            self.conn.commit()
+
+    def diff(self, rows: list[tuple[str, str, str, int]]) -> dict:
+        """컬렉션에서 읽은 행과 매니페스트를 비교합니다."""
+        actual = {r[0]: r for r in rows}
+        recorded = {
+            r[0]: r for r in self.conn.execute(
+                "SELECT doc_id, point_id, content_hash, date_ord FROM points"
+            )
+        }
+        return {
+            "missing": sorted(set(actual) - set(recorded)),      # 컬렉션에만 있음
+            "stale": sorted(set(recorded) - set(actual)),        # 매니페스트에만 있음
+            "changed": sorted(d for d in set(actual) & set(recorded) if actual[d] != recorded[d]),
+        }
+
+    def close(self):
+        self.conn.close()
+
+
+def reconcile(store, fix: bool = False, limit: int = 2000) -> dict:
+    """Qdrant 컬렉션과 매니페스트를 비교하고, fix=True면 컬렉션 기준으로 다시 씁니다."""
+    rows = store.scroll_manifest_rows(limit=limit)
+    report = store.manifest.diff(rows)
+    if fix and any(report.values()):
+        store.manifest.replace_all(rows)
+    return report
+
+
+if __name__ == "__main__":
+    import sys
+    from indexing.embedder import VectorStore
+
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    if len(args) < 2:
+        print("Usage: python -m indexing.vector_manifest <qdrant_url_or_path> <manifest_db> [--fix]")
+        sys.exit(1)
+    fix = "--fix" in sys.argv
+    store = VectorStore(args[0], manifest=VectorManifest(args[1]))
+    report = reconcile(store, fix=fix)
+    for key, ids in report.items():
+        print(f"{key}: {len(ids)}" + (f" (예: {', '.join(ids[:5])})" if ids else ""))
+    if any(report.values()):
+        print("매니페스트를 컬렉션 기준으로 갱신했습니다." if fix else "--fix로 매니페스트를 갱신하세요.")
+    else:
+        print("매니페스트와 컬렉션이 일치합니다.")
@@ -3,18 +3,64 @@
 - BM25 (키워드) + 벡터 (시맨틱) 검색 결합
 - RRF (Reciprocal Rank Fusion) 기반 점수 통합
 - 메타데이터 필터링 (날짜, 엔티티)
+- BM25와 쿼리 임베딩/벡터 검색을 동시에 실행 (지연시간 ≈ 두 단계 중 긴 쪽)
+- 결과 캐시 (인덱스 세대가 키에 포함되어 세대 교체 시 자동 무효화)
+- slim payload 벡터 결과는 융합 후 최종 top_k만 doc_lookup으로 본문을 채운다
 """
 from __future__ import annotations
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 
+from indexing.cache import normalize_query
+
 
 class HybridSearchEngine:
     """BM25 + 벡터 하이브리드 검색"""
 
-    def __init__(self, bm25_index, vector_store, embedder):
+    RRF_K = 60  # RRF 상수
+
+    def __init__(
+        self,
+        bm25_index,
+        vector_store,
+        embedder,
+        concurrent: bool = True,
+        max_workers: int = 8,
+        result_cache=None,
+        generation: str = "",
+        doc_lookup=None,
+        executor: Optional[ThreadPoolExecutor] = None,
+    ):
+        """
+        concurrent=True면 BM25를 워커 스레드에서 돌리는 동안 쿼리 임베딩(OpenAI 왕복)과
+        벡터 검색을 진행한다. False면 예전처럼 순차 실행한다 (비교/디버깅용).
+
+        result_cache: indexing.cache.LRUCache (세대 간 공유 가능). 키에 generation이
+        들어가므로 새 세대의 엔진은 이전 세대 결과를 보지 않는다.
+
+        doc_lookup: doc_id 목록 → {doc_id: 문서 dict} (예: DocStore.get_documents).
+        벡터 저장소가 본문 없는 slim payload를 돌려줄 때 최종 결과만 한 번에 채운다.
+
+        executor: 세대 간 공유할 워커 풀. 없으면 엔진이 직접 만들고 close()에서 정리한다.
+        """
         self.bm25 = bm25_index
         self.vector_store = vector_store
         self.embedder = embedder
+        self.concurrent = concurrent
+        self.result_cache = result_cache
+        self.generation = generation
+        self.doc_lookup = doc_lookup
+        self._owns_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="hybrid-search"
+        )
+
+    def close(self):
+        """엔진이 직접 만든 워커 풀을 정리합니다 (공유 풀은 그대로 둔다)."""
+        if self._owns_executor:
+            self._executor.shutdown(wait=False)
 
     def search(
         self,
@@ -33,53 +79,236 @@ class HybridSearchEngine:
         RRF (Reciprocal Rank Fusion) 방식으로 두 검색 결과를 통합합니다.
         RRF_score = sum(1 / (k + rank_i)) for each ranking system
         """
-        RRF_K = 60  # RRF 상수
+        results, _ = self.search_with_timings(
+            query, top_k=top_k, initial_k=initial_k,
+            date_start=date_start, date_end=date_end, entity_filter=entity_filter,
+            bm25_weight=bm25_weight, vector_weight=vector_weight,
+        )
+        return results
+
+    def search_with_timings(
+        self,
+        query: str,
+        top_k: int = 10,
+        initial_k: int = 0,
+        date_start: Optional[str] = None,
+        date_end: Optional[str] = None,
+        entity_filter: Optional[str] = None,
+        bm25_weight: float = 0.3,
+        vector_weight: float = 0.7,
+    ) -> tuple[list[dict], dict]:
+        """search()와 같지만 단계별 소요시간(ms)을 함께 반환합니다.
 
+        timings: bm25_ms, embed_ms, vector_ms, fusion_ms, total_ms
+        """
         # initial_k: 각 검색 엔진에서 가져올 후보 수 (top_k보다 충분히 커야 함)
         if initial_k <= 0:
             initial_k = max(top_k * 2, 60)
 
-        # 1. BM25 검색
-        bm25_results = self.bm25.search(
+        t0 = time.perf_counter()
+        cache_key = self._cache_key(query, top_k, initial_k, date_start, date_end,
+                                    entity_filter, bm25_weight, vector_weight)
+        cached = self._cache_get(cache_key, t0)
+        if cached is not None:
+            return cached
+
+        timings: dict = {}
+
+        # 1. BM25 검색 (동시 모드면 워커 스레드에서)
+        if self.concurrent:
+            bm25_future = self._executor.submit(
+                self._run_bm25, query, initial_k, date_start, date_end, timings
+            )
+        # 2. 벡터 검색 (현재 스레드에서 임베딩 왕복 대기)
+        vector_results = self._run_vector(query, initial_k, date_start, date_end, entity_filter, timings)
+        if self.concurrent:
+            bm25_results = bm25_future.result()
+        else:
+            bm25_results = self._run_bm25(query, initial_k, date_start, date_end, timings)
+
+        results = self._fuse_timed(
+            bm25_results, vector_results, top_k,
+            date_start, date_end, bm25_weight, vector_weight, timings,
+        )
+        timings["total_ms"] = (time.perf_counter() - t0) * 1000
+        self._cache_put(cache_key, results, timings)
+        return results, timings
+
+    async def asearch(self, query: str, **kwargs) -> list[dict]:
+        """search()의 async 버전 (FastAPI async 핸들러용)."""
+        results, _ = await self.asearch_with_timings(query, **kwargs)
+        return results
+
+    async def asearch_with_timings(
+        self,
+        query: str,
+        top_k: int = 10,
+        initial_k: int = 0,
+        date_start: Optional[str] = None,
+        date_end: Optional[str] = None,
+        entity_filter: Optional[str] = None,
+        bm25_weight: float = 0.3,
+        vector_weight: float = 0.7,
+    ) -> tuple[list[dict], dict]:
+        """search_with_timings()의 async 버전.
+
+        BM25와 임베딩+벡터 검색을 엔진의 스레드 풀에서 동시에 실행하고,
+        이벤트 루프는 그동안 다른 요청을 처리한다.
+        """
+        if initial_k <= 0:
+            initial_k = max(top_k * 2, 60)
+
+        t0 = time.perf_counter()
+        cache_key = self._cache_key(query, top_k, initial_k, date_start, date_end,
+                                    entity_filter, bm25_weight, vector_weight)
+        cached = self._cache_get(cache_key, t0)
+        if cached is not None:
+            return cached
+
+        loop = asyncio.get_running_loop()
+        timings: dict = {}
+
+        bm25_results, vector_results = await asyncio.gather(
+            loop.run_in_executor(
+                self._executor, self._run_bm25, query, initial_k, date_start, date_end, timings
+            ),
+            loop.run_in_executor(
+                self._executor, self._run_vector,
+                query, initial_k, date_start, date_end, entity_filter, timings,
+            ),
+        )
+
+        results = self._fuse_timed(
+            bm25_results, vector_results, top_k,
+            date_start, date_end, bm25_weight, vector_weight, timings,
+        )
+        timings["total_ms"] = (time.perf_counter() - t0) * 1000
+        self._cache_put(cache_key, results, timings)
+        return results, timings
+
+    def _cache_key(self, query, top_k, initial_k, date_start, date_end,
+                   entity_filter, bm25_weight, vector_weight) -> Optional[tuple]:
+        if self.result_cache is None:
+            return None
+        return (
+            self.generation, normalize_query(query), top_k, initial_k,
+            date_start or "", date_end or "", entity_filter or "",
+            float(bm25_weight), float(vector_weight),
+        )
+
+    def _cache_get(self, key, t0: float) -> Optional[tuple[list[dict], dict]]:
+        if key is None:
+            return None
+        cached = self.result_cache.get(key)
+        if cached is None:
+            return None
+        # 호출자가 결과 dict를 수정해도 캐시가 오염되지 않도록 복사해서 돌려준다.
+        results = [dict(r) for r in cached]
+        return results, {"cache_hit": True, "total_ms": (time.perf_counter() - t0) * 1000}
+
+    def _cache_put(self, key, results: list[dict], timings: dict):
+        # 벡터 검색이 실패해 BM25만으로 만든 결과는 캐시하지 않는다.
+        if key is None or timings.get("vector_failed"):
+            return
+        self.result_cache.put(key, [dict(r) for r in results])
+
+    def _run_bm25(self, query, initial_k, date_start, date_end, timings: dict) -> list[dict]:
+        t = time.perf_counter()
+        results = self.bm25.search(
             query, top_k=initial_k,
             date_start=date_start, date_end=date_end
         )
+        timings["bm25_ms"] = (time.perf_counter() - t) * 1000
+        return results
+
+    def _run_vector(self, query, initial_k, date_start, date_end, entity_filter, timings: dict) -> list[dict]:
+        """쿼리 임베딩 + 벡터 검색 (OPENAI_API_KEY 미설정/오류 시 빈 결과로 폴백)"""
+        timings["embed_ms"] = 0.0
+        timings["vector_ms"] = 0.0
+        if self.embedder is None or self.vector_store is None:
+            return []
+
+        try:
+            t = time.perf_counter()
+            query_embedding = self.embedder.embed_query(query)
+            timings["embed_ms"] = (time.perf_counter() - t) * 1000
+
+            t = time.perf_counter()
+            results = self.vector_store.search(
+                query_vector=query_embedding,
+                top_k=initial_k,
+                date_start=date_start,
+                date_end=date_end,
+                entity_filter=entity_filter,
+            )
+            timings["vector_ms"] = (time.perf_counter() - t) * 1000
+            return results
+        except Exception:
+            # 벡터 검색 실패 시에도 BM25 결과는 반환한다.
+            # (예: OPENAI_API_KEY placeholder/미설정, 네트워크 오류 등)
+            timings["vector_failed"] = True
+            return []
 
-        # 2. 벡터 검색 (OPENAI_API_KEY 미설정/오류 시 BM25-only로 폴백)
-        vector_results = []
-        if self.embedder is not None and self.vector_store is not None:
-            try:
-                query_embedding = self.embedder.embed_query(query)
-                vector_results = self.vector_store.search(
-                    query_vector=query_embedding,
-                    top_k=initial_k,
-                    date_start=date_start,
-                    date_end=date_end,
-                    entity_filter=entity_filter,
-                )
-            except Exception as e:
-                # 벡터 검색 실패 시에도 BM25 결과는 반환한다.
-                # (예: OPENAI_API_KEY placeholder/미설정, 네트워크 오류 등)
-                vector_results = []
-
-        # 3. RRF 점수 계산
+    def _fuse_timed(self, bm25_results, vector_results, top_k, date_start, date_end,
+                    bm25_weight, vector_weight, timings: dict) -> list[dict]:
+        t = time.perf_counter()
+        results = self._fuse(
+            bm25_results, vector_results, top_k,
+            date_start, date_end, bm25_weight, vector_weight,
+        )
+        timings["fusion_ms"] = (time.perf_counter() - t) * 1000
+
+        t = time.perf_counter()
+        self._hydrate(results)
+        timings["hydrate_ms"] = (time.perf_counter() - t) * 1000
+        return results
+
+    _DOC_FIELDS = ("date", "title", "content", "persons", "organizations", "concepts")
+
+    def _hydrate(self, results: list[dict]):
+        """본문이 빠진 결과(slim payload 벡터 결과)를 doc_lookup 한 번으로 채웁니다."""
+        if self.doc_lookup is None:
+            return
+        missing = [r["doc_id"] for r in results if not r.get("content")]
+        if not missing:
+            return
+        docs = self.doc_lookup(missing)
+        for r in results:
+            doc = docs.get(r["doc_id"])
+            if doc is None or r.get("content"):
+                continue
+            for key in self._DOC_FIELDS:
+                if not r.get(key):
+                    r[key] = doc.get(key) or ""
+
+    def _fuse(
+        self,
+        bm25_results: list[dict],
+        vector_results: list[dict],
+        top_k: int,
+        date_start: Optional[str],
+        date_end: Optional[str],
+        bm25_weight: float,
+        vector_weight: float,
+    ) -> list[dict]:
+        """RRF 점수로 두 결과 목록을 합칩니다."""
         rrf_scores = {}
         doc_data = {}
 
         # BM25 결과에 RRF 점수 부여
         for rank, result in enumerate(bm25_results):
             doc_id = result["doc_id"]
-            rrf_scores[doc_id] = rrf_scores.get(doc_id, 0) + bm25_weight / (RRF_K + rank + 1)
+            rrf_scores[doc_id] = rrf_scores.get(doc_id, 0) + bm25_weight / (self.RRF_K + rank + 1)
             doc_data[doc_id] = result
 
         # 벡터 결과에 RRF 점수 부여
         for rank, result in enumerate(vector_results):
             doc_id = result["doc_id"]
-            rrf_scores[doc_id] = rrf_scores.get(doc_id, 0) + vector_weight / (RRF_K + rank + 1)
+            rrf_scores[doc_id] = rrf_scores.get(doc_id, 0) + vector_weight / (self.RRF_K + rank + 1)
             if doc_id not in doc_data:
                 doc_data[doc_id] = result
 
-        # 4. 날짜 필터 적용 (벡터 검색에서 필터링이 안 된 경우)
+        # 날짜 필터 적용 (벡터 검색에서 필터링이 안 된 경우)
         if date_start or date_end:
             filtered_ids = set()
             for doc_id, data in doc_data.items():
@@ -91,7 +320,7 @@ class HybridSearchEngine:
             for doc_id in filtered_ids:
                 rrf_scores.pop(doc_id, None)
 
-        # 5. 정렬 및 상위 K개 반환
+        # 정렬 및 상위 K개 반환
         ranked = sorted(rrf_scores.items(), key=lambda x: x[1], reverse=True)[:top_k]
 
         results = []
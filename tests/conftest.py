@@ -0,0 +1,126 @@
+"""
+테스트 공용 픽스처: 합성 아카이브 CSV
+- 엔티티 이름이 본문에 그대로 들어가고 서로의 부분 문자열이 아니다
+  → 키워드 조인 쿼리와 엔티티 링크 기반 인덱스가 같은 문서를 가리킨다
+- 일부 이름은 인물과 사건 두 타입으로 나와 이름 하나가 엔티티 id 여럿으로 풀린다
+"""
+from __future__ import annotations
+import csv
+import json
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+CSV_FIELDS = [
+    "ID", "date", "title", "cleaned_content_for_api", "cleaned_content_for_service",
+    "solar_persons", "solar_organizations", "solar_concepts", "solar_events", "solar_locations",
+    "total_entities",
+]
+
+PERSONS = ["김민수", "이서연", "박지훈", "최유진", "정하늘"]
+ORGS = ["한빛은행", "푸른재단", "새벽일보"]
+CONCEPTS = ["금리", "물가", "반도체", "탄소중립"]
+EVENTS = ["김민수", "박지훈", "총선"]  # 앞의 둘은 인물과 같은 이름
+WORDS = ["경제", "정부", "시장", "발표", "전망", "회의", "논란", "투자", "수출", "정책"]
+
+# 별칭 규칙 하나 (민수 → 김민수)
+RULES = {"person": {"민수": "김민수"}}
+
+
+def make_rows(n: int = 240, seed: int = 0) -> list[dict]:
+    """2023-01 ~ 2024-06 사이에 흩어진 합성 문서 n개."""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n):
+        month = rng.randint(0, 17)
+        date = f"{2023 + month // 12}-{1 + month % 12:02d}-{rng.randint(1, 28):02d}"
+        persons = rng.sample(PERSONS + ["민수"], rng.randint(0, 2))
+        orgs = rng.sample(ORGS, rng.randint(0, 1))
+        concepts = rng.sample(CONCEPTS, rng.randint(0, 2))
+        events = rng.sample(EVENTS, rng.randint(0, 1))
+        names = persons + orgs + concepts + events
+        content = " ".join(rng.choices(WORDS, k=rng.randint(5, 15)) + names)
+        rows.append({
+            "ID": f"doc{i}",
+            "date": f"{date} 08:00",
+            "title": " ".join(rng.choices(WORDS, k=3)),
+            "cleaned_content_for_api": content,
+            "cleaned_content_for_service": content,
+            "solar_persons": "; ".join(persons),
+            "solar_organizations": "; ".join(orgs),
+            "solar_concepts": "; ".join(concepts),
+            "solar_events": "; ".join(events),
+            "solar_locations": "",
+            "total_entities": len(names),
+        })
+    return rows
+
+
+def edit_rows(rows: list[dict]) -> list[dict]:
+    """증분 갱신용 변경: 본문/엔티티 교체, 날짜 이동, 삭제, 추가."""
+    rows = [dict(r) for r in rows]
+    rows[3]["title"] = "완전히 새 제목"
+    rows[3]["solar_persons"] = "최유진; 정하늘"
+    rows[3]["cleaned_content_for_api"] += " 최유진 정하늘"
+    rows[7]["date"] = "2023-02-14 08:00"
+    rows[11]["cleaned_content_for_api"] = "반도체 수출 전망 반도체"
+    rows[11]["solar_concepts"] = "반도체"
+    del rows[20:30]
+    for j in range(5):
+        new = dict(rows[j])
+        new["ID"] = f"new{j}"
+        new["date"] = f"2024-06-{10 + j:02d} 08:00"
+        rows.append(new)
+    return rows
+
+
+def write_csv(path: Path, rows: list[dict]) -> str:
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        w = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+        w.writeheader()
+        w.writerows(rows)
+    return str(path)
+
+
+@pytest.fixture(scope="session")
+def archive_rows() -> list[dict]:
+    return make_rows()
+
+
+@pytest.fixture
+def archive_csv(tmp_path, archive_rows) -> str:
+    return write_csv(tmp_path / "archive.csv", archive_rows)
+
+
+@pytest.fixture
+def edited_csv(tmp_path, archive_rows) -> str:
+    return write_csv(tmp_path / "archive_edited.csv", edit_rows(archive_rows))
+
+
+@pytest.fixture
+def rules_path(tmp_path) -> str:
+    path = tmp_path / "entity_rules.json"
+    path.write_text(json.dumps(RULES, ensure_ascii=False), encoding="utf-8")
+    return str(path)
+
+
+@pytest.fixture
+def entity_db_path(tmp_path, archive_csv, rules_path) -> str:
+    from indexing.entity_db import create_db
+    path = str(tmp_path / "entities.db")
+    create_db(archive_csv, path, rules_path)
+    return path
+
+
+@pytest.fixture
+def doc_store(tmp_path, archive_csv):
+    from indexing.doc_store import DocStore, build_doc_store
+    path = str(tmp_path / "docs")
+    build_doc_store(archive_csv, path)
+    store = DocStore(path)
+    yield store
+    store.close()
@@ -0,0 +1,103 @@
+"""BM25 증분 갱신(델타 세그먼트 + 삭제 표시, compact)이 전체 빌드와 같은 검색 결과를 내는지"""
+import os
+
+import numpy as np
+import pytest
+
+from indexing.bm25_index import KiwiBM25, _read_csv_docs, build_bm25_index, update_bm25_index
+
+QUERIES = ["금리 전망", "반도체 수출", "김민수", "새 제목", "한빛은행 투자 논란"]
+RANGES = [(None, None), ("2023-02-01", "2023-06-30"), ("2024-01-01", None), (None, "2023-01-31")]
+
+
+def _assert_same_index(a: KiwiBM25, b: KiwiBM25):
+    assert a.n_docs == b.n_docs
+    assert a.avg_doc_length == pytest.approx(b.avg_doc_length)
+    tokens = set().union(*(seg.vocab for seg in a.segments + b.segments))
+    for token in tokens:
+        assert a.df(token) == b.df(token), token
+    assert a.hashes() == b.hashes()
+
+
+def _results(bm25: KiwiBM25) -> list:
+    out = []
+    for query in QUERIES:
+        for date_start, date_end in RANGES:
+            # 매칭 문서 전체 (동점 순서와 무관하게 비교) + 상위 10건 점수
+            hits = bm25.search(query, top_k=1000, date_start=date_start, date_end=date_end)
+            out.append(sorted((h["doc_id"], round(h["score"], 6), h["date"]) for h in hits))
+            top = bm25.search(query, top_k=10, date_start=date_start, date_end=date_end)
+            out.append([round(h["score"], 6) for h in top])
+    return out
+
+
+def _full(csv_path: str) -> KiwiBM25:
+    bm25 = KiwiBM25()
+    bm25.build_index(*_read_csv_docs(csv_path))
+    return bm25
+
+
+def test_add_delete_compact_matches_full_build(archive_csv, edited_csv):
+    expected = _full(edited_csv)
+
+    bm25 = _full(archive_csv)
+    doc_ids, texts, metadata = _read_csv_docs(edited_csv)
+    existing = bm25.hashes()
+    changed = [i for i, d in enumerate(doc_ids)
+               if existing.get(d) != bm25.content_hash(texts[i], metadata[i])]
+    bm25.delete_documents([d for d in existing if d not in set(doc_ids)])
+    bm25.add_documents([doc_ids[i] for i in changed], [texts[i] for i in changed],
+                       [metadata[i] for i in changed])
+
+    # compact 전(기본 + 델타 + 삭제 표시)에도 통계와 검색 결과가 같아야 한다
+    assert len(bm25.segments) == 2 and bm25.segments[0].n_deleted > 0
+    _assert_same_index(bm25, expected)
+    assert _results(bm25) == _results(expected)
+
+    bm25.compact()
+    assert not bm25.dirty
+    _assert_same_index(bm25, expected)
+    assert np.all(np.diff(bm25.segments[0].doc_dates) >= 0)
+    assert _results(bm25) == _results(expected)
+
+
+def test_delete_pending_addition(archive_csv):
+    bm25 = _full(archive_csv)
+    bm25.add_documents(["tmp"], ["금리 반도체 총선"], [{"date": "2024-01-01"}])
+    assert bm25.delete_documents(["tmp"]) == 1
+    expected = _full(archive_csv)
+    _assert_same_index(bm25, expected)
+    assert _results(bm25) == _results(expected)
+    bm25.compact()
+    _assert_same_index(bm25, expected)
+
+
+def test_update_index_on_disk_matches_full_build(tmp_path, archive_csv, edited_csv):
+    base, updated, full = (str(tmp_path / name) for name in ("base", "updated", "full"))
+    build_bm25_index(archive_csv, base)
+    update_bm25_index(edited_csv, updated, base_path=base)
+    build_bm25_index(edited_csv, full)
+
+    a, b = KiwiBM25(), KiwiBM25()
+    a.load(updated)
+    b.load(full)
+    _assert_same_index(a, b)
+    assert _results(a) == _results(b)
+
+    # 기본 세그먼트는 다시 쓰지 않고 하드링크로 공유, 새 파일은 델타와 삭제 표시뿐
+    assert len(a.segments) == 2
+    assert os.path.samefile(f"{base}/current/base/postings_doc.npy", f"{updated}/current/base/postings_doc.npy")
+    assert os.path.exists(f"{updated}/current/base.deleted.npy")
+
+
+def test_compact_past_threshold(tmp_path, archive_csv, edited_csv):
+    base, updated = str(tmp_path / "base"), str(tmp_path / "updated")
+    build_bm25_index(archive_csv, base)
+    bm25 = KiwiBM25(delta_ratio=0.01)
+    bm25.load(base)
+    doc_ids, texts, metadata = _read_csv_docs(edited_csv)
+    bm25.add_documents(doc_ids[-5:], texts[-5:], metadata[-5:])
+    # 델타(5건)가 기본(240건)의 1%를 넘으면 하나로 합친다
+    assert not bm25.dirty
+    bm25.save(updated)
+    assert sorted(os.listdir(f"{updated}/current")) == ["base", "meta.json"]
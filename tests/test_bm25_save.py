@@ -0,0 +1,53 @@
+"""BM25 save(): 버전 디렉토리 + current 링크 교체, 열려 있는 인덱스와 구버전 디렉토리"""
+import os
+import shutil
+
+from indexing.bm25_index import KEEP_VERSIONS, KiwiBM25, _read_csv_docs
+
+
+def _build(csv_path: str) -> KiwiBM25:
+    bm25 = KiwiBM25()
+    bm25.build_index(*_read_csv_docs(csv_path))
+    return bm25
+
+
+def _hits(bm25: KiwiBM25, query: str = "반도체 수출") -> list:
+    return [(h["doc_id"], h["title"]) for h in bm25.search(query, top_k=10)]
+
+
+def test_open_index_survives_save(tmp_path, archive_csv, edited_csv):
+    path = tmp_path / "bm25"
+    _build(archive_csv).save(str(path))
+    reader = KiwiBM25()
+    reader.load(str(path))
+    before = _hits(reader)
+
+    edited = _build(edited_csv)
+    for _ in range(KEEP_VERSIONS + 1):
+        edited.save(str(path))
+    # 이미 연 인덱스는 옛 버전 파일을 계속 읽는다
+    assert _hits(reader) == before
+
+    assert os.path.islink(path / "current")
+    assert len(os.listdir(path / "versions")) == KEEP_VERSIONS
+    fresh = KiwiBM25()
+    fresh.load(str(path))
+    assert _hits(fresh) == _hits(edited)
+
+
+def test_legacy_flat_directory(tmp_path, archive_csv):
+    bm25 = _build(archive_csv)
+    bm25.save(str(tmp_path / "new"))
+    # 버전 도입 전 포맷: 인덱스 파일이 디렉토리에 바로 있다 (세그먼트 디렉토리와 같다)
+    legacy = tmp_path / "legacy"
+    shutil.copytree(tmp_path / "new" / "current" / "base", legacy)
+
+    loaded = KiwiBM25()
+    loaded.load(str(legacy))
+    assert _hits(loaded) == _hits(bm25)
+
+    loaded.save(str(legacy))
+    assert not (legacy / "meta.json").exists()
+    again = KiwiBM25()
+    again.load(str(legacy))
+    assert _hits(again) == _hits(bm25)
@@ -0,0 +1,103 @@
+"""공출현 인덱스: 엔티티 링크로 직접 센 값과 같고, 트렌드 결과는 키워드 스캔과 같으며,
+동기화 후에도 전체 구축과 같은지"""
+import sqlite3
+
+from indexing.cooccurrence import top_co_entities
+from indexing.dates import range_ordinals
+from indexing.entity_db import EntityDB, _aligned_range, create_db, sync_db
+
+NAMES = ["김민수", "이서연", "박지훈", "최유진", "한빛은행", "금리", "총선"]
+RANGES = [(None, None), ("2023-02", "2023-07-31")]
+TREND_COLUMNS = ("content", "title", "concepts", "events")
+
+COOCCUR_ROWS = """
+    SELECT e.name, e.type, c.month_ord, o.name, o.type, c.doc_count FROM entity_cooccur c
+    JOIN entity e ON e.id = c.entity_id JOIN entity o ON o.id = c.other_id
+"""
+
+
+def _entity_ids(db: EntityDB, name: str) -> list[int]:
+    """이름과 정확히 같은 엔티티 (별칭 포함)."""
+    return [row[0] for row in db.conn.execute(
+        "SELECT id FROM entity WHERE name = ? OR ('; ' || aliases || '; ') LIKE ?", (name, f"%; {name}; %")
+    )]
+
+
+def _linked_co_entities(db: EntityDB, name: str, date_start, date_end) -> list[dict]:
+    """엔티티에 링크된 문서에서 다른 엔티티를 문서 단위로 센다."""
+    ids = _entity_ids(db, name)
+    placeholders = ",".join("?" * len(ids))
+    cond, params = "", []
+    if date_start or date_end:
+        cond, params = "AND date_ord BETWEEN ? AND ?", list(range_ordinals(date_start, date_end))
+    rows = db.conn.execute(f"""
+        SELECT e.name, e.type, COUNT(DISTINCT de.doc_num) FROM doc_entity de
+        JOIN entity e ON e.id = de.entity_id
+        WHERE de.doc_num IN (SELECT doc_num FROM doc_entity WHERE entity_id IN ({placeholders}) {cond})
+          AND de.entity_id NOT IN ({placeholders}) AND e.name NOT LIKE ?
+        GROUP BY e.id
+    """, ids + params + ids + [f"%{name}%"])
+    return [{"name": n, "type": t, "count": c} for n, t, c in rows]
+
+
+def _key(e):
+    # 같은 문서 수끼리는 순서가 정해져 있지 않다
+    return (-e["count"], e["name"], e["type"])
+
+
+def _indexed(db: EntityDB, name: str, date_start, date_end):
+    kw_cond, kw_params = db._keyword_filter(name, TREND_COLUMNS)
+    n = sum(t["count"] for t in db.get_trend_data(name, date_start, date_end)["timeline"])
+    return db._indexed_co_entities(name, kw_cond, kw_params, n, date_start, date_end)
+
+
+def test_index_matches_links(entity_db_path):
+    db = EntityDB(entity_db_path, trend_cache_size=0)
+    assert db.has_cooccur
+    for name in NAMES:
+        for date_start, date_end in RANGES:
+            lo, hi = _aligned_range(date_start, date_end, "month")
+            indexed = top_co_entities(db.conn, _entity_ids(db, name), lo, hi, exclude_like=name)
+            expected = _linked_co_entities(db, name, date_start, date_end)
+            assert sorted(indexed, key=_key) == sorted(expected, key=_key)[:20], (name, date_start)
+    db.close()
+
+
+def test_trend_co_entities_match_keyword_scan(entity_db_path):
+    db = EntityDB(entity_db_path, trend_cache_size=0)
+    for name in NAMES:
+        for date_start, date_end in RANGES:
+            trend = db.get_trend_data(name, date_start, date_end)
+            kw_cond, kw_params = db._keyword_filter(name, TREND_COLUMNS)
+            scan = db._scan_co_entities(name, kw_cond, kw_params, date_start, date_end)
+            assert sorted(trend["co_entities"], key=_key) == sorted(scan, key=_key), (name, date_start)
+
+    # 본문 이름 = 링크된 엔티티면 인덱스로 답한다
+    assert _indexed(db, "한빛은행", None, None) is not None
+    # "민수"로만 나온 문서는 김민수에 링크되지만 본문에 "김민수"가 없다 → 조인 쿼리
+    assert _indexed(db, "김민수", None, None) is None
+    db.close()
+
+
+def test_unaligned_range_falls_back_to_scan(entity_db_path):
+    db = EntityDB(entity_db_path, trend_cache_size=0)
+    assert _indexed(db, "금리", "2023-02-03", None) is None
+    db.close()
+
+
+def test_alias_lookup_escapes_like(entity_db_path):
+    db = EntityDB(entity_db_path, trend_cache_size=0)
+    alias_ids = db._exact_entity_ids("민수")
+    assert len(alias_ids) == 1 and set(alias_ids) < set(_entity_ids(db, "김민수"))
+    # "_"가 와일드카드로 해석되면 "민수" 별칭과 "_수"가 맞아 버린다
+    assert db._exact_entity_ids("_수") == []
+    assert db._exact_entity_ids("%") == []
+    db.close()
+
+
+def test_sync_keeps_index_in_step(tmp_path, entity_db_path, edited_csv, rules_path):
+    sync_db(edited_csv, entity_db_path, rules_path)
+    full = str(tmp_path / "full.db")
+    create_db(edited_csv, full, rules_path)
+    rows = [sorted(sqlite3.connect(p).execute(COOCCUR_ROWS)) for p in (entity_db_path, full)]
+    assert rows[0] == rows[1] and rows[0]
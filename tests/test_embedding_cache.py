@@ -0,0 +1,36 @@
+"""쿼리 임베딩 캐시: 만료 항목 제거, 조회 경로에서 SQLite 쓰기 없음"""
+import time
+
+import numpy as np
+
+from indexing.cache import EmbeddingCache
+
+
+def test_expired_lru_hit_is_dropped(tmp_path, monkeypatch):
+    cache = EmbeddingCache(str(tmp_path / "emb.db"), ttl_sec=10)
+    cache.put("m", 3, "질문", [1.0, 2.0, 3.0])
+    now = time.time()
+    monkeypatch.setattr("indexing.cache.time.time", lambda: now + 60)
+    assert cache.get("m", 3, "질문") is None
+    assert len(cache.lru) == 0
+    assert cache.conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0] == 0
+    cache.close()
+
+
+def test_hits_do_not_write_until_next_put(tmp_path):
+    path = str(tmp_path / "emb.db")
+    writer = EmbeddingCache(path)
+    writer.put("m", 2, "a", [1.0, 0.0])
+    writer.close()
+
+    cache = EmbeddingCache(path, lru_size=0)
+    before = cache.conn.total_changes
+    used_at = cache.conn.execute("SELECT used_at FROM embeddings").fetchone()[0]
+    for _ in range(5):
+        np.testing.assert_array_equal(cache.get("m", 2, " a "), [1.0, 0.0])
+    assert cache.conn.total_changes == before
+
+    cache.put("m", 2, "b", [0.0, 1.0])
+    assert cache.conn.execute("SELECT used_at FROM embeddings WHERE key = ?",
+                              (cache.key("m", 2, "a"),)).fetchone()[0] > used_at
+    cache.close()
@@ -0,0 +1,19 @@
+"""엔티티 사전: 별칭 규칙으로 대표 이름에 합치고, 이름은 정수 id로 풀린다"""
+from indexing.entity_db import EntityDB
+
+
+def test_alias_rule_merges_into_canonical(entity_db_path):
+    db = EntityDB(entity_db_path)
+    persons = {row["name"]: row["aliases"] for row in db.conn.execute(
+        "SELECT name, aliases FROM entity WHERE type = 'person'"
+    )}
+    assert "민수" not in persons
+    assert "민수" in persons["김민수"].split("; ")
+    db.close()
+
+
+def test_same_name_in_two_types_resolves_to_two_ids(entity_db_path):
+    db = EntityDB(entity_db_path)
+    assert len(db.resolve_entity_ids("박지훈")) == 2
+    assert len(db.resolve_entity_ids("박지훈", entity_type="person")) == 1
+    db.close()
@@ -0,0 +1,60 @@
+"""FTS5 트라이그램 키워드 필터가 LIKE 스캔(본문은 문서 저장소)과 같은 문서를 고르는지"""
+from indexing.entity_db import EntityDB
+
+COLUMNS = ("content", "title", "concepts", "events")
+
+
+def _matching_doc_ids(db: EntityDB, keyword: str) -> set[str]:
+    cond, params = db._keyword_filter(keyword, COLUMNS)
+    return {row[0] for row in db.conn.execute(f"SELECT d.doc_id FROM documents d WHERE {cond}", params)}
+
+
+def _scan_doc_ids(doc_store, keyword: str) -> set[str]:
+    return {
+        doc_id for i, doc_id in enumerate(doc_store.doc_ids)
+        if any(keyword in doc_store.field(i, c) for c in ("content", "title", "concepts"))
+    }
+
+
+def test_fts_filter_matches_like(entity_db_path, doc_store):
+    db = EntityDB(entity_db_path, trend_cache_size=0, doc_store=doc_store)
+    assert db.has_fts
+    for keyword in ["김민수", "한빛은행", "탄소중립", "정부 발표", "없는키워드"]:
+        fts = _matching_doc_ids(db, keyword)
+        db.has_fts = False
+        like = _matching_doc_ids(db, keyword)
+        db.has_fts = True
+        assert fts == like, keyword
+    db.close()
+
+
+def test_short_keyword_uses_like(entity_db_path, doc_store):
+    db = EntityDB(entity_db_path, trend_cache_size=0, doc_store=doc_store)
+    cond, _ = db._keyword_filter("금리", COLUMNS)
+    assert "LIKE" in cond
+    matched = _matching_doc_ids(db, "금리")
+    assert matched == _scan_doc_ids(doc_store, "금리")
+    assert db.get_trend_data("금리")["total_count"] == len(matched) > 0
+    db.close()
+
+
+def test_content_from_doc_store(entity_db_path, doc_store):
+    db = EntityDB(entity_db_path, trend_cache_size=0, doc_store=doc_store)
+    docs = db.search_by_entity("한빛은행", limit=5)
+    assert docs
+    for doc in docs:
+        assert doc["content"] == doc_store.field(doc_store.index_of(doc["doc_id"]), "content")
+    for doc in db.get_trend_data("한빛은행")["representative_docs"]:
+        assert doc["snippet"] == doc_store.field(doc_store.index_of(doc["doc_id"]), "content")[:200]
+    db.close()
+
+
+def test_doc_store_find_ignores_ascii_case(tmp_path):
+    from indexing.doc_store import DocStore, write_doc_store
+    path = str(tmp_path / "docs")
+    records = [{"date": "2024-01-01", "content": c} for c in ["AI 정책", "ai", "a", "i", ""]]
+    write_doc_store(path, ["d0", "d1", "d2", "d3", "d4"], records, fields=("date", "content"))
+    store = DocStore(path)
+    # 문서 경계를 걸친 일치("a" + "i")는 세지 않는다
+    assert [store.doc_ids[i] for i in store.find("content", "Ai")] == ["d0", "d1"]
+    store.close()
@@ -0,0 +1,30 @@
+"""타임라인 롤업이 doc_entity 범위 스캔과 같은 결과를 내는지 (동기화 후 포함)"""
+import pytest
+
+from indexing.entity_db import EntityDB, sync_db
+
+ENTITY_NAMES = ["김민수", "이서연", "박지훈", "최유진", "정하늘", "한빛은행", "금리", "반도체", "총선"]
+TIMELINE_RANGES = [(None, None), ("2023-01-01", "2023-12-31"), ("2023-02", "2023-06"), ("2023-03-05", "2024-02-10")]
+
+
+def _assert_rollups_match_scan(db_path: str):
+    db = EntityDB(db_path, trend_cache_size=0)
+    assert db.has_rollups
+    for name in ENTITY_NAMES:
+        for date_start, date_end in TIMELINE_RANGES:
+            for granularity in ("day", "week", "month"):
+                db.has_rollups = True
+                rolled = db.get_entity_timeline(name, date_start, date_end, granularity, limit=500)
+                db.has_rollups = False
+                scanned = db.get_entity_timeline(name, date_start, date_end, granularity, limit=500)
+                assert rolled == scanned, (name, date_start, date_end, granularity)
+    db.close()
+
+
+def test_rollup_timeline_matches_scan(entity_db_path):
+    _assert_rollups_match_scan(entity_db_path)
+
+
+def test_rollup_after_sync(entity_db_path, edited_csv, rules_path):
+    sync_db(edited_csv, entity_db_path, rules_path)
+    _assert_rollups_match_scan(entity_db_path)
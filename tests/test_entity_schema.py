@@ -0,0 +1,24 @@
+"""EntityDB는 스키마 버전이 다른 DB(세대 도입 전 SQLITE_DB 등)를 열 때 거부한다"""
+import sqlite3
+
+import pytest
+
+from indexing.entity_db import EntityDB
+
+
+def test_rejects_unversioned_db(tmp_path):
+    path = str(tmp_path / "legacy.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE documents (id INTEGER PRIMARY KEY, doc_id TEXT, content TEXT)")
+    conn.close()
+    with pytest.raises(ValueError, match="unversioned"):
+        EntityDB(path)
+
+
+def test_rejects_other_schema_version(entity_db_path):
+    conn = sqlite3.connect(entity_db_path)
+    with conn:
+        conn.execute("UPDATE db_meta SET value = '1' WHERE key = 'schema_version'")
+    conn.close()
+    with pytest.raises(ValueError, match="schema 1"):
+        EntityDB(entity_db_path)
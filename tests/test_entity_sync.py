@@ -0,0 +1,90 @@
+"""엔티티 DB 증분 동기화(sync_db)가 전체 구축(create_db)과 같은 DB를 만드는지"""
+import sqlite3
+
+from indexing import entity_db
+from indexing.entity_db import EntityDB, create_db, sync_db
+
+# 엔티티/문서는 정수 id 대신 이름과 doc_id로 비교한다 (증분 갱신은 id를 다시 매기지 않는다)
+SNAPSHOT_QUERIES = {
+    "documents": """
+        SELECT doc_id, date, title, persons, organizations, concepts, events, locations,
+               total_entities, content_hash FROM documents
+    """,
+    "entity": "SELECT name, type, aliases FROM entity",
+    "links": """
+        SELECT e.name, e.type, d.doc_id, de.date_ord FROM doc_entity de
+        JOIN entity e ON e.id = de.entity_id JOIN documents d ON d.id = de.doc_num
+    """,
+}
+
+
+def snapshot(db_path: str, queries: dict = SNAPSHOT_QUERIES) -> dict:
+    conn = sqlite3.connect(db_path)
+    snap = {name: sorted(conn.execute(q)) for name, q in queries.items()}
+    # 요약 목록은 집합에서 나와 순서가 정해져 있지 않다
+    snap["daily"] = {
+        date: (count, sorted(titles.split(" | ")), *(sorted(names.split("; ")) for names in tops))
+        for date, count, titles, *tops in conn.execute("SELECT * FROM daily_summaries")
+    }
+    conn.close()
+    return snap
+
+
+def test_sync_matches_full_build(tmp_path, entity_db_path, edited_csv, rules_path):
+    synced = str(tmp_path / "synced.db")
+    stats = sync_db(edited_csv, synced, rules_path, base_path=entity_db_path)
+    assert stats
+    full = str(tmp_path / "full.db")
+    create_db(edited_csv, full, rules_path)
+
+    a, b = snapshot(synced), snapshot(full)
+    for name in b:
+        assert a[name] == b[name], name
+
+
+def test_sync_without_changes_is_noop(tmp_path, entity_db_path, archive_csv, rules_path):
+    before = snapshot(entity_db_path)
+    sync_db(archive_csv, entity_db_path, rules_path)
+    assert snapshot(entity_db_path) == before
+
+
+# 3글자 이상은 FTS, 짧은 것은 본문 밖 LIKE → contentless FTS에 남은 행이 결과에 섞이지 않는지
+KEYWORDS = ["최유진", "정하늘", "반도체", "완전히 새", "한빛은행", "김민수", "총선"]
+
+
+def fts_matches(db_path: str) -> dict:
+    db = EntityDB(db_path, trend_cache_size=0)
+    matches = {}
+    for keyword in KEYWORDS:
+        cond, params = db._keyword_filter(keyword, ("content", "title"))
+        matches[keyword] = sorted(
+            r[0] for r in db.conn.execute(f"SELECT d.doc_id FROM documents d WHERE {cond}", params)
+        )
+    db.close()
+    return matches
+
+
+def fts_stale(db_path: str) -> int:
+    conn = sqlite3.connect(db_path)
+    value = conn.execute("SELECT value FROM db_meta WHERE key = 'fts_stale'").fetchone()
+    conn.close()
+    return int(value[0]) if value else 0
+
+
+def test_sync_fts_matches_full_build(tmp_path, entity_db_path, edited_csv, rules_path):
+    synced = str(tmp_path / "synced.db")
+    stats = sync_db(edited_csv, synced, rules_path, base_path=entity_db_path)
+    full = str(tmp_path / "full.db")
+    create_db(edited_csv, full, rules_path)
+    assert fts_stale(synced) == stats["removed"] + stats["changed"] > 0
+    assert fts_matches(synced) == fts_matches(full)
+
+
+def test_sync_refills_stale_fts(tmp_path, monkeypatch, entity_db_path, edited_csv, rules_path):
+    monkeypatch.setattr(entity_db, "FTS_MAX_STALE_RATIO", 0.0)
+    synced = str(tmp_path / "synced.db")
+    sync_db(edited_csv, synced, rules_path, base_path=entity_db_path)
+    full = str(tmp_path / "full.db")
+    create_db(edited_csv, full, rules_path)
+    assert fts_stale(synced) == 0
+    assert fts_matches(synced) == fts_matches(full)
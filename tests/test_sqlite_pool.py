@@ -0,0 +1,64 @@
+"""읽기 전용 연결 풀: 스레드별 연결, 쓰기 거부, close() 이후 동작"""
+import sqlite3
+import threading
+
+import pytest
+
+from indexing.entity_db import EntityDB
+from indexing.sqlite_pool import ReadOnlyPool
+
+
+def test_connection_per_thread(entity_db_path):
+    pool = ReadOnlyPool(entity_db_path)
+    main = pool.connection()
+    assert pool.connection() is main
+
+    other = []
+    thread = threading.Thread(target=lambda: other.append(pool.connection()))
+    thread.start()
+    thread.join()
+    assert other[0] is not main
+    assert len(pool) == 2
+    pool.close()
+
+
+def test_read_only(entity_db_path):
+    pool = ReadOnlyPool(entity_db_path)
+    with pytest.raises(sqlite3.OperationalError):
+        pool.connection().execute("DELETE FROM documents")
+    pool.close()
+
+
+def test_closed_pool(entity_db_path):
+    pool = ReadOnlyPool(entity_db_path)
+    conn = pool.connection()
+    pool.close()
+    assert len(pool) == 0
+    # 이미 받은 연결도 닫혔고, 새 연결은 열지 않는다
+    with pytest.raises(sqlite3.ProgrammingError):
+        conn.execute("SELECT 1")
+    with pytest.raises(sqlite3.ProgrammingError):
+        pool.connection()
+
+    worker_errors = []
+
+    def worker():
+        try:
+            pool.connection()
+        except sqlite3.ProgrammingError as e:
+            worker_errors.append(e)
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    thread.join()
+    assert len(worker_errors) == 1
+    pool.close()  # 두 번 닫아도 된다
+
+
+def test_entity_db_after_close(entity_db_path):
+    db = EntityDB(entity_db_path)
+    doc_id = db.conn.execute("SELECT doc_id FROM documents LIMIT 1").fetchone()[0]
+    assert db.get_document(doc_id)["doc_id"] == doc_id
+    db.close()
+    with pytest.raises(sqlite3.ProgrammingError):
+        db.get_document(doc_id)